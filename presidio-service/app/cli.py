@@ -0,0 +1,315 @@
+"""
+Offline-Anonymisierung großer Bestände (Backfills) ohne HTTP-Server.
+
+Verarbeitet ein Verzeichnis (rekursiv) oder eine Manifest-Datei (ein Pfad pro
+Zeile) auf allen Kernen - mit derselben Pipeline wie POST /anonymize und
+POST /jobs. Jede fertige Datei wird in checkpoint.jsonl im Ausgabeverzeichnis
+eingetragen (Status, Ausgabedatei, PII, Laufzeit, Fehler); ein erneuter Aufruf
+überspringt alle Dateien, die dort bereits stehen und sich nicht geändert haben.
+
+Usage (im Verzeichnis presidio-service bzw. im Docker-Image):
+    python -m app.cli /data/bewerbungen --output /data/anonymisiert --workers 8
+    python -m app.cli manifest.txt --output /data/anonymisiert --format text
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import argparse
+import json
+import logging
+import mimetypes
+import os
+import signal
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = "checkpoint.jsonl"
+
+# Endungen, die detect_file_type kennt
+SUPPORTED_EXTENSIONS = {".pdf", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".docx", ".txt"}
+
+EXTENSIONS = {
+    "application/json": ".json",
+    "application/pdf": ".pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+    "image/jpeg": ".jpg",
+}
+
+
+@dataclass
+class FileRecord:
+    """Eine Zeile im Checkpoint-Manifest (zugleich Report pro Datei)."""
+
+    source: str               # Pfad relativ zum Eingabeverzeichnis bzw. wie im Manifest
+    size: int
+    mtime_ns: int
+    status: str               # ok, failed
+    output: Optional[str] = None
+    original_type: Optional[str] = None
+    pii_found: Optional[int] = None
+    pages_processed: Optional[int] = None
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def iter_inputs(source: Path) -> Iterator[Tuple[Path, str]]:
+    """(Pfad, Schlüssel) aller Eingabedateien - Verzeichnis rekursiv oder Manifest."""
+    if source.is_dir():
+        for path in sorted(source.rglob("*")):
+            if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS and not path.name.startswith("."):
+                yield path, path.relative_to(source).as_posix()
+        return
+
+    base = source.parent
+    with open(source, encoding="utf-8") as manifest:
+        for line in manifest:
+            entry = line.strip()
+            if not entry or entry.startswith("#"):
+                continue
+            path = Path(entry)
+            yield (path if path.is_absolute() else base / path), entry
+
+
+def load_checkpoint(path: Path, retry_failed: bool = False) -> Dict[str, Tuple[int, int]]:
+    """Fertige Dateien: Schlüssel -> (Größe, mtime). Die letzte Zeile pro Datei gilt."""
+    done: Dict[str, Tuple[int, int]] = {}
+    if not path.exists():
+        return done
+
+    with open(path, encoding="utf-8") as checkpoint:
+        for line in checkpoint:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # abgebrochener Schreibvorgang am Dateiende
+            if record["status"] == "ok" or not retry_failed:
+                done[record["source"]] = (record["size"], record["mtime_ns"])
+            else:
+                done.pop(record["source"], None)
+    return done
+
+
+def _init_worker():
+    """Ein Prozess pro Kern: keine Threads innerhalb des Workers."""
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")  # Tesseract
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # Ctrl+C behandelt nur der Hauptprozess
+
+    from app.config import settings
+    settings.nlp_batching = False   # nur ein Request pro Prozess - Warten bringt nichts
+    settings.pdf_render_threads = 1
+    settings.quality_degradation = False  # Batch: keine Lastregelung, immer volle Qualität
+
+
+def _output_base(output_dir: Path, key: str) -> Path:
+    """
+    Ausgabepfad ohne neue Endung. Schlüssel aus Manifesten mit ../ oder
+    Symlinks, die aus dem Ausgabeverzeichnis herausführen, werden abgelehnt.
+
+    Raises:
+        ValueError: Pfad liegt außerhalb von output_dir
+    """
+    root = output_dir.resolve()
+    target = (root / key.lstrip("/")).resolve()
+    if target == root or not target.is_relative_to(root):
+        raise ValueError(f"Output path for {key} is outside the output directory")
+    return target
+
+
+def _output_path(output_dir: Path, key: str, media_type: str) -> Path:
+    """
+    Ausgabedatei zur Eingabe: die Quell-Endung bleibt im Namen (cv.pdf.json),
+    damit cv.pdf und cv.docx im selben Ordner nicht auf dieselbe Datei fallen.
+    """
+    extension = EXTENSIONS.get(media_type) or mimetypes.guess_extension(media_type) or ".bin"
+    base = _output_base(output_dir, key)
+    if base.suffix.lower() == extension:
+        return base
+    return base.with_name(base.name + extension)
+
+
+def process_file(
+    path: str,
+    key: str,
+    size: int,
+    mtime_ns: int,
+    output_dir: str,
+    output_format: str,
+    language: str,
+) -> FileRecord:
+    """Eine Datei im Worker-Prozess anonymisieren und das Ergebnis schreiben."""
+    from app.routes.jobs import run_job
+    from app.services.job_queue import JobFailed, JobRequest
+
+    started = time.monotonic()
+    record = FileRecord(source=key, size=size, mtime_ns=mtime_ns, status="failed")
+
+    try:
+        # Vor der Verarbeitung - ungültige Schlüssel kosten keine OCR
+        _output_base(Path(output_dir), key)
+        content = Path(path).read_bytes()
+        result = run_job(
+            JobRequest(
+                content=content,
+                filename=Path(path).name,
+                output_format=output_format,
+                language=language,
+            ),
+            progress=lambda done, total: None,
+        )
+
+        target = _output_path(Path(output_dir), key, result.media_type)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Erst vollständig schreiben, dann umbenennen - nie halbe Ausgabedateien
+        partial = target.with_name(target.name + ".part")
+        partial.write_bytes(result.body)
+        os.replace(partial, target)
+
+        headers = {name.lower(): value for name, value in result.headers.items()}
+        record.status = "ok"
+        record.output = str(target.relative_to(Path(output_dir).resolve()))
+        record.original_type = headers.get("x-original-type")
+        if result.media_type == "application/json":
+            payload = json.loads(result.body)
+            record.original_type = payload.get("original_type", record.original_type)
+            record.pii_found = payload.get("pii_found")
+            record.pages_processed = payload.get("pages_processed")
+        else:
+            if "x-pii-found" in headers:
+                record.pii_found = int(headers["x-pii-found"])
+            if "x-pages-processed" in headers:
+                record.pages_processed = int(headers["x-pages-processed"])
+    except JobFailed as e:
+        record.error = f"{e.status_code}: {e.detail}"
+    except Exception as e:
+        record.error = str(e)
+
+    record.seconds = round(time.monotonic() - started, 3)
+    return record
+
+
+def run(
+    source: Path,
+    output_dir: Path,
+    output_format: str = "auto",
+    language: str = "de",
+    workers: Optional[int] = None,
+    retry_failed: bool = False,
+) -> Dict[str, int]:
+    """
+    Alle Eingabedateien verarbeiten, die noch nicht im Checkpoint stehen.
+
+    Returns:
+        Zähler: ok, failed, skipped
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = output_dir / CHECKPOINT_NAME
+    done = load_checkpoint(checkpoint_path, retry_failed)
+    workers = workers or os.cpu_count() or 1
+
+    counts = {"ok": 0, "failed": 0, "skipped": 0}
+    # Offene Aufträge: Future -> (Schlüssel, Größe, mtime) für den Checkpoint bei Abstürzen
+    pending: Dict[Future, Tuple[str, int, int]] = {}
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+
+        def collect(futures: Set[Future]):
+            for future in futures:
+                key, size, mtime_ns = pending.pop(future)
+                try:
+                    record: FileRecord = future.result()
+                except BrokenProcessPool:
+                    # Worker gestorben (OOM-Killer, Segfault in Tesseract/pdftoppm) -
+                    # betrifft alle offenen Dateien dieses Pools
+                    record = FileRecord(
+                        source=key, size=size, mtime_ns=mtime_ns,
+                        status="failed", error="Worker process died",
+                    )
+                checkpoint.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+                checkpoint.flush()
+                counts[record.status] += 1
+                if record.error:
+                    logger.warning(f"{record.source}: {record.error}")
+                else:
+                    logger.info(f"{record.source}: {record.pii_found} PII, {record.seconds:.1f}s")
+
+        def submit(*args) -> Future:
+            nonlocal pool
+            try:
+                return pool.submit(process_file, *args)
+            except BrokenProcessPool:
+                logger.warning("Worker pool broken, starting a new one")
+                pool.shutdown(wait=False)
+                pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+                return pool.submit(process_file, *args)
+
+        try:
+            for path, key in iter_inputs(source):
+                try:
+                    stat = path.stat()
+                except OSError as e:
+                    logger.warning(f"{key}: {e}")
+                    counts["failed"] += 1
+                    continue
+
+                if done.get(key) == (stat.st_size, stat.st_mtime_ns):
+                    counts["skipped"] += 1
+                    continue
+
+                # Höchstens 2 Dateien pro Worker in der Warteschlange - konstanter Speicher
+                if len(pending) >= workers * 2:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished)
+
+                future = submit(
+                    str(path), key, stat.st_size, stat.st_mtime_ns,
+                    str(output_dir), output_format, language,
+                )
+                pending[future] = (key, stat.st_size, stat.st_mtime_ns)
+
+            finished, _ = wait(pending)
+            collect(finished)
+        except KeyboardInterrupt:
+            logger.warning("Interrupted - finished files are in the checkpoint, rerun to resume")
+            for future in pending:
+                future.cancel()
+            raise
+        finally:
+            pool.shutdown()
+
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline-Anonymisierung für Backfills")
+    parser.add_argument("source", type=Path, help="Verzeichnis oder Manifest (ein Pfad pro Zeile)")
+    parser.add_argument("--output", type=Path, required=True, help="Ausgabeverzeichnis inkl. checkpoint.jsonl")
+    parser.add_argument("--format", default="auto", choices=["auto", "text", "image", "pdf", "docx"])
+    parser.add_argument("--language", default="de", choices=["de", "en"])
+    parser.add_argument("--workers", type=int, default=None, help="Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--retry-failed", action="store_true", help="Fehlgeschlagene Dateien erneut versuchen")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if not args.source.exists():
+        parser.error(f"{args.source} not found")
+
+    started = time.monotonic()
+    try:
+        counts = run(args.source, args.output, args.format, args.language, args.workers, args.retry_failed)
+    except KeyboardInterrupt:
+        return 130
+
+    logger.info(
+        f"Done in {time.monotonic() - started:.0f}s: "
+        f"{counts['ok']} ok, {counts['failed']} failed, {counts['skipped']} already done"
+    )
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
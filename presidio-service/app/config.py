@@ -46,10 +46,104 @@ class Settings(BaseSettings):
 
     # OCR Settings
     tesseract_lang: str = "deu+eng"
+    ocr_backend: str = "auto"  # auto, tesserocr, pytesseract (auto = tesserocr wenn installiert)
+
+    # OCR Vorverarbeitung: Auflösung nach Textgröße wählen, Boxen zurückskalieren
+    ocr_adaptive_resolution: bool = True
+    ocr_target_line_height: int = 40   # Zeilenhöhe in Pixeln für Tesseract
+    ocr_min_line_height: int = 24      # Text wird nie kleiner skaliert
+    ocr_max_megapixels: float = 4.0
+    ocr_binarize: bool = True
+
+    # Scans: Layout-Vorlauf - leere Seiten ohne OCR, sonst nur textführende Bereiche
+    ocr_regions: bool = True
+    ocr_skip_graphics: bool = False       # große Foto-/Grafikflächen ohne Tintenstriche nicht OCRen
+
+    # OCR-Cache pro Seite (Hash der Seitenpixel + OCR-Settings), 0 = aus
+    ocr_cache_entries: int = 512
+
+    # Ausgabe-Kodierung für geschwärzte Scans (PDF) und Bilder
+    pdf_page_color: str = "rgb"          # rgb, gray, bilevel
+    pdf_page_compression: str = "jpeg"   # jpeg, flate, g4 (CCITT, nur bilevel)
+    pdf_jpeg_quality: int = 75
+    image_output_format: str = "png"     # png, jpeg, webp
+    image_output_quality: int = 80       # für jpeg/webp
+    png_compress_level: int = 6          # 0-9, niedriger = schneller
+
+    # Text-PDFs: Extraktor und Text/Scan-Erkennung
+    pdf_text_extractor: str = "pdfplumber"  # pdfplumber, pypdf2 (schneller, ohne Layout-Analyse)
+    pdf_probe_pages: int = 3                # Seiten, die für die Text/Scan-Erkennung gelesen werden
+
+    # Text-PDFs: wiederholte Kopf-/Fußzeilen nur einmal durch die NLP-Pipeline
+    pdf_dedup_repeated_blocks: bool = True
+    pdf_dedup_zone_lines: int = 4    # Zeilen oben/unten je Seite, die als Kopf/Fuß gelten
+    pdf_dedup_min_pages: int = 2     # Zeile muss auf so vielen Seiten vorkommen
+
+    # Scan-PDFs: Seiten mit einem eingebetteten Bild direkt schwärzen (ohne Rastern/Neukodieren)
+    pdf_native_images: bool = True
+
+    # Scan-PDFs rastern (pdftoppm)
+    pdf_render_dpi: int = 200          # Stufe 0; unter Last niedriger (quality_render_dpi)
+    pdf_render_threads: int = 2        # parallele pdftoppm-Prozesse
+    pdf_render_grayscale: bool = True  # PGM statt PPM - OCR braucht keine Farbe
+
+    # NER-Micro-Batching: Texte paralleler Requests gemeinsam durch nlp.pipe
+    nlp_batching: bool = True
+    nlp_batch_size: int = 16           # höchstens so viele Texte pro Batch
+    nlp_batch_max_wait_ms: float = 5.0  # so lange auf weitere Texte warten (Latenz vs. Durchsatz)
+
+    # DOCX: Absätze/Tabellenzeilen pro nlp.pipe-Batch
+    docx_batch_size: int = 32
 
     # File Limits
     max_file_size_mb: int = 10
     max_pages: int = 20
+    image_max_megapixels: float = 12.0    # größere Bilder werden verkleinert (A4 @ 300 DPI ≈ 8.7 MP)
+    image_bomb_megapixels: float = 100.0  # größere Bilder werden abgelehnt (413)
+
+    # Deadline pro Request (Cloud Run/Gunicorn-Timeout); Header X-Request-Timeout kann kürzer setzen
+    request_timeout_seconds: float = 300.0
+
+    # Identische Requests (Inhalt, Optionen, Settings) teilen sich eine laufende Berechnung
+    coalesce_requests: bool = True
+    coalesce_disconnect_grace_seconds: float = 10.0  # nach Disconnect so lange auf einen Retry warten
+
+    # Speicher: Worker vor dem Container-Limit (Cloud Run 2 GiB) kontrolliert recyceln
+    memory_rss_limit_mb: int = 1536              # ab hier trimmen, dann drainen + SIGTERM; 0 = aus
+                                                 # (kein SIGTERM, solange Job-Ergebnisse nur im Speicher liegen)
+    memory_check_interval_seconds: float = 5.0
+    memory_drain_timeout_seconds: float = 60.0   # höchstens so lange auf laufende Requests warten
+    memory_tracemalloc: bool = False             # tracemalloc ab Start (Overhead), sonst per /debug/memory
+    memory_tracemalloc_frames: int = 10
+
+    # Lastabhängige Qualitätsstufen: bei voller Warteschlange oder knappem Speicher
+    # Rasterauflösung und parallele Seiten senken (Stufe 0 = Settings oben, max_pages gilt immer)
+    quality_degradation: bool = True
+    quality_render_dpi: List[int] = [150, 120]         # ein Eintrag je Stufe ab 1
+    quality_render_threads: List[int] = [1, 1]
+    quality_queue_thresholds: List[float] = [0.5, 0.8]    # Füllstand der vollsten Lane-Warteschlange
+    quality_memory_thresholds: List[float] = [0.75, 0.9]  # RSS relativ zu memory_rss_limit_mb
+    quality_recover_margin: float = 0.2    # zurück erst, wenn die Last 20 % unter der Schwelle liegt
+    quality_hold_seconds: float = 15.0     # Mindestdauer einer Stufe vor dem Hochschalten
+    quality_fast_from_level: int = 1       # ab dieser Stufe laufen priority=low Requests im Fast-Mode
+
+    # Admission Control: getrennte Lanes für Text- und OCR-Requests
+    lane_text_concurrency: int = 4
+    lane_text_max_queue: int = 32
+    lane_text_queue_timeout: float = 10.0   # Sekunden Wartezeit bis 429
+    lane_ocr_concurrency: int = 1
+    lane_ocr_max_queue: int = 4
+    lane_ocr_queue_timeout: float = 30.0
+
+    # /inspect: ab dieser geschätzten Laufzeit wird POST /jobs empfohlen
+    inspect_async_threshold_seconds: float = 20.0
+
+    # Async Jobs (große Scans ohne offene HTTP-Verbindung)
+    job_store_backend: str = "memory"  # memory, sqlite
+    job_store_path: str = "/tmp/presidio-jobs.sqlite3"
+    job_ttl_seconds: int = 3600        # Ergebnisse verfallen nach 1h
+    job_workers: int = 1
+    job_queue_size: int = 50
 
     class Config:
         env_file = ".env"
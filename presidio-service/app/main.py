@@ -22,10 +22,41 @@ async def lifespan(app: FastAPI):
     # Modelle werden lazy geladen beim ersten Request
     # (nicht hier, um Cold Start zu beschleunigen)
 
+    from app.services.memory import start_tracing
+    from app.services.memory_watchdog import start_memory_watchdog, stop_memory_watchdog
+
+    if settings.memory_tracemalloc:
+        start_tracing(settings.memory_tracemalloc_frames)
+    start_memory_watchdog(requests_in_flight, volatile_jobs)
+
     yield
 
     logger.info("Shutting down Presidio Service...")
 
+    stop_memory_watchdog()
+
+    from app.routes.jobs import shutdown_job_queue
+    shutdown_job_queue()
+
+    from app.services.image_anonymizer import shutdown_image_anonymizer
+    shutdown_image_anonymizer()
+
+
+def requests_in_flight() -> int:
+    """Laufende/wartende Requests (Lanes) und Jobs - der Watchdog wartet darauf."""
+    from app.routes.jobs import pending_jobs
+    from app.services.admission import get_admission_controller
+
+    lanes = get_admission_controller().stats().values()
+    return sum(lane["running"] + lane["waiting"] for lane in lanes) + pending_jobs()
+
+
+def volatile_jobs() -> int:
+    """Offene oder nicht abgeholte Jobs im In-Memory-Store - ein Recycling würde sie verlieren."""
+    from app.routes.jobs import volatile_jobs as count
+
+    return count()
+
 
 app = FastAPI(
     title="Presidio Anonymization Service",
@@ -65,6 +96,24 @@ async def verify_api_key(request: Request, call_next):
     return await call_next(request)
 
 
+# Worker wird wegen Speicher recycelt: keine neuen Requests annehmen.
+# Status und Ergebnisse laufender Jobs bleiben abrufbar.
+@app.middleware("http")
+async def reject_while_draining(request: Request, call_next):
+    from app.services.memory_watchdog import get_memory_watchdog
+
+    watchdog = get_memory_watchdog()
+    job_read = request.method == "GET" and request.url.path.startswith("/api/v1/jobs/")
+    if watchdog and watchdog.draining and request.url.path != "/health" and not job_read:
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Worker is restarting, retry shortly"},
+            headers={"Retry-After": "5"},
+        )
+
+    return await call_next(request)
+
+
 # Health Check (für Load Balancer)
 @app.get("/health")
 async def health_check():
@@ -92,5 +141,10 @@ async def readiness_check():
 
 
 # Routes (lazy import)
-from app.routes import anonymize
+from app.routes import anonymize, debug, inspect, jobs, metrics, render
 app.include_router(anonymize.router, prefix="/api/v1")
+app.include_router(debug.router, prefix="/api/v1")
+app.include_router(inspect.router, prefix="/api/v1")
+app.include_router(jobs.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
+app.include_router(render.router, prefix="/api/v1")
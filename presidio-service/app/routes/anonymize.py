@@ -1,13 +1,36 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from fastapi.responses import JSONResponse, Response
-from typing import Optional
-import io
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from typing import AsyncIterator, Iterator, List, Optional
+from PIL import Image, UnidentifiedImageError
+import asyncio
+import json
 import logging
 
-from app.services.text_anonymizer import get_anonymizer
+from app.services.text_anonymizer import entity_to_dict, get_anonymizer, render_entities
 from app.services.image_anonymizer import get_image_anonymizer
 from app.services.pdf_processor import PDFProcessor
+from app.services.pdf_text_extractor import create_text_extractor
+from app.services.pdf_redactor import PDFRedactor
+from app.services.scan_redactor import ScanPDFRedactor
+from app.services.docx_processor import DocxProcessor, DOCX_MEDIA_TYPE
+from app.services.job_queue import ProgressCallback
+from app.services.admission import LaneSaturated, LaneTicket, get_admission_controller
+from app.services.cost_estimator import estimate_cost
+from app.services.load_controller import (
+    PRIORITIES,
+    PRIORITY_NORMAL,
+    current_quality,
+    fast_mode,
+    get_load_controller,
+    set_quality,
+)
+from app.services.memory import MemoryProfile, finish_profile, start_profile
+from app.services.single_flight import Flight, get_single_flight, request_key
 from app.utils.file_detector import detect_file_type, FileType
+from app.utils.image_encoding import encode_image
+from app.utils.image_loader import ImageTooLarge, load_image
+from app.utils.deadline import Deadline, DeadlineExceeded, set_deadline
 from app.config import settings
 
 router = APIRouter()
@@ -15,13 +38,21 @@ logger = logging.getLogger(__name__)
 
 # Services werden lazy geladen (Singleton Pattern)
 pdf_processor = PDFProcessor()  # Leichtgewichtig, kann sofort geladen werden
+fast_pdf_processor = PDFProcessor(create_text_extractor("pypdf2"))  # Fast-Mode: ohne Layout-Analyse
+pdf_redactor = PDFRedactor(pdf_processor)
+scan_redactor = ScanPDFRedactor(pdf_processor)
+docx_processor = DocxProcessor()
 
 
 @router.post("/anonymize")
 async def anonymize_document(
+    request: Request,
     file: UploadFile = File(...),
-    output_format: Optional[str] = Form("auto"),  # auto, text, image
+    output_format: Optional[str] = Form("auto"),  # auto, text, image, pdf, docx
     language: Optional[str] = Form("de"),
+    stream: bool = Form(False),
+    include_entities: bool = Form(False),
+    priority: Optional[str] = Form(PRIORITY_NORMAL),  # normal, low
 ):
     """
     Anonymisiert ein Dokument (PDF, Bild, DOCX).
@@ -31,15 +62,207 @@ async def anonymize_document(
         - "auto": Gleiches Format wie Input
         - "text": Nur anonymisierter Text
         - "image": Anonymisiertes Bild (bei Scans)
+        - "pdf": Geschwärztes PDF (bei Text-PDFs direkt im Vektor-PDF, ohne OCR)
+        - "docx": Geschwärztes DOCX mit erhaltener Formatierung
     - **language**: Sprache für PII-Erkennung (de, en)
+    - **stream**: PDFs seitenweise streamen, sobald jede Seite fertig ist
+    - **include_entities**: Bei Text-Output zusätzlich source_text und entities
+      (Typ, Offsets im source_text, Score, Recognizer) - für POST /render
+    - **priority**: "low" = unter Last zuerst im Fast-Mode verarbeiten
+      (geringere OCR-Auflösung, Text-PDFs ohne Layout-Analyse)
 
     Returns:
         - Bei Text-Output: JSON mit anonymisiertem Text
+          (bei stream=true: NDJSON, eine Zeile pro Seite + Abschlusszeile)
         - Bei Bild-Output: Anonymisiertes Bild als Binary
+          (bei stream=true: PDF wird inkrementell geschrieben)
+        - 429 mit Retry-After, wenn die Lane (Text/OCR) ausgelastet ist
+        - 504, wenn die Deadline (Header X-Request-Timeout in Sekunden) abläuft;
+          beim Streamen endet die Antwort mit den bis dahin fertigen Seiten
+        - Identische Requests, während der erste noch läuft (z.B. Retry nach
+          Client-Timeout), bekommen dessen Ergebnis (Header X-Coalesced: true)
+        - Header X-Quality-Level: verwendete Qualitätsstufe (0 = volle Qualität,
+          höher = unter Last reduzierte Auflösung/Seitenzahl), X-Fast-Mode: true
     """
 
-    # Dateigröße prüfen
     content = await file.read()
+    validate_upload(content)
+    validate_priority(priority)
+
+    # Deadline gilt für Warteschlange und Verarbeitung, Seitenschleifen prüfen sie
+    deadline = request_deadline(request)
+    set_deadline(deadline)
+
+    # Identische Requests teilen sich eine Berechnung (Streams nicht - der Body ist nur einmal lesbar)
+    key = None
+    if settings.coalesce_requests and not stream:
+        key = await run_in_threadpool(
+            request_key,
+            content,
+            file.filename or "",
+            output_format=output_format,
+            language=language,
+            include_entities=include_entities,
+            priority=priority,
+        )
+
+    async def compute(flight: Optional[Flight]) -> Response:
+        return await _anonymize(
+            request, content, file.filename, output_format, language,
+            stream, include_entities, deadline, flight, priority,
+        )
+
+    try:
+        response, coalesced = await get_single_flight().run(
+            key, compute, deadline, retry_on=_leader_specific
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Deadline exceeded while waiting for identical request")
+
+    return _coalesced_copy(response) if coalesced else response
+
+
+async def _anonymize(
+    request: Request,
+    content: bytes,
+    filename: Optional[str],
+    output_format: str,
+    language: str,
+    stream: bool,
+    include_entities: bool,
+    deadline: Deadline,
+    flight: Optional[Flight] = None,
+    priority: str = PRIORITY_NORMAL,
+) -> Response:
+    """Lane belegen, Dokument verarbeiten, Lane freigeben (bei Streams nach dem Body)."""
+    # Speicher je Schritt (Rastern, Schwärzen) - Log und /debug/memory
+    profile = start_profile(filename or "upload")
+
+    # Kosten schätzen und passende Lane belegen (Text vs. OCR)
+    cost = await run_in_threadpool(estimate_cost, content, filename or "")
+    try:
+        ticket = await get_admission_controller().admit(cost, timeout=deadline.remaining())
+    except LaneSaturated as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many {e.lane} requests, retry later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except DeadlineExceeded as e:
+        # Zeitbudget schon beim Warten aufgebraucht - kein Grund für einen Retry
+        logger.warning(f"Processing stopped: {e.reason}")
+        raise HTTPException(status_code=504, detail=e.reason)
+
+    # Qualitätsstufe nach aktueller Last (Warteschlange, Speicher) - gilt für den ganzen Request
+    set_quality(get_load_controller().level_for(priority))
+
+    # Client weg (Worker/Proxy hat aufgegeben) - restliche Seiten nicht mehr verarbeiten
+    watcher = asyncio.create_task(_watch_disconnect(request, deadline, flight))
+
+    try:
+        response = await run_in_threadpool(
+            process_document,
+            content,
+            filename,
+            output_format,
+            language,
+            stream=stream,
+            include_entities=include_entities,
+        )
+    except BaseException:
+        watcher.cancel()
+        ticket.release()
+        finish_profile(profile)
+        raise
+
+    if isinstance(response, StreamingResponse):
+        # Die Arbeit passiert erst beim Streamen - Lane bis zum Ende belegt halten
+        response.body_iterator = _release_after(response.body_iterator, ticket, watcher, profile)
+    else:
+        watcher.cancel()
+        ticket.release()
+        finish_profile(profile)
+
+    return response
+
+
+def _leader_specific(error: BaseException) -> bool:
+    """Fehler, die nur den ersten Request betreffen - Wartende rechnen dann selbst."""
+    return isinstance(error, HTTPException) and error.status_code in (429, 503, 504)
+
+
+def _coalesced_copy(response: Response) -> Response:
+    """Eigene Response-Instanz für einen Wartenden (gleicher Body, gleiche Header)."""
+    copy = Response(content=response.body, status_code=response.status_code)
+    copy.raw_headers = list(response.raw_headers) + [(b"x-coalesced", b"true")]
+    return copy
+
+
+def request_deadline(request: Request) -> Deadline:
+    """Deadline aus X-Request-Timeout (Sekunden), höchstens request_timeout_seconds."""
+    seconds = settings.request_timeout_seconds
+    header = request.headers.get("X-Request-Timeout")
+    if header:
+        try:
+            seconds = min(seconds, float(header))
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid X-Request-Timeout: {header}"
+            )
+    return Deadline(max(0.0, seconds))
+
+
+async def _watch_disconnect(request: Request, deadline: Deadline, flight: Optional[Flight] = None):
+    """
+    Auf das Verbindungsende warten und die Verarbeitung dann stoppen.
+    Der Body ist bereits gelesen - die nächste ASGI-Nachricht ist der Disconnect.
+    Wartet ein identischer Request auf das Ergebnis (oder kommt innerhalb der
+    Grace-Zeit als Retry), wird für ihn weitergerechnet.
+    """
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            if await get_single_flight().wanted_after_disconnect(
+                flight, settings.coalesce_disconnect_grace_seconds
+            ):
+                logger.info("Client disconnected, identical request waiting - continuing processing")
+                return
+            logger.info("Client disconnected, cancelling processing")
+            deadline.cancel("Client disconnected")
+            return
+
+
+async def _release_after(
+    body_iterator,
+    ticket: LaneTicket,
+    watcher: Optional[asyncio.Task] = None,
+    profile: Optional[MemoryProfile] = None,
+) -> AsyncIterator[bytes]:
+    """Streaming-Body durchreichen und danach den Lane-Platz freigeben."""
+    if not hasattr(body_iterator, "__aiter__"):
+        body_iterator = iterate_in_threadpool(body_iterator)
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        if watcher:
+            watcher.cancel()
+        ticket.release()
+        finish_profile(profile)
+
+
+def validate_priority(priority: str):
+    """Priorität prüfen (normal, low)."""
+    if priority not in PRIORITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid priority: {priority} (allowed: {', '.join(PRIORITIES)})"
+        )
+
+
+def validate_upload(content: bytes):
+    """Dateigröße prüfen."""
     size_mb = len(content) / (1024 * 1024)
 
     if size_mb > settings.max_file_size_mb:
@@ -48,30 +271,55 @@ async def anonymize_document(
             detail=f"File too large. Maximum: {settings.max_file_size_mb}MB"
         )
 
+
+def process_document(
+    content: bytes,
+    filename: str,
+    output_format: str,
+    language: str,
+    progress: Optional[ProgressCallback] = None,
+    stream: bool = False,
+    include_entities: bool = False,
+) -> Response:
+    """
+    Dokument anhand des Dateityps verarbeiten.
+    Wird vom synchronen Endpoint und von der Job-Queue genutzt.
+
+    Args:
+        progress: Optionaler Callback für Seitenfortschritt (pages_done, pages_total)
+        stream: PDF-Ergebnisse seitenweise streamen (andere Typen ignorieren das)
+        include_entities: Quelltext und Entities im JSON-Text-Output mitliefern
+    """
+
     # Dateityp erkennen
-    file_type = detect_file_type(content, file.filename)
+    file_type = detect_file_type(content, filename)
 
     try:
         if file_type == FileType.PDF:
-            return await process_pdf(content, output_format, language)
+            response = process_pdf(
+                content, output_format, language, progress, stream, include_entities
+            )
 
         elif file_type == FileType.IMAGE:
-            return await process_image(content, output_format, language)
+            response = process_image(content, output_format, language, include_entities)
 
         elif file_type == FileType.DOCX:
-            return await process_docx(content, language)
+            response = process_docx(content, output_format, language, include_entities)
 
         elif file_type == FileType.TEXT:
-            return await process_text(content.decode('utf-8'), language)
+            response = process_text(content.decode('utf-8'), language, include_entities)
 
         else:
             raise HTTPException(
                 status_code=415,
-                detail=f"Unsupported file type: {file.filename}"
+                detail=f"Unsupported file type: {filename}"
             )
 
     except HTTPException:
         raise
+    except DeadlineExceeded as e:
+        logger.warning(f"Processing stopped: {e.reason}")
+        raise HTTPException(status_code=504, detail=e.reason)
     except Exception as e:
         logger.error(f"Processing error: {e}")
         raise HTTPException(
@@ -79,68 +327,269 @@ async def anonymize_document(
             detail=f"Processing error: {str(e)}"
         )
 
-
-async def process_pdf(content: bytes, output_format: str, language: str):
+    # Verwendete Qualitätsstufe (Jobs übernehmen die X-Header ins Ergebnis)
+    quality = current_quality()
+    response.headers["X-Quality-Level"] = str(quality.level)
+    if quality.fast:
+        response.headers["X-Fast-Mode"] = "true"
+    return response
+
+
+def process_pdf(
+    content: bytes,
+    output_format: str,
+    language: str,
+    progress: Optional[ProgressCallback] = None,
+    stream: bool = False,
+    include_entities: bool = False,
+):
     """PDF verarbeiten - Text-PDF oder Scan erkennen."""
+    quality = current_quality()
+    processor = fast_pdf_processor if fast_mode() else pdf_processor
 
-    # Lazy Load der Services
-    text_anonymizer = get_anonymizer()
-    image_anonymizer = get_image_anonymizer()
+    # Text-PDF oder Scan? Liest nur die ersten Seiten - immer mit dem konfigurierten
+    # Extractor, damit die Entscheidung zur Lane aus estimate_cost passt
+    is_text_pdf = pdf_processor.has_text_layer(content)
+
+    if is_text_pdf and output_format == "pdf":
+        # Text-PDF: Schwärzung anhand der Zeichenkoordinaten, ohne Rasterisierung
+        result = pdf_redactor.redact(content, get_anonymizer(), language, get_image_anonymizer())
+
+        return Response(
+            content=result.pdf_bytes,
+            media_type="application/pdf",
+            headers={
+                "X-Original-Type": "pdf_text",
+                "X-PII-Found": str(result.pii_found),
+                "X-Pages-Processed": str(result.pages_processed),
+                "X-Pages-Rasterized": str(result.pages_rasterized),
+            }
+        )
+
+    if is_text_pdf:
+        pages = processor.extract_pages(content)
+        if stream:
+            return stream_text_pages(pages, language)
+
+        # Text-PDF: Text anonymisieren (leere Seiten entfallen)
+        text_anonymizer = get_anonymizer()
+        pages = [page for page in pages if page]
+        text = "\n\n".join(pages)
+        anonymized_text = text_anonymizer.anonymize_pages(pages, language)
+
+        return JSONResponse(_text_payload(
+            {
+                "type": "text",
+                "original_type": "pdf_text",
+                "anonymized_text": anonymized_text,
+                "pii_found": text_anonymizer.last_pii_count,
+            },
+            text,
+            text_anonymizer.last_results,
+            include_entities,
+        ))
+
+    if stream:
+        return stream_scan_pages(content, output_format, language)
 
-    # Prüfen ob PDF Text enthält
-    text = pdf_processor.extract_text(content)
+    else:
+        # Scan-PDF: Bild-Anonymisierung, Seite für Seite
+        image_anonymizer = get_image_anonymizer()
 
-    if text and len(text.strip()) > 100:
-        # Text-PDF: Text anonymisieren
-        anonymized_text = text_anonymizer.anonymize(text, language)
+        if output_format != "text" and settings.pdf_native_images:
+            # Eingebettete Scan-Bilder in nativer Auflösung schwärzen, nur diese Streams ersetzen
+            result = scan_redactor.redact(
+                content, image_anonymizer, language, last_page=settings.max_pages, progress=progress
+            )
+            if result is not None:
+                return Response(
+                    content=result.pdf_bytes,
+                    media_type="application/pdf",
+                    headers={
+                        "X-Original-Type": "pdf_scan",
+                        "X-PII-Found": str(result.pii_found),
+                        "X-Pages-Processed": str(result.pages_processed),
+                        "X-Pages-Rasterized": str(result.pages_rendered),
+                    }
+                )
+
+        with pdf_processor.render_pages(content, dpi=quality.render_dpi, last_page=settings.max_pages) as pages:
+
+            def anonymized_pages() -> Iterator[Image.Image]:
+                for i, img in enumerate(pages):
+                    yield image_anonymizer.anonymize(img, language)
+                    if progress:
+                        progress(i + 1, len(pages))
+
+            if output_format == "text":
+                # OCR auf anonymisiertem Bild
+                text = image_anonymizer.extract_text_from_images(anonymized_pages())
+                return JSONResponse({
+                    "type": "text",
+                    "original_type": "pdf_scan",
+                    "anonymized_text": text,
+                    "pages_processed": len(pages),
+                })
+
+            else:
+                # Anonymisiertes PDF zurückgeben - Seiten werden sofort kodiert
+                pdf_bytes = pdf_processor.images_to_pdf(anonymized_pages(), quality.render_dpi)
+                return Response(
+                    content=pdf_bytes,
+                    media_type="application/pdf",
+                    headers={
+                        "X-Original-Type": "pdf_scan",
+                        "X-Pages-Processed": str(len(pages)),
+                    }
+                )
+
+
+def stream_text_pages(pages: List[str], language: str) -> StreamingResponse:
+    """Text-PDF seitenweise anonymisieren und als NDJSON streamen."""
+    text_anonymizer = get_anonymizer()
 
-        return JSONResponse({
+    def generate() -> Iterator[bytes]:
+        pii_total = 0
+        pages_processed = 0
+        try:
+            page_results = text_anonymizer.iter_analyze_pages(pages, language)
+            for i, (page_text, results) in enumerate(zip(pages, page_results)):
+                anonymized_text = render_entities(page_text, results) if results else page_text
+                pii_found = len(results)
+                pii_total += pii_found
+
+                yield _ndjson({
+                    "page": i + 1,
+                    "pages_total": len(pages),
+                    "anonymized_text": anonymized_text,
+                    "pii_found": pii_found,
+                })
+                pages_processed += 1
+        except DeadlineExceeded as e:
+            logger.warning(f"Streaming stopped after {pages_processed} pages: {e.reason}")
+            yield _ndjson({"error": e.reason, "partial": True, "pages_processed": pages_processed})
+            return
+        except Exception as e:
+            logger.error(f"Streaming error: {e}")
+            yield _ndjson({"error": f"Processing error: {str(e)}"})
+            return
+
+        yield _ndjson({
+            "done": True,
             "type": "text",
             "original_type": "pdf_text",
-            "anonymized_text": anonymized_text,
-            "pii_found": text_anonymizer.last_pii_count,
+            "pages_processed": len(pages),
+            "pii_found": pii_total,
         })
 
-    else:
-        # Scan-PDF: Bild-Anonymisierung
-        images = pdf_processor.pdf_to_images(content)
-        anonymized_images = []
-
-        for img in images[:settings.max_pages]:
-            anonymized = image_anonymizer.anonymize(img, language)
-            anonymized_images.append(anonymized)
-
-        if output_format == "text":
-            # OCR auf anonymisiertem Bild
-            text = image_anonymizer.extract_text_from_images(anonymized_images)
-            return JSONResponse({
-                "type": "text",
-                "original_type": "pdf_scan",
-                "anonymized_text": text,
-                "pages_processed": len(anonymized_images),
-            })
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"X-Original-Type": "pdf_text"},
+    )
 
-        else:
-            # Anonymisiertes PDF zurückgeben
-            pdf_bytes = pdf_processor.images_to_pdf(anonymized_images)
-            return Response(
-                content=pdf_bytes,
-                media_type="application/pdf",
-                headers={
-                    "X-Original-Type": "pdf_scan",
-                    "X-Pages-Processed": str(len(anonymized_images)),
-                }
-            )
 
+def stream_scan_pages(
+    content: bytes,
+    output_format: str,
+    language: str,
+) -> StreamingResponse:
+    """
+    Scan-PDF seitenweise anonymisieren und streamen.
+    Text-Output als NDJSON, sonst ein inkrementell geschriebenes PDF.
+    """
+    image_anonymizer = get_image_anonymizer()
+    quality = current_quality()
+
+    def anonymized_pages() -> Iterator[Image.Image]:
+        # Temp-Verzeichnis lebt, solange die Antwort gestreamt wird
+        with pdf_processor.render_pages(content, dpi=quality.render_dpi, last_page=settings.max_pages) as pages:
+            for img in pages:
+                yield image_anonymizer.anonymize(img, language)
+
+    def generate_text() -> Iterator[bytes]:
+        pages_processed = 0
+        try:
+            for anonymized in anonymized_pages():
+                pages_processed += 1
+                yield _ndjson({
+                    "page": pages_processed,
+                    "anonymized_text": image_anonymizer.extract_text(anonymized),
+                })
+        except DeadlineExceeded as e:
+            logger.warning(f"Streaming stopped after {pages_processed} pages: {e.reason}")
+            yield _ndjson({"error": e.reason, "partial": True, "pages_processed": pages_processed})
+            return
+        except Exception as e:
+            logger.error(f"Streaming error: {e}")
+            yield _ndjson({"error": f"Processing error: {str(e)}"})
+            return
+
+        yield _ndjson({
+            "done": True,
+            "type": "text",
+            "original_type": "pdf_scan",
+            "pages_processed": pages_processed,
+        })
+
+    def generate_pdf() -> Iterator[bytes]:
+        writer = pdf_processor.create_writer(quality.render_dpi)
+        yield writer.begin()
+        try:
+            for anonymized in anonymized_pages():
+                yield writer.add_page(anonymized)
+        except DeadlineExceeded as e:
+            # Gültiges PDF mit den fertigen Seiten abschließen
+            logger.warning(f"Streaming stopped after {writer.page_count} pages: {e.reason}")
+        except Exception as e:
+            # Status ist schon gesendet - Abbruch führt zu unvollständigem PDF
+            logger.error(f"Streaming error after {writer.page_count} pages: {e}")
+            raise
+        yield writer.finish()
 
-async def process_image(content: bytes, output_format: str, language: str):
-    """Bild verarbeiten."""
-    from PIL import Image
+    if output_format == "text":
+        return StreamingResponse(
+            generate_text(),
+            media_type="application/x-ndjson",
+            headers={"X-Original-Type": "pdf_scan"},
+        )
 
+    return StreamingResponse(
+        generate_pdf(),
+        media_type="application/pdf",
+        headers={"X-Original-Type": "pdf_scan"},
+    )
+
+
+def _text_payload(payload: dict, source_text: Optional[str], results, include_entities: bool) -> dict:
+    """Text-Antwort optional um Quelltext und Entities ergänzen (für POST /render)."""
+    if include_entities:
+        payload["source_text"] = source_text or ""
+        payload["entities"] = [entity_to_dict(result) for result in results]
+    return payload
+
+
+def _ndjson(data: dict) -> bytes:
+    return (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def process_image(
+    content: bytes,
+    output_format: str,
+    language: str,
+    include_entities: bool = False,
+):
+    """Bild verarbeiten."""
     image_anonymizer = get_image_anonymizer()
     text_anonymizer = get_anonymizer()
 
-    img = Image.open(io.BytesIO(content))
+    # Gleiche Normalisierung für Text- und Bild-Output
+    try:
+        img = load_image(content)
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnidentifiedImageError:
+        raise HTTPException(status_code=415, detail="Unsupported or corrupt image")
 
     if output_format == "text":
         # Besserer Ansatz für Text-Output:
@@ -149,55 +598,90 @@ async def process_image(content: bytes, output_format: str, language: str):
         raw_text = image_anonymizer.extract_text(img, language)
         anonymized_text = text_anonymizer.anonymize(raw_text, language)
 
-        return JSONResponse({
-            "type": "text",
-            "original_type": "image",
-            "anonymized_text": anonymized_text,
-            "pii_found": text_anonymizer.last_pii_count,
-        })
+        return JSONResponse(_text_payload(
+            {
+                "type": "text",
+                "original_type": "image",
+                "anonymized_text": anonymized_text,
+                "pii_found": text_anonymizer.last_pii_count,
+            },
+            raw_text,
+            text_anonymizer.last_results,
+            include_entities,
+        ))
 
     else:
         # Bild-Output: Visuelles Schwärzen
         anonymized = image_anonymizer.anonymize(img, language)
 
-        img_bytes = io.BytesIO()
-        anonymized.save(img_bytes, format="PNG")
+        img_bytes, media_type = encode_image(
+            anonymized,
+            settings.image_output_format,
+            quality=settings.image_output_quality,
+            png_compress_level=settings.png_compress_level,
+        )
 
         return Response(
-            content=img_bytes.getvalue(),
-            media_type="image/png",
+            content=img_bytes,
+            media_type=media_type,
             headers={"X-Original-Type": "image"}
         )
 
 
-async def process_docx(content: bytes, language: str):
-    """DOCX verarbeiten."""
-    from docx import Document
-
+def process_docx(
+    content: bytes,
+    output_format: str,
+    language: str,
+    include_entities: bool = False,
+):
+    """DOCX verarbeiten - alle Textbereiche, optional als geschwärztes DOCX."""
     text_anonymizer = get_anonymizer()
 
-    doc = Document(io.BytesIO(content))
-    full_text = "\n".join([para.text for para in doc.paragraphs])
+    result = docx_processor.anonymize(
+        content,
+        text_anonymizer,
+        language,
+        write_docx=output_format == "docx",
+        include_entities=include_entities,
+    )
 
-    anonymized_text = text_anonymizer.anonymize(full_text, language)
+    if output_format == "docx":
+        return Response(
+            content=result.docx_bytes,
+            media_type=DOCX_MEDIA_TYPE,
+            headers={
+                "X-Original-Type": "docx",
+                "X-PII-Found": str(result.pii_found),
+            }
+        )
 
-    return JSONResponse({
-        "type": "text",
-        "original_type": "docx",
-        "anonymized_text": anonymized_text,
-        "pii_found": text_anonymizer.last_pii_count,
-    })
+    return JSONResponse(_text_payload(
+        {
+            "type": "text",
+            "original_type": "docx",
+            "anonymized_text": result.anonymized_text,
+            "pii_found": result.pii_found,
+        },
+        result.source_text,
+        result.entities,
+        include_entities,
+    ))
 
 
-async def process_text(text: str, language: str):
+def process_text(text: str, language: str, include_entities: bool = False):
     """Plain Text verarbeiten."""
     text_anonymizer = get_anonymizer()
 
     anonymized_text = text_anonymizer.anonymize(text, language)
 
-    return JSONResponse({
-        "type": "text",
-        "original_type": "text",
-        "anonymized_text": anonymized_text,
-        "pii_found": text_anonymizer.last_pii_count,
-    })
+    return JSONResponse(_text_payload(
+        {
+            "type": "text",
+            "original_type": "text",
+            "anonymized_text": anonymized_text,
+            "pii_found": text_anonymizer.last_pii_count,
+        },
+        text,
+        text_anonymizer.last_results,
+        include_entities,
+    ))
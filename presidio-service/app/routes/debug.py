@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+import logging
+
+from app.config import settings
+from app.services import memory
+from app.services.memory_watchdog import get_memory_watchdog
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def require_debug():
+    """Diagnose-Endpoints nur mit DEBUG=true."""
+    if not settings.debug:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+def _tracemalloc_call(func, *args):
+    try:
+        return func(*args)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/debug/memory", dependencies=[Depends(require_debug)])
+async def memory_overview():
+    """
+    Speicherzustand des Workers.
+
+    Returns:
+        JSON mit RSS, Watchdog-Status, tracemalloc-Status und den
+        Speicherprofilen der letzten Requests (RSS je Schritt)
+    """
+    watchdog = get_memory_watchdog()
+    return {
+        "rss_mb": round(memory.rss_bytes() / memory.MB, 1),
+        "rss_high_water_mb": round(memory.rss_high_water_bytes() / memory.MB, 1),
+        "watchdog": watchdog.stats() if watchdog else None,
+        "tracemalloc": memory.tracing_stats(),
+        "recent_requests": memory.recent_profiles(),
+    }
+
+
+@router.post("/debug/memory/tracemalloc", dependencies=[Depends(require_debug)])
+async def toggle_tracemalloc(
+    enabled: bool = Query(True),
+    frames: int = Query(settings.memory_tracemalloc_frames, ge=1, le=100),
+):
+    """tracemalloc starten oder stoppen (Overhead nur während der Diagnose)."""
+    if enabled:
+        memory.start_tracing(frames)
+    else:
+        memory.stop_tracing()
+    return memory.tracing_stats()
+
+
+@router.get("/debug/memory/top", dependencies=[Depends(require_debug)])
+async def top_allocations(
+    limit: int = Query(20, ge=1, le=200),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+):
+    """Größte lebende Allokationen laut tracemalloc (409, wenn tracemalloc aus ist)."""
+    return {
+        "tracemalloc": memory.tracing_stats(),
+        "top": _tracemalloc_call(memory.top_allocations, limit, group_by),
+    }
+
+
+@router.post("/debug/memory/snapshot", dependencies=[Depends(require_debug)])
+async def take_snapshot():
+    """Basis-Snapshot für /debug/memory/diff setzen."""
+    _tracemalloc_call(memory.take_baseline)
+    return memory.tracing_stats()
+
+
+@router.get("/debug/memory/diff", dependencies=[Depends(require_debug)])
+async def snapshot_diff(
+    limit: int = Query(20, ge=1, le=200),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+):
+    """
+    Zuwachs der Allokationen seit POST /debug/memory/snapshot.
+
+    Typischer Ablauf: Snapshot setzen, einige Scans anonymisieren, Diff
+    abrufen - was hier wächst, bleibt über Requests hinweg liegen.
+    """
+    return {
+        "tracemalloc": memory.tracing_stats(),
+        "diff": _tracemalloc_call(memory.diff_from_baseline, limit, group_by),
+    }
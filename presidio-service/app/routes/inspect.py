@@ -0,0 +1,26 @@
+from fastapi import APIRouter, UploadFile, File
+from starlette.concurrency import run_in_threadpool
+import logging
+
+from app.routes.anonymize import validate_upload
+from app.services.document_inspector import inspect_document
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.post("/inspect")
+async def inspect(file: UploadFile = File(...)):
+    """
+    Dokument vorab prüfen, ohne NLP oder OCR auszuführen.
+
+    Returns:
+        JSON mit Dateityp, Seitenzahl, Text/Scan pro Seite, Bildgrößen,
+        Lane, geschätzter Laufzeit und Empfehlung (sync = POST /anonymize,
+        async = POST /jobs)
+    """
+    content = await file.read()
+    validate_upload(content)
+
+    info = await run_in_threadpool(inspect_document, content, file.filename or "")
+    return info.to_dict()
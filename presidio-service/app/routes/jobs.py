@@ -0,0 +1,233 @@
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi.responses import JSONResponse, Response
+from typing import Optional
+import asyncio
+import logging
+import threading
+import time
+
+from app.routes.anonymize import process_document, validate_priority, validate_upload
+from app.services.admission import LaneSaturated, LaneTicket, get_admission_controller
+from app.services.cost_estimator import estimate_cost
+from app.services.job_queue import (
+    JobFailed,
+    JobQueue,
+    JobQueueFull,
+    JobRequest,
+    JobResult,
+    ProgressCallback,
+    create_job_queue,
+)
+from app.services.job_store import JobStatus, create_job_store
+from app.services.load_controller import PRIORITY_NORMAL, get_load_controller, set_quality
+from app.utils.file_detector import detect_file_type, FileType
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Singleton Pattern: Queue und Worker starten erst beim ersten Job
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+# Event Loop des Servers - die Lanes (asyncio) werden von dort aus belegt
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_job(request: JobRequest, progress: ProgressCallback) -> JobResult:
+    """Job mit derselben Pipeline wie der synchrone Endpoint verarbeiten."""
+    # Wie beim synchronen Endpoint: erst die passende Lane (Text/OCR), dann die Stufe
+    ticket = _acquire_lane(request)
+    try:
+        # Stufe nach der Last beim Start des Jobs (im Worker-Thread je Job neu gesetzt)
+        set_quality(get_load_controller().level_for(request.priority))
+        response = process_document(
+            request.content,
+            request.filename,
+            request.output_format,
+            request.language,
+            progress,
+            include_entities=request.include_entities,
+        )
+    except HTTPException as e:
+        raise JobFailed(e.status_code, str(e.detail))
+    finally:
+        if ticket is not None and not _event_loop.is_closed():
+            _event_loop.call_soon_threadsafe(ticket.release)
+
+    headers = {
+        key: value
+        for key, value in response.headers.items()
+        if key.lower().startswith("x-")
+    }
+    return JobResult(
+        body=bytes(response.body),
+        media_type=response.media_type,
+        headers=headers,
+    )
+
+
+def _acquire_lane(request: JobRequest) -> Optional[LaneTicket]:
+    """
+    Platz in der Lane des Jobs belegen (aus dem Worker-Thread über den Event Loop).
+
+    Ist die Lane voll, wartet der Job Retry-After Sekunden und versucht es
+    erneut - Jobs haben keine wartende HTTP-Verbindung. Ohne Server-Loop
+    (CLI, eigener Prozess pro Datei) gibt es keine Lanes.
+    """
+    loop = _event_loop
+    if loop is None or loop.is_closed():
+        return None
+
+    cost = estimate_cost(request.content, request.filename)
+    while True:
+        admitted = asyncio.run_coroutine_threadsafe(get_admission_controller().admit(cost), loop)
+        try:
+            return admitted.result()
+        except LaneSaturated as e:
+            logger.info(f"Lane {e.lane} saturated, job retries in {e.retry_after}s")
+            time.sleep(e.retry_after)
+
+
+def get_job_queue() -> JobQueue:
+    """Lazy Loading Singleton für die JobQueue."""
+    global _job_queue, _event_loop
+
+    if _event_loop is None:
+        try:
+            _event_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                queue = create_job_queue(create_job_store(), run_job)
+                queue.start()
+                _job_queue = queue
+
+    return _job_queue
+
+
+def pending_jobs() -> int:
+    """Wartende und laufende Jobs (0, solange die Queue nicht gestartet ist)."""
+    queue = _job_queue
+    return queue.pending if queue is not None else 0
+
+
+def volatile_jobs() -> int:
+    """Offene oder nicht abgeholte Jobs, die nur im Speicher dieses Workers liegen."""
+    queue = _job_queue
+    return queue.store.volatile_jobs() if queue is not None else 0
+
+
+def shutdown_job_queue():
+    """Worker beim Herunterfahren stoppen (falls gestartet)."""
+    global _job_queue
+
+    with _job_queue_lock:
+        if _job_queue is not None:
+            _job_queue.stop()
+            _job_queue = None
+
+
+@router.post("/jobs", status_code=202)
+async def create_job(
+    file: UploadFile = File(...),
+    output_format: Optional[str] = Form("auto"),  # auto, text, image
+    language: Optional[str] = Form("de"),
+    include_entities: bool = Form(False),
+    priority: Optional[str] = Form(PRIORITY_NORMAL),  # normal, low
+):
+    """
+    Anonymisierung als asynchronen Job starten.
+
+    Gibt sofort eine Job-ID zurück. Status über GET /jobs/{job_id},
+    Ergebnis über GET /jobs/{job_id}/result abrufen.
+    Parameter wie bei POST /anonymize.
+    """
+
+    content = await file.read()
+    validate_upload(content)
+    validate_priority(priority)
+
+    if detect_file_type(content, file.filename) == FileType.UNKNOWN:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported file type: {file.filename}"
+        )
+
+    try:
+        job = get_job_queue().submit(
+            JobRequest(
+                content=content,
+                filename=file.filename or "",
+                output_format=output_format,
+                language=language,
+                include_entities=include_entities,
+                priority=priority,
+            )
+        )
+    except JobQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Job queue full, retry later",
+            headers={"Retry-After": "30"},
+        )
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            **job.to_dict(),
+            "status_url": f"/api/v1/jobs/{job.id}",
+            "result_url": f"/api/v1/jobs/{job.id}/result",
+        },
+        headers={"Location": f"/api/v1/jobs/{job.id}"},
+    )
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Status und Seitenfortschritt eines Jobs."""
+    job = get_job_queue().store.get(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Ergebnis eines fertigen Jobs abrufen.
+
+    Returns:
+        - 200 mit dem gleichen Inhalt wie POST /anonymize
+        - 409 solange der Job noch läuft
+        - Fehlerstatus des Jobs, falls er gescheitert ist
+    """
+    job = get_job_queue().store.get(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(
+            status_code=job.error_status or 500,
+            detail=job.error or "Job failed",
+        )
+
+    if job.status != JobStatus.DONE:
+        return JSONResponse(
+            status_code=409,
+            content=job.to_dict(),
+            headers={"Retry-After": "5"},
+        )
+
+    get_job_queue().store.mark_delivered(job.id)
+
+    return Response(
+        content=job.result,
+        media_type=job.result_media_type,
+        headers={**job.result_headers, "X-Job-Id": job.id},
+    )
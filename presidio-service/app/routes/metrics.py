@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+import logging
+
+from app.services.admission import get_admission_controller
+from app.services.load_controller import get_load_controller
+from app.services.ocr_cache import get_ocr_cache
+from app.services.ocr_regions import region_stats
+from app.services.single_flight import get_single_flight
+from app.services.text_anonymizer import nlp_batch_stats
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Laufzeit-Kennzahlen des Workers.
+
+    Returns:
+        JSON mit Auslastung der Lanes (Text/OCR), Trefferquote des OCR-Caches,
+        Anteil tatsächlich OCRter Seitenfläche, Batchgrößen des NER-Batchers,
+        zusammengefassten identischen Requests und der aktuellen Qualitätsstufe
+        (Last, Stufenwechsel, Requests je Stufe)
+    """
+    return {
+        "lanes": get_admission_controller().stats(),
+        "ocr_cache": get_ocr_cache().stats(),
+        "ocr_regions": region_stats.to_dict(),
+        "nlp_batcher": nlp_batch_stats(),
+        "coalescing": get_single_flight().stats(),
+        "quality": get_load_controller().stats(),
+    }
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, HTTPException
+from presidio_analyzer import RecognizerResult
+from presidio_anonymizer.entities import InvalidParamError, OperatorConfig
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+import logging
+
+from app.services.text_anonymizer import render_entities
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class EntitySpan(BaseModel):
+    """Entity wie in der entities-Liste von POST /anonymize."""
+
+    entity_type: str
+    start: int
+    end: int
+    score: float = 1.0
+    recognizer: Optional[str] = None
+
+
+class RenderRequest(BaseModel):
+    text: str
+    entities: List[EntitySpan]
+    # Entity-Typ (oder "DEFAULT") -> {"type": "replace", "new_value": "..."}
+    operators: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+@router.post("/render")
+async def render(request: RenderRequest):
+    """
+    Gespeicherte Entities mit einer anderen Operator-Map erneut anwenden.
+
+    text und entities kommen aus POST /anonymize mit include_entities=true
+    (source_text und entities). Ohne operators werden die Standard-Platzhalter
+    verwendet. Es werden keine NLP-Modelle geladen.
+
+    Returns:
+        JSON mit anonymized_text und pii_found
+    """
+    length = len(request.text)
+    for span in request.entities:
+        if not 0 <= span.start < span.end <= length:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Invalid span {span.start}-{span.end} for {span.entity_type} (text length {length})"
+            )
+
+    results = [
+        RecognizerResult(span.entity_type, span.start, span.end, span.score)
+        for span in request.entities
+    ]
+
+    operators = None
+    if request.operators is not None:
+        operators = {}
+        for entity_type, config in request.operators.items():
+            params = dict(config)
+            operator_name = params.pop("type", None)
+            if not operator_name:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Operator for {entity_type} needs a type"
+                )
+            operators[entity_type] = OperatorConfig(operator_name, params)
+
+    try:
+        anonymized_text = render_entities(request.text, results, operators)
+    except (InvalidParamError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid operator: {str(e)}")
+
+    return {
+        "anonymized_text": anonymized_text,
+        "pii_found": len(results),
+    }
@@ -0,0 +1,187 @@
+from typing import Dict, Optional
+import asyncio
+import logging
+import math
+import threading
+import time
+
+from app.config import settings
+from app.services.cost_estimator import LANE_OCR, LANE_TEXT, RequestCost
+from app.utils.deadline import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+# Singleton Pattern: Lanes werden beim ersten Request aus den Settings erzeugt
+_admission_instance: Optional["AdmissionController"] = None
+_admission_lock = threading.Lock()
+
+
+class LaneSaturated(Exception):
+    """Lane ist voll - Request wird mit 429 abgewiesen."""
+
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"Lane '{lane}' saturated")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class Lane:
+    """
+    Concurrency-Lane mit eigenem Limit, Warteschlange und Timeout.
+
+    Die Laufzeit pro geschätzter Sekunde wird als gleitender Mittelwert
+    mitgeschrieben; daraus ergibt sich der Retry-After-Wert bei Überlast.
+    """
+
+    # Gewicht neuer Messungen im gleitenden Mittelwert
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+
+        self._semaphore = asyncio.Semaphore(self.limit)
+        self._waiting = 0
+        self._running = 0
+        self._pending_cost = 0.0    # geschätzte Sekunden: wartend + laufend
+        self._cost_ratio = 1.0      # tatsächliche / geschätzte Laufzeit
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def retry_after(self) -> int:
+        """Geschätzte Sekunden, bis die Lane wieder Platz hat."""
+        seconds = self._pending_cost * self._cost_ratio / self.limit
+        return max(1, math.ceil(seconds))
+
+    async def acquire(self, cost: RequestCost, timeout: Optional[float] = None) -> "LaneTicket":
+        """
+        Platz in der Lane belegen.
+
+        Args:
+            timeout: Maximale Wartezeit (z.B. Rest-Deadline), höchstens queue_timeout
+
+        Raises:
+            LaneSaturated: Warteschlange voll oder queue_timeout beim Warten
+            DeadlineExceeded: timeout (Rest-Deadline) abgelaufen, vor oder während des Wartens
+        """
+        if timeout is not None and timeout <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded before admission to lane '{self.name}'")
+
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            raise LaneSaturated(self.name, self.retry_after())
+
+        self._waiting += 1
+        self._pending_cost += cost.estimated_seconds
+        admitted = False
+        try:
+            if self._semaphore.locked():
+                wait = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+                try:
+                    await asyncio.wait_for(self._semaphore.acquire(), timeout=wait)
+                except asyncio.TimeoutError:
+                    if timeout is not None and timeout <= self.queue_timeout:
+                        raise DeadlineExceeded(
+                            f"Deadline exceeded while waiting for lane '{self.name}'"
+                        )
+                    raise LaneSaturated(self.name, self.retry_after())
+            else:
+                # Freier Platz - sofort belegen, auch bei knapper Deadline
+                await self._semaphore.acquire()
+            admitted = True
+        finally:
+            self._waiting -= 1
+            # Auch bei Abbruch (CancelledError, Client weg) - sonst wächst retry_after dauerhaft
+            if not admitted:
+                self._pending_cost = max(0.0, self._pending_cost - cost.estimated_seconds)
+
+        self._running += 1
+        return LaneTicket(self, cost)
+
+    def _release(self, cost: RequestCost, duration: float):
+        self._running -= 1
+        self._pending_cost = max(0.0, self._pending_cost - cost.estimated_seconds)
+        if cost.estimated_seconds > 0:
+            ratio = duration / cost.estimated_seconds
+            self._cost_ratio += self.EWMA_ALPHA * (ratio - self._cost_ratio)
+        self._semaphore.release()
+
+
+class LaneTicket:
+    """Belegter Platz in einer Lane. release() ist idempotent."""
+
+    def __init__(self, lane: Lane, cost: RequestCost):
+        self.lane = lane
+        self.cost = cost
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self.lane._release(self.cost, time.monotonic() - self._started)
+
+
+class AdmissionController:
+    """
+    Verteilt Requests nach geschätzten Kosten auf getrennte Lanes.
+
+    Text-CVs (Text, DOCX, Text-PDFs) und OCR-Arbeit (Scans, Bilder) haben
+    eigene Limits - ein Burst an Scans blockiert keine Text-Requests.
+    """
+
+    def __init__(self, lanes: Dict[str, Lane]):
+        self.lanes = lanes
+
+    async def admit(self, cost: RequestCost, timeout: Optional[float] = None) -> LaneTicket:
+        lane = self.lanes[cost.lane]
+        ticket = await lane.acquire(cost, timeout)
+        logger.debug(
+            f"Admitted to lane {lane.name} "
+            f"(~{cost.estimated_seconds:.1f}s, running {lane.running}/{lane.limit})"
+        )
+        return ticket
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "running": lane.running,
+                "waiting": lane.waiting,
+                "limit": lane.limit,
+                "retry_after": lane.retry_after(),
+            }
+            for name, lane in self.lanes.items()
+        }
+
+
+def get_admission_controller() -> AdmissionController:
+    """Lazy Loading Singleton für die Admission Control."""
+    global _admission_instance
+
+    if _admission_instance is None:
+        with _admission_lock:
+            if _admission_instance is None:
+                _admission_instance = AdmissionController({
+                    LANE_TEXT: Lane(
+                        LANE_TEXT,
+                        settings.lane_text_concurrency,
+                        settings.lane_text_max_queue,
+                        settings.lane_text_queue_timeout,
+                    ),
+                    LANE_OCR: Lane(
+                        LANE_OCR,
+                        settings.lane_ocr_concurrency,
+                        settings.lane_ocr_max_queue,
+                        settings.lane_ocr_queue_timeout,
+                    ),
+                })
+
+    return _admission_instance
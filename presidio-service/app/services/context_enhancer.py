@@ -0,0 +1,176 @@
+from bisect import bisect_right
+from presidio_analyzer import EntityRecognizer, RecognizerResult
+from presidio_analyzer.context_aware_enhancers import ContextAwareEnhancer, LemmaContextAwareEnhancer
+from presidio_analyzer.nlp_engine import NlpArtifacts
+from typing import Dict, List, Optional, Tuple
+import copy
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _LemmaIndex:
+    """
+    Token- und Keyword-Positionen eines Dokuments, einmal pro analyze() aufgebaut.
+
+    keyword_count[i] = Anzahl Keyword-Lemmas vor Token i (Präfixsumme) - damit
+    sind die n Keywords vor/nach einem Token ein Slice statt einer Schleife
+    über alle Lemmas dazwischen.
+    """
+
+    def __init__(self, nlp_artifacts: NlpArtifacts):
+        tokens = nlp_artifacts.tokens
+        self.token_ends = [
+            start + len(token) for start, token in zip(nlp_artifacts.tokens_indices, tokens)
+        ]
+
+        keywords = set(nlp_artifacts.keywords)
+        lemmas = [lemma.lower() for lemma in nlp_artifacts.lemmas]
+        self.keyword_positions = [i for i, lemma in enumerate(lemmas) if lemma in keywords]
+        self.keyword_lemmas = [lemmas[i] for i in self.keyword_positions]
+
+        self.keyword_count = [0] * (len(lemmas) + 1)
+        for position in self.keyword_positions:
+            self.keyword_count[position + 1] = 1
+        for i in range(len(lemmas)):
+            self.keyword_count[i + 1] += self.keyword_count[i]
+
+    def token_at(self, start: int) -> int:
+        """
+        Index des Tokens, das die Position start enthält oder danach beginnt
+        (wie LemmaContextAwareEnhancer._find_index_of_match_token).
+        """
+        index = bisect_right(self.token_ends, start)
+        if index == len(self.token_ends):
+            raise ValueError(f"Did not find a token at position {start}")
+        return index
+
+    def window(self, token_index: int, prefix_count: int, suffix_count: int) -> Tuple[int, int, int, int]:
+        """Slices der Keywords vor (inkl.) und ab dem Token - wie _add_n_words (+1 für das Token selbst)."""
+        before = self.keyword_count[token_index + 1]
+        after = self.keyword_count[token_index]
+        return (
+            max(0, before - prefix_count - 1),
+            before,
+            after,
+            min(len(self.keyword_positions), after + suffix_count + 1),
+        )
+
+    def words(self, window: Tuple[int, int, int, int]) -> List[str]:
+        back_start, back_end, forward_start, forward_end = window
+        return list(set(
+            self.keyword_lemmas[back_start:back_end] + self.keyword_lemmas[forward_start:forward_end]
+        ))
+
+
+class IndexedContextEnhancer(LemmaContextAwareEnhancer):
+    """
+    LemmaContextAwareEnhancer mit Index pro Dokument und Vorfilter.
+
+    Schwache Muster wie DE_PLZ (jede 5-stellige Zahl, Score 0.01) erzeugen in
+    CVs mit Jahreszahlen, Gehältern und IDs hunderte Kandidaten. Der Standard-
+    Enhancer kopiert alle Ergebnisse, sucht das Token jedes Kandidaten linear
+    und läuft für das Kontextfenster über die Lemmas. Hier:
+
+    - Kandidaten, die score_threshold auch mit Kontext nicht erreichen, fallen
+      vor der Kontextsuche weg (der AnalyzerEngine verwirft sie ohnehin)
+    - Token per Binärsuche, Kontextfenster über Präfixsummen der Keyword-
+      Positionen, Treffer pro Fenster und Recognizer gecacht
+    - Nur verstärkte Ergebnisse werden kopiert
+
+    Die Scores sind identisch zum LemmaContextAwareEnhancer.
+    """
+
+    def __init__(
+        self,
+        context_similarity_factor: float = 0.35,
+        min_score_with_context_similarity: float = 0.4,
+        context_prefix_count: int = 5,
+        context_suffix_count: int = 0,
+        score_threshold: float = 0.0,
+    ):
+        super().__init__(
+            context_similarity_factor=context_similarity_factor,
+            min_score_with_context_similarity=min_score_with_context_similarity,
+            context_prefix_count=context_prefix_count,
+            context_suffix_count=context_suffix_count,
+        )
+        self.score_threshold = score_threshold
+
+    def max_score_with_context(self, score: float) -> float:
+        """Höchster Score, den ein Ergebnis durch Kontext erreichen kann."""
+        boosted = max(score + self.context_similarity_factor, self.min_score_with_context_similarity)
+        return min(boosted, ContextAwareEnhancer.MAX_SCORE)
+
+    def enhance_using_context(
+        self,
+        text: str,
+        raw_results: List[RecognizerResult],
+        nlp_artifacts: NlpArtifacts,
+        recognizers: List[EntityRecognizer],
+        context: Optional[List[str]] = None,
+    ) -> List[RecognizerResult]:
+        if nlp_artifacts is None:
+            logger.warning("NLP artifacts were not provided")
+            return list(raw_results)
+
+        recognizers_dict = {recognizer.id: recognizer for recognizer in recognizers}
+        context = [word.lower() for word in context] if context else []
+
+        index: Optional[_LemmaIndex] = None
+        supportive: Dict[Tuple[str, Tuple[int, int, int, int]], str] = {}
+        results = []
+        dropped = 0
+
+        for result in raw_results:
+            metadata = result.recognition_metadata or {}
+            recognizer = recognizers_dict.get(metadata.get(RecognizerResult.RECOGNIZER_IDENTIFIER_KEY))
+
+            if (
+                not recognizer
+                or not recognizer.context
+                or metadata.get(RecognizerResult.IS_SCORE_ENHANCED_BY_CONTEXT_KEY)
+            ):
+                if result.score >= self.score_threshold:
+                    results.append(result)
+                else:
+                    dropped += 1
+                continue
+
+            if self.max_score_with_context(result.score) < self.score_threshold:
+                dropped += 1
+                continue
+
+            if not nlp_artifacts.tokens:
+                word = self._find_supportive_word_in_context([""] + context, recognizer.context)
+            else:
+                if index is None:
+                    index = _LemmaIndex(nlp_artifacts)
+                window = index.window(
+                    index.token_at(result.start),
+                    self.context_prefix_count,
+                    self.context_suffix_count,
+                )
+                key = (recognizer.id, window)
+                if key not in supportive:
+                    supportive[key] = self._find_supportive_word_in_context(
+                        index.words(window) + context, recognizer.context
+                    )
+                word = supportive[key]
+
+            if word:
+                result = copy.deepcopy(result)
+                result.score += self.context_similarity_factor
+                result.score = max(result.score, self.min_score_with_context_similarity)
+                result.score = min(result.score, ContextAwareEnhancer.MAX_SCORE)
+                result.analysis_explanation.set_supportive_context_word(word)
+                result.analysis_explanation.set_improved_score(result.score)
+
+            if result.score >= self.score_threshold:
+                results.append(result)
+            else:
+                dropped += 1
+
+        if dropped:
+            logger.debug(f"Context enhancement dropped {dropped} candidates below threshold")
+        return results
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from PIL import Image
+from PyPDF2 import PdfReader
+import io
+import logging
+import threading
+
+from app.config import settings
+from app.utils.file_detector import detect_file_type, FileType
+
+logger = logging.getLogger(__name__)
+
+# Lanes für die Admission Control
+LANE_TEXT = "text"
+LANE_OCR = "ocr"
+
+# Grobe Kosten in Sekunden (1 vCPU), werden im Betrieb pro Lane nachkalibriert
+TEXT_BASE_SECONDS = 0.2
+TEXT_SECONDS_PER_MB = 2.0
+TEXT_PDF_SECONDS_PER_PAGE = 0.1
+OCR_SECONDS_PER_PAGE = 3.0
+OCR_REFERENCE_MEGAPIXELS = 8.7  # A4 bei 300 DPI
+
+
+_pdf_processor = None
+_pdf_processor_lock = threading.Lock()
+
+
+def _get_pdf_processor():
+    """PDFProcessor mit dem konfigurierten Extractor - dieselbe Text/Scan-Probe wie process_pdf."""
+    global _pdf_processor
+
+    if _pdf_processor is None:
+        with _pdf_processor_lock:
+            if _pdf_processor is None:
+                # Import hier: pdf_processor -> load_controller -> admission -> cost_estimator
+                from app.services.pdf_processor import PDFProcessor
+                _pdf_processor = PDFProcessor()
+
+    return _pdf_processor
+
+
+@dataclass
+class RequestCost:
+    """Geschätzte Kosten eines Requests - ohne NLP oder OCR ermittelt."""
+
+    file_type: FileType
+    lane: str
+    pages: int
+    estimated_seconds: float
+
+
+def estimate_cost(content: bytes, filename: str = "") -> RequestCost:
+    """
+    Kosten aus Dateityp, Seitenzahl und Größe schätzen.
+
+    PDFs: Seitenzahl aus dem Seitenbaum, Text/Scan über PDFProcessor.has_text_layer
+    mit dem konfigurierten Extractor (wie process_pdf). Bilder: nur der Header wird gelesen.
+    Nicht lesbare Dateien landen in der OCR-Lane (teuerster Fall).
+    """
+    file_type = detect_file_type(content, filename)
+    size_mb = len(content) / (1024 * 1024)
+
+    if file_type == FileType.PDF:
+        try:
+            reader = PdfReader(io.BytesIO(content))
+            pages = len(reader.pages)
+            processed = min(pages, settings.max_pages)
+
+            if _get_pdf_processor().has_text_layer(content):
+                return RequestCost(
+                    file_type, LANE_TEXT, pages,
+                    TEXT_BASE_SECONDS + pages * TEXT_PDF_SECONDS_PER_PAGE,
+                )
+            return RequestCost(file_type, LANE_OCR, processed, processed * OCR_SECONDS_PER_PAGE)
+        except Exception as e:
+            logger.warning(f"Cost estimation failed for PDF: {e}")
+            return RequestCost(
+                file_type, LANE_OCR, settings.max_pages,
+                settings.max_pages * OCR_SECONDS_PER_PAGE,
+            )
+
+    if file_type == FileType.IMAGE:
+        try:
+            width, height = Image.open(io.BytesIO(content)).size
+            megapixels = min(width * height / 1_000_000, settings.image_max_megapixels)
+        except Exception:
+            megapixels = settings.image_max_megapixels
+        factor = max(0.25, megapixels / OCR_REFERENCE_MEGAPIXELS)
+        return RequestCost(file_type, LANE_OCR, 1, OCR_SECONDS_PER_PAGE * factor)
+
+    # Text, DOCX und Unbekanntes (wird sofort mit 415 abgelehnt)
+    return RequestCost(file_type, LANE_TEXT, 1, TEXT_BASE_SECONDS + size_mb * TEXT_SECONDS_PER_MB)
@@ -0,0 +1,162 @@
+from dataclasses import asdict, dataclass, field
+from PIL import Image
+from PyPDF2 import PdfReader
+from typing import List, Optional
+import io
+import logging
+import re
+import zipfile
+
+from app.config import settings
+from app.services.cost_estimator import LANE_TEXT, RequestCost, estimate_cost
+from app.utils.file_detector import FileType
+
+logger = logging.getLogger(__name__)
+
+# Ab so vielen Zeichen gilt eine Seite als Textseite
+PAGE_TEXT_MIN_CHARS = 20
+
+
+@dataclass
+class PageInfo:
+    """Klassifikation einer PDF-Seite."""
+
+    page: int
+    kind: str                      # text, scan, empty
+    chars: int
+    width_pt: float
+    height_pt: float
+    image_width: Optional[int] = None    # größtes eingebettetes Bild
+    image_height: Optional[int] = None
+    image_dpi: Optional[int] = None
+
+
+@dataclass
+class DocumentInfo:
+    """Ergebnis von inspect_document - ohne NLP oder OCR ermittelt."""
+
+    file_type: str
+    size_bytes: int
+    pages: Optional[int] = None
+    pages_processed: Optional[int] = None
+    pdf_kind: Optional[str] = None       # text oder scan (wie process_pdf entscheidet)
+    page_info: List[PageInfo] = field(default_factory=list)
+    image_width: Optional[int] = None
+    image_height: Optional[int] = None
+    image_format: Optional[str] = None
+    image_downscaled: Optional[bool] = None
+    lane: str = ""
+    estimated_seconds: float = 0.0
+    recommended_mode: str = "sync"       # sync oder async (POST /jobs)
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["estimated_seconds"] = round(self.estimated_seconds, 2)
+        return data
+
+
+def inspect_document(content: bytes, filename: str = "") -> DocumentInfo:
+    """
+    Dokument vorab analysieren: Typ, Seiten, Text/Scan pro Seite, Bildgrößen
+    und geschätzte Kosten. Liest nur Struktur und Textoperatoren.
+    """
+    cost = estimate_cost(content, filename)
+    info = DocumentInfo(
+        file_type=cost.file_type.value,
+        size_bytes=len(content),
+        pages=cost.pages,
+        lane=cost.lane,
+        estimated_seconds=cost.estimated_seconds,
+    )
+
+    try:
+        if cost.file_type == FileType.PDF:
+            _inspect_pdf(content, info, cost)
+        elif cost.file_type == FileType.IMAGE:
+            _inspect_image(content, info)
+        elif cost.file_type == FileType.DOCX:
+            info.pages = _docx_page_count(content)
+    except Exception as e:
+        logger.warning(f"Inspection failed: {e}")
+        info.error = f"Unreadable document: {str(e)}"
+
+    if cost.file_type == FileType.UNKNOWN:
+        info.error = "Unsupported file type"
+
+    if info.estimated_seconds > settings.inspect_async_threshold_seconds:
+        info.recommended_mode = "async"
+
+    return info
+
+
+def _inspect_pdf(content: bytes, info: DocumentInfo, cost: RequestCost):
+    reader = PdfReader(io.BytesIO(content))
+    info.pages = len(reader.pages)
+    info.pdf_kind = "text" if cost.lane == LANE_TEXT else "scan"
+    # Text-PDFs werden vollständig verarbeitet, Scans bis max_pages
+    info.pages_processed = info.pages if info.pdf_kind == "text" else min(info.pages, settings.max_pages)
+
+    for number, page in enumerate(reader.pages, start=1):
+        chars = len((page.extract_text() or "").strip())
+        width_pt = float(page.mediabox.width)
+        height_pt = float(page.mediabox.height)
+
+        page_info = PageInfo(
+            page=number,
+            kind="text" if chars >= PAGE_TEXT_MIN_CHARS else "empty",
+            chars=chars,
+            width_pt=round(width_pt, 1),
+            height_pt=round(height_pt, 1),
+        )
+
+        largest = _largest_image(page)
+        if largest:
+            page_info.image_width, page_info.image_height = largest
+            if width_pt:
+                page_info.image_dpi = round(largest[0] / width_pt * 72)
+            if page_info.kind == "empty":
+                page_info.kind = "scan"
+
+        info.page_info.append(page_info)
+
+
+def _largest_image(page) -> Optional[tuple]:
+    """Größtes Image XObject der Seite (Breite, Höhe) - nur Dictionary, keine Pixel."""
+    resources = page.get("/Resources")
+    if not resources:
+        return None
+    xobjects = resources.get_object().get("/XObject")
+    if not xobjects:
+        return None
+
+    largest = None
+    for xobject in xobjects.get_object().values():
+        xobject = xobject.get_object()
+        if xobject.get("/Subtype") != "/Image":
+            continue
+        size = (int(xobject.get("/Width", 0)), int(xobject.get("/Height", 0)))
+        if largest is None or size[0] * size[1] > largest[0] * largest[1]:
+            largest = size
+    return largest
+
+
+def _inspect_image(content: bytes, info: DocumentInfo):
+    image = Image.open(io.BytesIO(content))
+    info.image_width, info.image_height = image.size
+    info.image_format = image.format
+    megapixels = image.size[0] * image.size[1] / 1_000_000
+    info.image_downscaled = megapixels > settings.image_max_megapixels
+    if megapixels > settings.image_bomb_megapixels:
+        info.error = f"Image too large: {megapixels:.0f} MP, maximum {settings.image_bomb_megapixels:.0f} MP"
+
+
+def _docx_page_count(content: bytes) -> Optional[int]:
+    """Seitenzahl, wie Word sie beim Speichern in docProps/app.xml schreibt."""
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        try:
+            app_xml = archive.read("docProps/app.xml").decode("utf-8", errors="ignore")
+        except KeyError:
+            return None
+    match = re.search(r"<Pages>(\d+)</Pages>", app_xml)
+    return int(match.group(1)) if match else None
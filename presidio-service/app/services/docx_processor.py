@@ -0,0 +1,435 @@
+from collections import deque
+from dataclasses import dataclass, field
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.part import XmlPart
+from docx.oxml.ns import qn
+from presidio_analyzer import RecognizerResult
+from typing import Iterator, List, Optional, Tuple
+import io
+import logging
+
+from app.config import settings
+from app.services.text_anonymizer import DEFAULT_REPLACEMENT, ENTITY_REPLACEMENTS
+
+logger = logging.getLogger(__name__)
+
+# Teile mit eigenem Text neben dem Hauptdokument
+_TEXT_PART_RELATIONSHIPS = (RT.HEADER, RT.FOOTER, RT.FOOTNOTES, RT.ENDNOTES, RT.COMMENTS)
+
+_P = qn("w:p")
+_T = qn("w:t")
+_TR = qn("w:tr")
+_TXBX = qn("w:txbxContent")
+
+# Nachverfolgte Löschungen und Verschiebungen: sichtbar nur in der Änderungshistorie
+_TRACKED_REMOVALS = (qn("w:del"), qn("w:moveFrom"))
+_DELETED_TEXT = (qn("w:delText"), qn("w:delInstrText"))
+
+# Feldfunktionen - HYPERLINK, MERGEFIELD, AUTHOR u.ä. tragen Adressen und Namen
+_FLD_CHAR = qn("w:fldChar")
+_FLD_CHAR_TYPE = qn("w:fldCharType")
+_INSTR_TEXT = qn("w:instrText")
+_FLD_SIMPLE = qn("w:fldSimple")
+_INSTR = qn("w:instr")
+
+# Feldfunktionen ohne Inhalt aus dem Dokument, bleiben erhalten
+_SAFE_FIELDS = {
+    "PAGE", "NUMPAGES", "SECTIONPAGES", "SECTION", "DATE", "TIME",
+    "TOC", "PAGEREF", "SEQ", "NOTEREF", "STYLEREF",
+}
+
+# Bearbeiter an Änderungen und Kommentaren
+_AUTHOR_ATTRIBUTES = (qn("w:author"), qn("w:initials"))
+
+# Ersatz für externe Beziehungsziele (mailto:, Profil-URLs, Vorlagenpfade)
+_NEUTRAL_TARGET = "#"
+
+# Dokumenteigenschaften mit Freitext
+_CORE_PROPERTIES = (
+    "author", "category", "comments", "content_status", "identifier", "keywords",
+    "language", "last_modified_by", "subject", "title", "version",
+)
+
+# Nicht editierbare Zeichen im Absatztext
+_SEPARATORS = {
+    qn("w:tab"): "\t",
+    qn("w:br"): "\n",
+    qn("w:cr"): "\n",
+}
+
+# Volles Dokument-Format für die Antwort
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+@dataclass
+class TextUnit:
+    """
+    Analyse-Einheit: ein Absatz oder eine Tabellenzeile.
+
+    segments enthält (w:t-Element oder None, Text) in Lesereihenfolge.
+    None steht für Tabs/Umbrüche und Absatzgrenzen, die nicht editiert werden.
+    """
+
+    segments: List[Tuple[Optional[object], str]] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "".join(text for _, text in self.segments)
+
+
+@dataclass
+class DocxResult:
+    """Ergebnis der DOCX-Anonymisierung."""
+
+    anonymized_text: str
+    pii_found: int
+    units_processed: int
+    docx_bytes: Optional[bytes] = None
+    source_text: Optional[str] = None
+    entities: List[RecognizerResult] = field(default_factory=list)
+
+
+class DocxProcessor:
+    """
+    Anonymisiert DOCX-Dateien über alle Textbereiche.
+
+    - Hauptdokument inkl. Tabellen (auch verschachtelt) und Textfeldern
+    - Kopf- und Fußzeilen, Fuß-/Endnoten, Kommentare
+
+    Tabellenzeilen werden als eine Einheit analysiert, damit Beschriftung
+    und Wert in benachbarten Zellen ("Name | Max Mustermann") Kontext bilden.
+    Die Einheiten laufen lazy in Batches durch die NLP-Pipeline; Ersetzungen
+    werden direkt in die w:t-Elemente geschrieben, die Formatierung der Runs
+    bleibt dadurch erhalten.
+
+    Was nicht als Text analysiert wird, verlässt das Dokument nicht:
+    nachverfolgte Löschungen werden entfernt, Feldfunktionen und externe
+    Link-Ziele geleert, Freitext-Eigenschaften (Titel, Autor, ...) gelöscht.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size or settings.docx_batch_size
+
+    def anonymize(
+        self,
+        docx_bytes: bytes,
+        text_anonymizer,
+        language: str = "de",
+        write_docx: bool = False,
+        include_entities: bool = False,
+    ) -> DocxResult:
+        """
+        DOCX anonymisieren.
+
+        Args:
+            docx_bytes: DOCX als Bytes
+            text_anonymizer: TextAnonymizer für die PII-Erkennung
+            language: Sprache (de, en)
+            write_docx: Geschwärztes DOCX zurückgeben
+            include_entities: Quelltext und Entities (Offsets darin) mitliefern
+
+        Returns:
+            DocxResult mit anonymisiertem Text (und optional DOCX)
+        """
+        doc = Document(io.BytesIO(docx_bytes))
+        for root in self._text_roots(doc):
+            self._remove_tracked_deletions(root)
+
+        pending: deque = deque()
+
+        def texts() -> Iterator[str]:
+            # spaCy liest höchstens einen Batch voraus - pending bleibt klein
+            for unit in self._units(doc):
+                pending.append(unit)
+                yield unit.text
+
+        lines = []
+        source_lines = []
+        entities: List[RecognizerResult] = []
+        source_offset = 0
+        pii_found = 0
+        units = 0
+
+        for results in text_anonymizer.analyze_batch(texts(), language, self.batch_size):
+            unit = pending.popleft()
+            units += 1
+            pii_found += len(results)
+            source = unit.text
+
+            spans = self._spans(results)
+            if spans:
+                self._apply(unit, spans)
+
+            # Leere Einheiten erscheinen weder im Text noch im Quelltext
+            if not source.strip():
+                continue
+            lines.append(unit.text)
+
+            if include_entities:
+                for result in results:
+                    entities.append(RecognizerResult(
+                        result.entity_type,
+                        result.start + source_offset,
+                        result.end + source_offset,
+                        result.score,
+                        result.analysis_explanation,
+                        result.recognition_metadata,
+                    ))
+                source_lines.append(source)
+                source_offset += len(source) + 1
+
+        logger.info(f"DOCX: {units} text units, {pii_found} PII entities")
+
+        docx_out = None
+        if write_docx:
+            for root in self._text_roots(doc):
+                self._strip_field_codes(root)
+                self._clear_authors(root)
+            self._neutralize_external_targets(doc)
+            self._clear_metadata(doc)
+            buffer = io.BytesIO()
+            doc.save(buffer)
+            docx_out = buffer.getvalue()
+
+        return DocxResult(
+            anonymized_text="\n".join(lines),
+            pii_found=pii_found,
+            units_processed=units,
+            docx_bytes=docx_out,
+            source_text="\n".join(source_lines) if include_entities else None,
+            entities=entities,
+        )
+
+    @staticmethod
+    def _text_roots(doc) -> Iterator[object]:
+        """XML-Wurzeln des Hauptdokuments und der Teile mit eigenem Text."""
+        yield doc.part.element
+
+        for rel in doc.part.rels.values():
+            if rel.is_external or rel.reltype not in _TEXT_PART_RELATIONSHIPS:
+                continue
+            part = rel.target_part
+            if isinstance(part, XmlPart):
+                yield part.element
+
+    def _units(self, doc) -> Iterator[TextUnit]:
+        """Alle Text-Einheiten des Dokuments in Lesereihenfolge."""
+        for root in self._text_roots(doc):
+            yield from self._part_units(root)
+
+    def _part_units(self, root) -> Iterator[TextUnit]:
+        """
+        Absätze eines XML-Teils zu Einheiten gruppieren.
+        Aufeinanderfolgende Absätze derselben Tabellenzeile bilden eine Einheit.
+        """
+        unit: Optional[TextUnit] = None
+        unit_row = None
+
+        for paragraph in root.iter(_P):
+            row = self._row_of(paragraph)
+
+            if unit is not None and (row is None or row is not unit_row):
+                yield unit
+                unit = None
+
+            if unit is None:
+                unit = TextUnit()
+                unit_row = row
+            else:
+                unit.segments.append((None, "\n"))
+
+            unit.segments.extend(self._paragraph_segments(paragraph))
+
+        if unit is not None:
+            yield unit
+
+    @staticmethod
+    def _row_of(paragraph):
+        """Nächste Tabellenzeile über dem Absatz (Textfelder trennen)."""
+        parent = paragraph.getparent()
+        while parent is not None:
+            if parent.tag == _TR:
+                return parent
+            if parent.tag == _TXBX:
+                return None
+            parent = parent.getparent()
+        return None
+
+    @staticmethod
+    def _paragraph_segments(paragraph) -> List[Tuple[Optional[object], str]]:
+        """Textsegmente eines Absatzes ohne verschachtelte Absätze (Textfelder)."""
+        segments = []
+
+        for element in paragraph.iter(_T, *_SEPARATORS):
+            # Nur Elemente, deren nächster Absatz dieser ist
+            parent = element.getparent()
+            while parent is not None and parent.tag != _P:
+                parent = parent.getparent()
+            if parent is not paragraph:
+                continue
+
+            if element.tag == _T:
+                segments.append((element, element.text or ""))
+            else:
+                segments.append((None, _SEPARATORS[element.tag]))
+
+        return segments
+
+    @staticmethod
+    def _spans(results: List[RecognizerResult]) -> List[Tuple[int, int, str]]:
+        """Überlappende Entities zusammenfassen, Ersetzungstext je Span."""
+        spans: List[Tuple[int, int, str]] = []
+
+        for result in sorted(results, key=lambda r: (r.start, -r.end)):
+            if spans and result.start < spans[-1][1]:
+                start, end, replacement = spans[-1]
+                spans[-1] = (start, max(end, result.end), replacement)
+                continue
+            replacement = ENTITY_REPLACEMENTS.get(result.entity_type, DEFAULT_REPLACEMENT)
+            spans.append((result.start, result.end, replacement))
+
+        return spans
+
+    @staticmethod
+    def _apply(unit: TextUnit, spans: List[Tuple[int, int, str]]):
+        """
+        Spans in den w:t-Elementen ersetzen.
+        Der Ersetzungstext landet im ersten betroffenen Run (dessen Formatierung),
+        Reste der Entity in Folge-Runs werden entfernt.
+        """
+        index = 0
+        inserted = -1  # Index des letzten Spans, dessen Ersetzung geschrieben ist
+        offset = 0
+        segments = []
+
+        for element, text in unit.segments:
+            start, end = offset, offset + len(text)
+            offset = end
+
+            if element is None:
+                segments.append((element, text))
+                continue
+
+            # Spans, die vollständig vor diesem Segment enden
+            while index < len(spans) and spans[index][1] <= start:
+                index += 1
+
+            pieces = []
+            position = start
+            changed = False
+
+            while index < len(spans) and spans[index][0] < end:
+                span_start, span_end, replacement = spans[index]
+                if span_start > position:
+                    pieces.append(text[position - start:span_start - start])
+                if index > inserted:
+                    pieces.append(replacement)
+                    inserted = index
+                changed = True
+
+                if span_end <= end:
+                    position = max(position, span_end)
+                    index += 1
+                else:
+                    position = end
+                    break
+
+            if not changed:
+                segments.append((element, text))
+                continue
+
+            pieces.append(text[position - start:])
+            new_text = "".join(pieces)
+            element.text = new_text
+            # Führende/abschließende Leerzeichen sonst von Word verworfen
+            element.set(qn("xml:space"), "preserve")
+            segments.append((element, new_text))
+
+        unit.segments = segments
+
+    @staticmethod
+    def _remove_tracked_deletions(root):
+        """
+        Gelöschten und verschobenen Text der Änderungsverfolgung entfernen.
+        Er wird nicht analysiert und bliebe sonst im DOCX stehen - das
+        Dokument entspricht danach der Ansicht mit angenommenen Löschungen.
+        """
+        for element in list(root.iter(*_TRACKED_REMOVALS, *_DELETED_TEXT)):
+            parent = element.getparent()
+            if parent is not None:
+                parent.remove(element)
+
+    @staticmethod
+    def _safe_field(instruction: str) -> bool:
+        words = instruction.split()
+        return bool(words) and words[0].upper() in _SAFE_FIELDS
+
+    def _strip_field_codes(self, root):
+        """
+        Feldfunktionen ohne sicheren Feldnamen leeren.
+        Das angezeigte Feldergebnis steht in normalen w:t-Runs und ist
+        bereits anonymisiert; die Anweisung (HYPERLINK "mailto:...") nicht.
+        """
+        fields: List[List[object]] = []  # instrText-Elemente offener Felder
+
+        def strip(instructions):
+            text = "".join(element.text or "" for element in instructions)
+            if not self._safe_field(text):
+                for element in instructions:
+                    element.text = ""
+
+        for element in root.iter(_FLD_CHAR, _INSTR_TEXT):
+            if element.tag == _INSTR_TEXT:
+                if fields:
+                    fields[-1].append(element)
+                else:
+                    strip([element])
+                continue
+
+            kind = element.get(_FLD_CHAR_TYPE)
+            if kind == "begin":
+                fields.append([])
+            elif kind == "end" and fields:
+                strip(fields.pop())
+
+        # Nicht abgeschlossene Felder
+        for instructions in fields:
+            strip(instructions)
+
+        # Einfache Felder: Ergebnis-Runs behalten, Feld auflösen
+        for simple in list(root.iter(_FLD_SIMPLE)):
+            if self._safe_field(simple.get(_INSTR, "")):
+                continue
+            parent = simple.getparent()
+            position = parent.index(simple)
+            for child in list(simple):
+                parent.insert(position, child)
+                position += 1
+            parent.remove(simple)
+
+    @staticmethod
+    def _clear_authors(root):
+        """Namen an Änderungen (w:ins, w:rPrChange, ...) und Kommentaren leeren."""
+        for element in root.iter():
+            for attribute in _AUTHOR_ATTRIBUTES:
+                if element.get(attribute) is not None:
+                    element.set(attribute, "")
+
+    @staticmethod
+    def _neutralize_external_targets(doc):
+        """
+        Externe Beziehungsziele aller Teile ersetzen (Hyperlinks, Vorlagenpfade).
+        Die Beziehungen bleiben bestehen, damit keine r:id ins Leere zeigt.
+        """
+        for part in doc.part.package.iter_parts():
+            for rel in part.rels.values():
+                if rel.is_external:
+                    rel._target = _NEUTRAL_TARGET
+
+    @staticmethod
+    def _clear_metadata(doc):
+        """Freitext-Felder der Dokumenteigenschaften leeren."""
+        properties = doc.core_properties
+        for name in _CORE_PROPERTIES:
+            setattr(properties, name, "")
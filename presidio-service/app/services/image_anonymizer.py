@@ -1,13 +1,20 @@
 from presidio_image_redactor import ImageRedactorEngine, ImageAnalyzerEngine
+from presidio_image_redactor.entities import ImageRecognizerResult
 from presidio_analyzer import AnalyzerEngine, Pattern, PatternRecognizer
 from presidio_analyzer.nlp_engine import NlpEngineProvider
-from PIL import Image
-import pytesseract
-from typing import List, Optional
+from PIL import Image, ImageChops, ImageDraw
+from typing import Iterable, List, Optional
 import logging
 import threading
 
 from app.config import settings
+from app.services.load_controller import fast_mode
+from app.services.memory import track_memory
+from app.services.ocr_cache import get_ocr_cache, ocr_settings_fingerprint, page_key
+from app.services.ocr_engine import create_ocr_backend
+from app.services.ocr_preprocessor import create_ocr_preprocessor
+from app.services.ocr_regions import RegionImageAnalyzerEngine, create_region_detector, region_stats, region_text
+from app.utils.deadline import check_deadline
 
 logger = logging.getLogger(__name__)
 
@@ -74,10 +81,17 @@ def get_image_anonymizer() -> "ImageAnonymizer":
     return _image_anonymizer_instance
 
 
+def shutdown_image_anonymizer():
+    """OCR-Handles beim Herunterfahren freigeben (falls geladen)."""
+    with _image_anonymizer_lock:
+        if _image_anonymizer_instance is not None:
+            _image_anonymizer_instance.ocr.close()
+
+
 class ImageAnonymizer:
     """
     PII-Erkennung und Schwärzung in Bildern.
-    Verwendet Presidio Image Redactor mit Tesseract OCR.
+    Verwendet Presidio Image Redactor mit Tesseract OCR (tesserocr oder pytesseract).
     """
 
     def __init__(self):
@@ -103,12 +117,39 @@ class ImageAnonymizer:
             analyzer.registry.add_recognizer(recognizer)
             logger.info(f"ImageAnonymizer: Added custom recognizer: {recognizer.supported_entities}")
 
+        # OCR läuft auf einer verkleinerten, binarisierten Kopie,
+        # Boxen werden auf das Originalbild zurückskaliert
+        self.preprocessor = create_ocr_preprocessor()
+
+        # Persistentes Tesseract-Handle pro Worker-Thread (Fallback: pytesseract)
+        self.ocr = create_ocr_backend()
+
+        # Layout-Vorlauf: leere Seiten überspringen, nur Textbereiche OCRen
+        self.region_detector = create_region_detector()
+
         # ImageAnalyzerEngine mit custom Analyzer erstellen
-        image_analyzer = ImageAnalyzerEngine(analyzer_engine=analyzer)
+        if self.region_detector:
+            image_analyzer = RegionImageAnalyzerEngine(
+                analyzer_engine=analyzer,
+                ocr=self.ocr,
+                image_preprocessor=self.preprocessor,
+                region_detector=self.region_detector,
+            )
+        else:
+            image_analyzer = ImageAnalyzerEngine(
+                analyzer_engine=analyzer,
+                ocr=self.ocr,
+                image_preprocessor=self.preprocessor,
+            )
 
         # Image Redactor mit custom ImageAnalyzerEngine
         self.redactor = ImageRedactorEngine(image_analyzer_engine=image_analyzer)
 
+        # Boxen/Text pro Seite cachen - dieselben Scans kommen in anderen PDFs wieder
+        self.cache = get_ocr_cache()
+        self._fingerprint = ocr_settings_fingerprint()
+
+    @track_memory("image_redact")
     def anonymize(
         self,
         image: Image.Image,
@@ -126,29 +167,89 @@ class ImageAnonymizer:
         Returns:
             Anonymisiertes PIL Image
         """
+        return self.redact(image, self.analyze(image, language), fill)
+
+    def analyze(self, image: Image.Image, language: str = "de") -> List[ImageRecognizerResult]:
+        """
+        PII-Boxen im Bild finden (OCR + PII-Erkennung), ohne zu schwärzen.
+
+        Returns:
+            Boxen in Koordinaten des Originalbilds
+        """
+        check_deadline()
+
         # Tesseract Sprache mappen
         ocr_lang = "deu" if language == "de" else "eng"
 
         logger.info(f"Anonymizing image with language: {ocr_lang}")
 
-        # Bild anonymisieren
-        redacted = self.redactor.redact(
-            image=image,
-            fill=fill,
-            ocr_kwargs={"lang": ocr_lang},
-            entities=settings.entities_to_anonymize,
-        )
+        key = page_key(image, "boxes", ocr_lang, *self._key_parts()) if self.cache.enabled else None
+        bboxes = self.cache.get(key) if key else None
+
+        if bboxes is None:
+            bboxes = self.redactor.image_analyzer_engine.analyze(
+                image,
+                ocr_kwargs={"lang": ocr_lang},
+                entities=settings.entities_to_anonymize,
+            )
+            if key:
+                self.cache.put(key, bboxes)
+        else:
+            logger.info(f"OCR cache hit: {len(bboxes)} boxes")
+
+        return bboxes
+
+    @staticmethod
+    def redact(
+        image: Image.Image,
+        bboxes: List[ImageRecognizerResult],
+        fill: str = "black",
+    ) -> Image.Image:
+        """Boxen schwärzen wie ImageRedactorEngine.redact (auf einer Kopie)."""
+        redacted = ImageChops.duplicate(image)
+        draw = ImageDraw.Draw(redacted)
+        for box in bboxes:
+            draw.rectangle(
+                [box.left, box.top, box.left + box.width, box.top + box.height],
+                fill=fill,
+            )
 
         return redacted
 
     def extract_text(self, image: Image.Image, language: str = "de") -> str:
         """Text aus Bild extrahieren (OCR)."""
+        check_deadline()
         ocr_lang = "deu" if language == "de" else "eng"
-        return pytesseract.image_to_string(image, lang=ocr_lang)
+
+        key = page_key(image, "text", ocr_lang, *self._key_parts()) if self.cache.enabled else None
+        text = self.cache.get(key) if key else None
+        if text is None:
+            text = self._ocr_text(image, ocr_lang)
+            if key:
+                self.cache.put(key, text)
+
+        return text
+
+    def _key_parts(self) -> List[str]:
+        """Cache-Schlüssel: OCR-Settings, im Fast-Mode getrennt (andere OCR-Auflösung)."""
+        return [self._fingerprint, "fast"] if fast_mode() else [self._fingerprint]
+
+    def _ocr_text(self, image: Image.Image, ocr_lang: str) -> str:
+        layout = self.region_detector.detect(image) if self.region_detector else None
+        if layout:
+            region_stats.add(layout)
+            if layout.blank:
+                return ""
+
+        prepared, metadata = self.preprocessor.preprocess_image(image)
+        if layout and layout.regions:
+            scale = (metadata or {}).get("scale_factor", 1.0)
+            return region_text(self.ocr, prepared, layout.regions, scale, ocr_lang)
+        return self.ocr.image_to_text(prepared, lang=ocr_lang)
 
     def extract_text_from_images(
         self,
-        images: List[Image.Image],
+        images: Iterable[Image.Image],
         language: str = "de",
     ) -> str:
         """Text aus mehreren Bildern extrahieren."""
@@ -0,0 +1,215 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+import logging
+import queue
+import threading
+import time
+import uuid
+
+from app.config import settings
+from app.services.job_store import Job, JobStatus, JobStore, file_extension
+from app.services.load_controller import PRIORITY_NORMAL
+
+logger = logging.getLogger(__name__)
+
+# Callback für Seitenfortschritt: (pages_done, pages_total)
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass
+class JobRequest:
+    """Eingabe eines Jobs (bleibt nur im Speicher des Workers)."""
+
+    content: bytes
+    filename: str
+    output_format: str
+    language: str
+    include_entities: bool = False
+    priority: str = PRIORITY_NORMAL
+
+
+@dataclass
+class JobResult:
+    """Fertiges Ergebnis eines Jobs."""
+
+    body: bytes
+    media_type: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class JobFailed(Exception):
+    """Vom Handler ausgelöst, wenn ein Job mit bekanntem HTTP-Status scheitert."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class JobQueueFull(Exception):
+    """Warteschlange ist voll - Job wurde nicht angenommen."""
+
+
+# Handler verarbeitet einen Job und meldet Seitenfortschritt
+JobHandler = Callable[[JobRequest, ProgressCallback], JobResult]
+
+
+class JobQueue:
+    """
+    Lokale Worker-Queue für asynchrone Jobs.
+    Die Verarbeitung läuft in Hintergrund-Threads, Status und Ergebnis
+    landen im JobStore.
+    """
+
+    # Wie oft abgelaufene Jobs aufgeräumt werden (Sekunden)
+    PURGE_INTERVAL = 60
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: JobHandler,
+        workers: int = 1,
+        max_size: int = 50,
+        ttl_seconds: int = 3600,
+    ):
+        self.store = store
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.ttl_seconds = ttl_seconds
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_size)
+        self._threads: List[threading.Thread] = []
+        self._last_purge = time.time()
+
+    @property
+    def pending(self) -> int:
+        """Jobs in der Warteschlange oder in Arbeit."""
+        return self._queue.unfinished_tasks
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"job-worker-{i}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Job queue started with {self.workers} worker(s)")
+
+    def stop(self, timeout: float = 5.0):
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def submit(self, request: JobRequest) -> Job:
+        """
+        Job anlegen und einreihen.
+
+        Raises:
+            JobQueueFull: Wenn die Warteschlange voll ist
+        """
+        now = time.time()
+        job = Job(
+            id=uuid.uuid4().hex,
+            status=JobStatus.QUEUED,
+            created_at=now,
+            updated_at=now,
+            expires_at=now + self.ttl_seconds,
+            file_extension=file_extension(request.filename),
+        )
+        self.store.create(job)
+
+        try:
+            self._queue.put_nowait((job.id, request))
+        except queue.Full:
+            self.store.update(
+                job.id,
+                status=JobStatus.FAILED,
+                error="Job queue full",
+                error_status=503,
+            )
+            raise JobQueueFull()
+
+        logger.info(f"Job {job.id} queued ({job.file_extension or 'no extension'})")
+        return job
+
+    def _worker(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.PURGE_INTERVAL)
+            except queue.Empty:
+                self._purge()
+                continue
+
+            if item is None:
+                break
+
+            job_id, request = item
+            try:
+                self._run(job_id, request)
+            finally:
+                self._queue.task_done()
+                self._purge()
+
+    def _run(self, job_id: str, request: JobRequest):
+        self.store.update(job_id, status=JobStatus.RUNNING)
+        started = time.time()
+
+        def progress(pages_done: int, pages_total: int):
+            self.store.update(job_id, pages_done=pages_done, pages_total=pages_total)
+
+        try:
+            result = self.handler(request, progress)
+        except JobFailed as e:
+            logger.warning(f"Job {job_id} failed: {e.detail}")
+            self.store.update(
+                job_id,
+                status=JobStatus.FAILED,
+                error=e.detail,
+                error_status=e.status_code,
+            )
+            return
+        except Exception as e:
+            logger.error(f"Job {job_id} crashed: {e}")
+            self.store.update(
+                job_id,
+                status=JobStatus.FAILED,
+                error=f"Processing error: {str(e)}",
+                error_status=500,
+            )
+            return
+
+        self.store.update(
+            job_id,
+            status=JobStatus.DONE,
+            result=result.body,
+            result_media_type=result.media_type,
+            result_headers=result.headers,
+        )
+        logger.info(f"Job {job_id} done in {time.time() - started:.1f}s")
+
+    def _purge(self):
+        if time.time() - self._last_purge < self.PURGE_INTERVAL:
+            return
+        self._last_purge = time.time()
+
+        purged = self.store.purge_expired()
+        if purged:
+            logger.info(f"Purged {purged} expired jobs")
+
+
+def create_job_queue(store: JobStore, handler: JobHandler) -> JobQueue:
+    """JobQueue mit Werten aus den Settings erstellen."""
+    return JobQueue(
+        store=store,
+        handler=handler,
+        workers=settings.job_workers,
+        max_size=settings.job_queue_size,
+        ttl_seconds=settings.job_ttl_seconds,
+    )
@@ -0,0 +1,304 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Dict, Optional, Set
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+def file_extension(filename: str) -> str:
+    """Nur die Endung speichern - Dateinamen von CVs enthalten meist den Namen."""
+    return os.path.splitext(filename or "")[1].lower()
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+@dataclass
+class Job:
+    """Status und Ergebnis eines asynchronen Anonymisierungs-Jobs."""
+
+    id: str
+    status: JobStatus
+    created_at: float
+    updated_at: float
+    expires_at: float
+    file_extension: str = ""   # ".pdf" - nie der Dateiname (PII)
+    pages_done: int = 0
+    pages_total: Optional[int] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
+    result_media_type: Optional[str] = None
+    result_headers: Dict[str, str] = field(default_factory=dict)
+    result: Optional[bytes] = None
+
+    def to_dict(self) -> dict:
+        """Status-Repräsentation für die API (ohne Ergebnis-Bytes)."""
+        return {
+            "job_id": self.id,
+            "status": self.status.value,
+            "file_extension": self.file_extension,
+            "pages_done": self.pages_done,
+            "pages_total": self.pages_total,
+            "created_at": _iso(self.created_at),
+            "updated_at": _iso(self.updated_at),
+            "expires_at": _iso(self.expires_at),
+            "error": self.error,
+        }
+
+
+# Felder, die über update() geändert werden dürfen
+_UPDATABLE_FIELDS = {
+    "status",
+    "pages_done",
+    "pages_total",
+    "error",
+    "error_status",
+    "result_media_type",
+    "result_headers",
+    "result",
+}
+
+
+class JobStore(ABC):
+    """Persistenz-Schnittstelle für Jobs."""
+
+    @abstractmethod
+    def create(self, job: Job) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job laden. Abgelaufene Jobs gelten als nicht vorhanden."""
+
+    @abstractmethod
+    def update(self, job_id: str, **fields) -> None:
+        ...
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Abgelaufene Jobs löschen. Gibt die Anzahl gelöschter Jobs zurück."""
+
+    def mark_delivered(self, job_id: str) -> None:
+        """Ergebnis wurde abgeholt (nur für volatile_jobs relevant)."""
+
+    def volatile_jobs(self) -> int:
+        """Offene oder nicht abgeholte Jobs, die ein Neustart des Workers verlieren würde."""
+        return 0
+
+
+class InMemoryJobStore(JobStore):
+    """Job Store im Prozessspeicher (Standard, geht bei Neustart verloren)."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._delivered: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def create(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = replace(job)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.expires_at <= time.time():
+                return None
+            return replace(job)
+
+    def update(self, job_id: str, **fields) -> None:
+        unknown = set(fields) - _UPDATABLE_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown job fields: {unknown}")
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.updated_at = time.time()
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job.expires_at <= now]
+            for job_id in expired:
+                del self._jobs[job_id]
+                self._delivered.discard(job_id)
+        return len(expired)
+
+    def mark_delivered(self, job_id: str) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._delivered.add(job_id)
+
+    def volatile_jobs(self) -> int:
+        # Fehlgeschlagene und bereits abgeholte Jobs hindern kein Recycling
+        now = time.time()
+        with self._lock:
+            return sum(
+                1 for job in self._jobs.values()
+                if job.expires_at > now
+                and (
+                    job.status in (JobStatus.QUEUED, JobStatus.RUNNING)
+                    or (job.status == JobStatus.DONE and job.id not in self._delivered)
+                )
+            )
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job Store in SQLite.
+    Überlebt Worker-Neustarts, damit Status und fertige Ergebnisse abrufbar bleiben.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    file_extension TEXT NOT NULL DEFAULT '',
+                    pages_done INTEGER NOT NULL DEFAULT 0,
+                    pages_total INTEGER,
+                    error TEXT,
+                    error_status INTEGER,
+                    result_media_type TEXT,
+                    result_headers TEXT NOT NULL DEFAULT '{}',
+                    result BLOB
+                )
+                """
+            )
+            # Eingabedateien liegen nur im Speicher - nach einem Neustart
+            # können offene Jobs nicht fortgesetzt werden
+            interrupted = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, error_status = ?, updated_at = ? "
+                "WHERE status IN (?, ?)",
+                (
+                    JobStatus.FAILED.value,
+                    "Job interrupted by service restart",
+                    503,
+                    time.time(),
+                    JobStatus.QUEUED.value,
+                    JobStatus.RUNNING.value,
+                ),
+            ).rowcount
+            if interrupted:
+                logger.warning(f"Marked {interrupted} interrupted jobs as failed")
+
+    def create(self, job: Job) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, created_at, updated_at, expires_at, file_extension, "
+                "pages_done, pages_total, error, error_status, result_media_type, "
+                "result_headers, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.id,
+                    job.status.value,
+                    job.created_at,
+                    job.updated_at,
+                    job.expires_at,
+                    job.file_extension,
+                    job.pages_done,
+                    job.pages_total,
+                    job.error,
+                    job.error_status,
+                    job.result_media_type,
+                    json.dumps(job.result_headers),
+                    job.result,
+                ),
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, created_at, updated_at, expires_at, file_extension, "
+                "pages_done, pages_total, error, error_status, result_media_type, "
+                "result_headers, result FROM jobs WHERE id = ? AND expires_at > ?",
+                (job_id, time.time()),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return Job(
+            id=row[0],
+            status=JobStatus(row[1]),
+            created_at=row[2],
+            updated_at=row[3],
+            expires_at=row[4],
+            file_extension=row[5],
+            pages_done=row[6],
+            pages_total=row[7],
+            error=row[8],
+            error_status=row[9],
+            result_media_type=row[10],
+            result_headers=json.loads(row[11]),
+            result=row[12],
+        )
+
+    def update(self, job_id: str, **fields) -> None:
+        unknown = set(fields) - _UPDATABLE_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown job fields: {unknown}")
+
+        values = dict(fields)
+        if "status" in values:
+            values["status"] = JobStatus(values["status"]).value
+        if "result_headers" in values:
+            values["result_headers"] = json.dumps(values["result_headers"])
+        values["updated_at"] = time.time()
+
+        assignments = ", ".join(f"{key} = ?" for key in values)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?",
+                (*values.values(), job_id),
+            )
+
+    def purge_expired(self) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM jobs WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+
+
+def create_job_store() -> JobStore:
+    """Job Store gemäß settings.job_store_backend erstellen."""
+    backend = settings.job_store_backend.lower()
+
+    if backend == "sqlite":
+        logger.info(f"Using SQLite job store: {settings.job_store_path}")
+        return SQLiteJobStore(settings.job_store_path)
+
+    if backend != "memory":
+        logger.warning(f"Unknown job store backend '{backend}', using memory")
+
+    return InMemoryJobStore()
@@ -0,0 +1,243 @@
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Dict, List, Optional, Sequence
+import logging
+import threading
+import time
+
+from app.config import settings
+from app.services.admission import get_admission_controller
+from app.services.memory import MB, rss_bytes
+
+logger = logging.getLogger(__name__)
+
+# Singleton Pattern: eine Qualitätsstufe pro Worker
+_load_controller_instance: Optional["LoadController"] = None
+_load_controller_lock = threading.Lock()
+
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+PRIORITIES = (PRIORITY_NORMAL, PRIORITY_LOW)
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    """Verarbeitungsparameter einer Stufe (0 = volle Qualität laut Settings)."""
+
+    level: int
+    render_dpi: int       # Rasterauflösung für Scan-PDFs
+    render_threads: int   # parallele pdftoppm-Prozesse
+    fast: bool = False    # Fast-Mode: OCR mit Mindest-Zeilenhöhe, Text-PDFs über PyPDF2
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def full_quality() -> QualityLevel:
+    """Stufe 0 - die konfigurierten Werte, wie ohne Lastregelung."""
+    return QualityLevel(
+        level=0,
+        render_dpi=settings.pdf_render_dpi,
+        render_threads=settings.pdf_render_threads,
+    )
+
+
+def quality_levels() -> List[QualityLevel]:
+    """Stufe 0 plus eine Stufe je Eintrag in quality_render_dpi (nie besser als Stufe 0)."""
+    full = full_quality()
+    levels = [full]
+    for index in range(len(settings.quality_render_dpi)):
+        levels.append(QualityLevel(
+            level=index + 1,
+            render_dpi=min(full.render_dpi, _at(settings.quality_render_dpi, index)),
+            render_threads=min(
+                full.render_threads, _at(settings.quality_render_threads, index, full.render_threads)
+            ),
+        ))
+    return levels
+
+
+def _at(values: Sequence, index: int, default=None):
+    """Wert für eine Stufe - kürzere Listen gelten mit ihrem letzten Eintrag weiter."""
+    if not values:
+        return default
+    return values[min(index, len(values) - 1)]
+
+
+# Qualitätsstufe des aktuellen Requests - wird von run_in_threadpool mitgegeben
+_current_quality: ContextVar[Optional[QualityLevel]] = ContextVar("quality", default=None)
+
+
+def set_quality(level: Optional[QualityLevel]):
+    """Stufe für den aktuellen Kontext setzen (None = volle Qualität)."""
+    return _current_quality.set(level)
+
+
+def current_quality() -> QualityLevel:
+    """Stufe des aktuellen Requests. Ohne Lastregelung (CLI, Benchmarks) Stufe 0."""
+    return _current_quality.get() or full_quality()
+
+
+def fast_mode() -> bool:
+    level = _current_quality.get()
+    return level is not None and level.fast
+
+
+def queue_pressure() -> float:
+    """Füllstand der vollsten Lane-Warteschlange (0 = leer, 1 = voll)."""
+    lanes = get_admission_controller().lanes.values()
+    return max((lane.waiting / max(1, lane.max_queue) for lane in lanes), default=0.0)
+
+
+def memory_pressure() -> float:
+    """RSS relativ zum Recycling-Limit des Memory-Watchdogs (0 ohne Limit)."""
+    if settings.memory_rss_limit_mb <= 0:
+        return 0.0
+    return rss_bytes() / (settings.memory_rss_limit_mb * MB)
+
+
+def _exceeded(value: float, thresholds: Sequence[float], factor: float = 1.0) -> int:
+    return sum(1 for threshold in thresholds if value >= threshold * factor)
+
+
+class LoadController:
+    """
+    Wählt die Qualitätsstufe nach Warteschlangentiefe und Speicherdruck.
+
+    Überschreitet einer der Werte eine Schwelle, geht es sofort auf die
+    passende Stufe hinunter (niedrigere Rasterauflösung, weniger parallele
+    Seiten). Das Seitenlimit bleibt auf jeder Stufe gleich - weniger Seiten
+    würden die Ausgabe unbemerkt kürzen. Zurück geht es nur eine Stufe auf
+    einmal, frühestens nach hold_seconds und erst, wenn beide Werte um
+    recover_margin unter der Schwelle liegen - sonst pendelt die Stufe bei
+    einem Burst hin und her.
+
+    Requests mit priority=low laufen ab fast_from_level zusätzlich im
+    Fast-Mode. Ausgewertet wird bei jeder Anfrage (ein Read auf /proc).
+    """
+
+    def __init__(
+        self,
+        levels: List[QualityLevel],
+        queue_thresholds: Sequence[float],
+        memory_thresholds: Sequence[float],
+        recover_margin: float = 0.2,
+        hold_seconds: float = 15.0,
+        fast_from_level: int = 1,
+        queue_signal: Callable[[], float] = queue_pressure,
+        memory_signal: Callable[[], float] = memory_pressure,
+    ):
+        self.levels = levels
+        self.queue_thresholds = list(queue_thresholds)
+        self.memory_thresholds = list(memory_thresholds)
+        self.recover_margin = recover_margin
+        self.hold_seconds = hold_seconds
+        self.fast_from_level = fast_from_level
+        self.queue_signal = queue_signal
+        self.memory_signal = memory_signal
+
+        self._level = 0
+        self._changed_at = time.monotonic()
+        self._queue = 0.0
+        self._memory = 0.0
+        self._lock = threading.Lock()
+
+        self.degradations = 0
+        self.recoveries = 0
+        self.requests_by_level: Dict[int, int] = {level.level: 0 for level in levels}
+        self.fast_requests = 0
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.levels[self._level]
+
+    def _target(self, factor: float = 1.0) -> int:
+        target = max(
+            _exceeded(self._queue, self.queue_thresholds, factor),
+            _exceeded(self._memory, self.memory_thresholds, factor),
+        )
+        return min(target, len(self.levels) - 1)
+
+    def update(self) -> QualityLevel:
+        """Last messen und Stufe anpassen."""
+        queue, memory = self.queue_signal(), self.memory_signal()
+
+        with self._lock:
+            self._queue, self._memory = queue, memory
+            now = time.monotonic()
+
+            target = self._target()
+            if target > self._level:
+                logger.warning(
+                    f"Load high (queue {queue:.2f}, memory {memory:.2f}), "
+                    f"degrading quality level {self._level} -> {target}"
+                )
+                self._level = target
+                self._changed_at = now
+                self.degradations += 1
+
+            elif (
+                self._level > 0
+                and now - self._changed_at >= self.hold_seconds
+                and self._target(1.0 - self.recover_margin) < self._level
+            ):
+                logger.info(
+                    f"Load dropped (queue {queue:.2f}, memory {memory:.2f}), "
+                    f"raising quality level {self._level} -> {self._level - 1}"
+                )
+                self._level -= 1
+                self._changed_at = now
+                self.recoveries += 1
+
+            return self.level
+
+    def level_for(self, priority: str = PRIORITY_NORMAL) -> QualityLevel:
+        """Stufe für einen neuen Request (nach der Admission, vor der Verarbeitung)."""
+        level = self.update()
+        if priority == PRIORITY_LOW and level.level >= self.fast_from_level:
+            level = replace(level, fast=True)
+
+        with self._lock:
+            self.requests_by_level[level.level] += 1
+            if level.fast:
+                self.fast_requests += 1
+
+        return level
+
+    def stats(self) -> dict:
+        level = self.update()
+        return {
+            "level": level.level,
+            "current": level.to_dict(),
+            "queue_pressure": round(self._queue, 3),
+            "memory_pressure": round(self._memory, 3),
+            "degradations": self.degradations,
+            "recoveries": self.recoveries,
+            "requests_by_level": dict(self.requests_by_level),
+            "fast_requests": self.fast_requests,
+            "levels": [level.to_dict() for level in self.levels],
+        }
+
+
+def get_load_controller() -> LoadController:
+    """
+    Lazy Loading Singleton für die Lastregelung.
+    Mit quality_degradation=false gibt es nur Stufe 0.
+    """
+    global _load_controller_instance
+
+    if _load_controller_instance is None:
+        with _load_controller_lock:
+            if _load_controller_instance is None:
+                levels = quality_levels() if settings.quality_degradation else [full_quality()]
+                _load_controller_instance = LoadController(
+                    levels,
+                    settings.quality_queue_thresholds,
+                    settings.quality_memory_thresholds,
+                    recover_margin=settings.quality_recover_margin,
+                    hold_seconds=settings.quality_hold_seconds,
+                    # Ohne Lastregelung auch kein Fast-Mode
+                    fast_from_level=settings.quality_fast_from_level if len(levels) > 1 else 1,
+                )
+
+    return _load_controller_instance
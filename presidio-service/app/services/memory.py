@@ -0,0 +1,256 @@
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional
+import ctypes
+import ctypes.util
+import gc
+import logging
+import os
+import resource
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Letzte Request-Profile für /debug/memory
+RECENT_PROFILES = 20
+
+_profile: ContextVar[Optional["MemoryProfile"]] = ContextVar("memory_profile", default=None)
+_recent: Deque[dict] = deque(maxlen=RECENT_PROFILES)
+_recent_lock = threading.Lock()
+
+_baseline: Optional[tracemalloc.Snapshot] = None
+_baseline_lock = threading.Lock()
+
+_libc = None
+if ctypes.util.find_library("c"):
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c"))
+        _libc.malloc_trim  # nur glibc
+    except (OSError, AttributeError):
+        _libc = None
+
+
+def rss_bytes() -> int:
+    """Aktueller Resident Set Size des Prozesses."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Ohne /proc (macOS lokal): nur der Höchststand ist verfügbar
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def rss_high_water_bytes() -> int:
+    """Höchster RSS seit Prozessstart."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def release_memory() -> int:
+    """
+    Garbage Collection und freie Heap-Seiten an das OS zurückgeben.
+
+    Nach großen PIL-Puffern bleibt der glibc-Heap fragmentiert - malloc_trim
+    gibt freie Bereiche zurück, ohne dass der Prozess neu starten muss.
+
+    Returns:
+        Freigegebene Bytes (RSS vorher - nachher)
+    """
+    before = rss_bytes()
+    gc.collect()
+    if _libc is not None:
+        _libc.malloc_trim(0)
+    return max(0, before - rss_bytes())
+
+
+# --- tracemalloc ------------------------------------------------------------
+
+def start_tracing(frames: int = 10):
+    """tracemalloc starten - kostet spürbar CPU und Speicher, nur zur Diagnose."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        logger.info(f"tracemalloc started ({frames} frames)")
+
+
+def stop_tracing():
+    global _baseline
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        logger.info("tracemalloc stopped")
+    with _baseline_lock:
+        _baseline = None
+
+
+def tracing_stats() -> Dict[str, float]:
+    if not tracemalloc.is_tracing():
+        return {"tracing": False}
+
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "tracing": True,
+        "frames": tracemalloc.get_traceback_limit(),
+        "traced_mb": round(current / MB, 1),
+        "traced_peak_mb": round(peak / MB, 1),
+        "overhead_mb": round(tracemalloc.get_tracemalloc_memory() / MB, 1),
+        "baseline": _baseline is not None,
+    }
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running")
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+
+
+def _stat_to_dict(stat) -> dict:
+    entry = {
+        "location": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+        "size_kb": round(stat.size / 1024, 1),
+        "count": stat.count,
+    }
+    if hasattr(stat, "size_diff"):
+        entry["size_diff_kb"] = round(stat.size_diff / 1024, 1)
+        entry["count_diff"] = stat.count_diff
+    return entry
+
+
+def top_allocations(limit: int = 20, group_by: str = "lineno") -> List[dict]:
+    """
+    Größte Allokationen seit Start von tracemalloc.
+
+    Args:
+        group_by: lineno, filename oder traceback
+
+    Raises:
+        RuntimeError: tracemalloc läuft nicht
+    """
+    stats = _snapshot().statistics(group_by)
+    return [_stat_to_dict(stat) for stat in stats[:limit]]
+
+
+def take_baseline():
+    """Snapshot als Vergleichsbasis für diff_from_baseline merken."""
+    global _baseline
+    snapshot = _snapshot()
+    with _baseline_lock:
+        _baseline = snapshot
+
+
+def diff_from_baseline(limit: int = 20, group_by: str = "lineno") -> List[dict]:
+    """
+    Zuwachs seit take_baseline() - zeigt, was zwischen zwei Zeitpunkten liegen bleibt.
+
+    Raises:
+        RuntimeError: tracemalloc läuft nicht oder keine Basis gesetzt
+    """
+    with _baseline_lock:
+        baseline = _baseline
+    if baseline is None:
+        raise RuntimeError("No baseline snapshot taken")
+
+    stats = _snapshot().compare_to(baseline, group_by)
+    return [_stat_to_dict(stat) for stat in stats[:limit]]
+
+
+# --- Speicherprofil pro Request ---------------------------------------------
+
+@dataclass
+class MemoryStage:
+    """Speicher vor/nach einem Verarbeitungsschritt."""
+    name: str
+    rss_before_mb: float
+    rss_after_mb: float
+    seconds: float
+    traced_peak_mb: Optional[float] = None  # nur mit tracemalloc
+
+
+@dataclass
+class MemoryProfile:
+    """Speicherverlauf eines Requests, Schritt für Schritt."""
+    label: str
+    rss_start_mb: float
+    stages: List[MemoryStage] = field(default_factory=list)
+
+    @property
+    def peak_mb(self) -> float:
+        values = [self.rss_start_mb]
+        for stage in self.stages:
+            values.append(stage.rss_after_mb)
+            if stage.traced_peak_mb is not None:
+                values.append(stage.rss_before_mb + stage.traced_peak_mb)
+        return max(values)
+
+    def to_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "rss_start_mb": self.rss_start_mb,
+            "peak_mb": round(self.peak_mb, 1),
+            "stages": [asdict(stage) for stage in self.stages],
+        }
+
+
+def start_profile(label: str) -> MemoryProfile:
+    """Profil für den aktuellen Request anlegen (gilt auch im Threadpool)."""
+    profile = MemoryProfile(label=label, rss_start_mb=round(rss_bytes() / MB, 1))
+    _profile.set(profile)
+    return profile
+
+
+def finish_profile(profile: Optional[MemoryProfile]):
+    """Profil loggen und für /debug/memory aufheben."""
+    if profile is None or not profile.stages:
+        return
+
+    rss_end = rss_bytes() / MB
+    logger.info(
+        f"Memory {profile.label}: peak {profile.peak_mb:.0f} MB, "
+        f"{profile.rss_start_mb:.0f} -> {rss_end:.0f} MB RSS"
+    )
+    with _recent_lock:
+        _recent.append(dict(profile.to_dict(), rss_end_mb=round(rss_end, 1)))
+
+
+def recent_profiles() -> List[dict]:
+    with _recent_lock:
+        return list(_recent)
+
+
+@contextmanager
+def track_memory(stage: str) -> Iterator[None]:
+    """
+    RSS vor und nach einem Schritt messen und im Request-Profil ablegen.
+
+    Mit tracemalloc zusätzlich die Spitze der Python-Allokationen im Schritt.
+    tracemalloc zählt prozessweit - bei parallelen Requests nur eine Näherung.
+    """
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        traced_before = tracemalloc.get_traced_memory()[0]
+    rss_before = rss_bytes()
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        rss_after = rss_bytes()
+        entry = MemoryStage(
+            name=stage,
+            rss_before_mb=round(rss_before / MB, 1),
+            rss_after_mb=round(rss_after / MB, 1),
+            seconds=round(time.monotonic() - started, 3),
+        )
+        if tracing and tracemalloc.is_tracing():
+            entry.traced_peak_mb = round((tracemalloc.get_traced_memory()[1] - traced_before) / MB, 1)
+
+        profile = _profile.get()
+        if profile is not None:
+            profile.stages.append(entry)
+        logger.debug(f"Memory {stage}: {entry.rss_before_mb:.0f} -> {entry.rss_after_mb:.0f} MB RSS")
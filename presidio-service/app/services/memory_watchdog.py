@@ -0,0 +1,193 @@
+from typing import Callable, Dict, Optional
+import logging
+import os
+import signal
+import threading
+import time
+
+from app.config import settings
+from app.services.memory import MB, release_memory, rss_bytes, rss_high_water_bytes
+
+logger = logging.getLogger(__name__)
+
+# Singleton Pattern: ein Watchdog pro Worker-Prozess
+_watchdog_instance: Optional["MemoryWatchdog"] = None
+_watchdog_lock = threading.Lock()
+
+STATE_OK = "ok"
+STATE_DRAINING = "draining"
+STATE_RECYCLING = "recycling"
+
+
+def terminate_worker():
+    """
+    Worker beenden - Gunicorn startet einen frischen Worker mit leerem Heap.
+    SIGTERM führt zum normalen Shutdown (Lifespan, Job-Queue).
+    """
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+class MemoryWatchdog:
+    """
+    Überwacht den RSS des Workers und recycelt ihn vor dem Container-Limit.
+
+    Überschreitet der RSS limit_mb, wird zuerst der Heap getrimmt (GC +
+    malloc_trim). Reicht das nicht, nimmt der Worker keine neuen Requests
+    mehr an (503), wartet bis laufende Requests und Jobs fertig sind
+    (höchstens drain_timeout) und beendet sich dann per SIGTERM.
+
+    Liegen Job-Ergebnisse nur im Speicher des Workers (job_store_backend=
+    memory), wird nicht recycelt - der Neustart würde sie verlieren. Der
+    Worker bleibt dann über dem Limit und trimmt weiter; recyceln kann er
+    erst, wenn die Ergebnisse verfallen sind (oder mit dem SQLite-Store).
+    """
+
+    def __init__(
+        self,
+        limit_mb: int,
+        in_flight: Callable[[], int],
+        retained: Callable[[], int] = lambda: 0,
+        interval: float = 5.0,
+        drain_timeout: float = 60.0,
+        recycle: Callable[[], None] = terminate_worker,
+    ):
+        self.limit_bytes = limit_mb * MB
+        self.in_flight = in_flight
+        self.retained = retained
+        self.interval = interval
+        self.drain_timeout = drain_timeout
+        self.recycle = recycle
+
+        self.state = STATE_OK
+        self.trims = 0
+        self.trimmed_bytes = 0
+        self._drain_started: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def draining(self) -> bool:
+        return self.state != STATE_OK
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="memory-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Memory watchdog started (limit {self.limit_bytes // MB} MB RSS)")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+    def check(self):
+        """Eine Prüfung - läuft im Watchdog-Thread alle interval Sekunden."""
+        if self.state == STATE_OK:
+            rss = rss_bytes()
+            if rss < self.limit_bytes:
+                return
+
+            freed = release_memory()
+            self.trims += 1
+            self.trimmed_bytes += freed
+            rss = rss_bytes()
+            logger.info(f"RSS above limit, trimmed {freed / MB:.0f} MB, now {rss / MB:.0f} MB")
+            if rss < self.limit_bytes:
+                return
+
+            if self.retained():
+                logger.warning(
+                    f"RSS {rss / MB:.0f} MB above limit, not recycling: "
+                    f"{self.retained()} pending or undelivered jobs only held in memory"
+                )
+                return
+
+            logger.warning(
+                f"RSS {rss / MB:.0f} MB above limit {self.limit_bytes / MB:.0f} MB, "
+                f"draining worker for recycling"
+            )
+            self.state = STATE_DRAINING
+            self._drain_started = time.monotonic()
+
+        if self.state == STATE_DRAINING:
+            busy = self.in_flight()
+            waited = time.monotonic() - self._drain_started
+            if busy and waited < self.drain_timeout:
+                return
+
+            # Während des Drains fertig gewordene Jobs - Ergebnisse nicht verwerfen
+            if self.retained():
+                logger.warning("Job results only held in memory, cancelling drain")
+                self.state = STATE_OK
+                self._drain_started = None
+                return
+
+            if busy:
+                logger.warning(f"Drain timeout after {waited:.0f}s, recycling with {busy} requests in flight")
+            else:
+                logger.info(f"Worker drained after {waited:.0f}s, recycling")
+            self.state = STATE_RECYCLING
+            self.recycle()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "state": self.state,
+            "rss_mb": round(rss_bytes() / MB, 1),
+            "rss_high_water_mb": round(rss_high_water_bytes() / MB, 1),
+            "limit_mb": self.limit_bytes // MB,
+            "trims": self.trims,
+            "trimmed_mb": round(self.trimmed_bytes / MB, 1),
+            "in_flight": self.in_flight(),
+            "retained_jobs": self.retained(),
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Memory watchdog error: {e}")
+
+
+def start_memory_watchdog(
+    in_flight: Callable[[], int],
+    retained: Callable[[], int] = lambda: 0,
+) -> Optional[MemoryWatchdog]:
+    """
+    Watchdog beim Start des Workers anlegen (memory_rss_limit_mb = 0: aus).
+
+    Args:
+        in_flight: Laufende/wartende Requests und Jobs - darauf wird gewartet
+        retained: Jobs, die nur im Speicher liegen - solange > 0 kein Recycling
+    """
+    global _watchdog_instance
+
+    if settings.memory_rss_limit_mb <= 0:
+        return None
+
+    with _watchdog_lock:
+        if _watchdog_instance is None:
+            _watchdog_instance = MemoryWatchdog(
+                settings.memory_rss_limit_mb,
+                in_flight,
+                retained,
+                interval=settings.memory_check_interval_seconds,
+                drain_timeout=settings.memory_drain_timeout_seconds,
+            )
+            _watchdog_instance.start()
+
+    return _watchdog_instance
+
+
+def get_memory_watchdog() -> Optional[MemoryWatchdog]:
+    """Laufender Watchdog oder None (deaktiviert bzw. nicht gestartet)."""
+    return _watchdog_instance
+
+
+def stop_memory_watchdog():
+    global _watchdog_instance
+
+    with _watchdog_lock:
+        if _watchdog_instance is not None:
+            _watchdog_instance.stop()
+            _watchdog_instance = None
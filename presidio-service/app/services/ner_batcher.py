@@ -0,0 +1,129 @@
+from collections import deque
+from presidio_analyzer.nlp_engine import NlpArtifacts, NlpEngine
+from typing import Deque, Dict, List, Optional
+import logging
+import threading
+import time
+
+from app.utils.deadline import DeadlineExceeded, current_deadline
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingText:
+    """Ein Text, der auf seinen Platz im nächsten Batch wartet."""
+
+    __slots__ = ("text", "language", "done", "result", "error", "cancelled")
+
+    def __init__(self, text: str, language: str):
+        self.text = text
+        self.language = language
+        self.done = threading.Event()
+        self.result: Optional[NlpArtifacts] = None
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+
+
+class NlpBatcher:
+    """
+    Micro-Batching der spaCy-Pipeline über parallele Requests.
+
+    Worker-Threads reichen ihren Text ein und warten auf die NlpArtifacts.
+    Ein Hintergrund-Thread sammelt Texte, bis max_batch_size erreicht ist oder
+    max_wait_ms seit dem ersten wartenden Text vergangen sind, und schickt sie
+    gemeinsam durch nlp.pipe. Größere Batches = mehr Durchsatz, längeres
+    Warten = mehr Latenz für einzelne Requests.
+
+    Die Recognizer laufen weiter im Thread des Requests - gebündelt wird nur
+    der teure Teil (Tokenizer, Tagger, NER).
+    """
+
+    def __init__(self, nlp_engine: NlpEngine, max_batch_size: int = 16, max_wait_ms: float = 5.0):
+        self.nlp_engine = nlp_engine
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+
+        self._pending: Deque[_PendingText] = deque()
+        self._condition = threading.Condition()
+        self.batches = 0
+        self.texts = 0
+
+        self._thread = threading.Thread(target=self._run, name="nlp-batcher", daemon=True)
+        self._thread.start()
+
+    def process(self, text: str, language: str) -> NlpArtifacts:
+        """
+        NlpArtifacts für einen Text - blockiert, bis sein Batch gelaufen ist.
+
+        Raises:
+            DeadlineExceeded: Deadline des Requests läuft vorher ab
+        """
+        pending = _PendingText(text, language)
+        with self._condition:
+            self._pending.append(pending)
+            self._condition.notify()
+
+        deadline = current_deadline()
+        if not pending.done.wait(deadline.remaining() if deadline else None):
+            # Noch nicht im Batch - wird übersprungen; sonst verfällt das Ergebnis
+            pending.cancelled = True
+            raise DeadlineExceeded("Deadline exceeded while waiting for NLP batch")
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    def _collect(self) -> List[_PendingText]:
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+
+            # Ab dem ersten Text höchstens max_wait auf weitere warten
+            flush_at = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch_size:
+                remaining = flush_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            count = min(len(self._pending), self.max_batch_size)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = [pending for pending in self._collect() if not pending.cancelled]
+
+            by_language: Dict[str, List[_PendingText]] = {}
+            for pending in batch:
+                by_language.setdefault(pending.language, []).append(pending)
+
+            for language, group in by_language.items():
+                try:
+                    outputs = self.nlp_engine.process_batch(
+                        texts=[pending.text for pending in group],
+                        language=language,
+                        batch_size=len(group),
+                    )
+                    for pending, (_, nlp_artifacts) in zip(group, outputs):
+                        pending.result = nlp_artifacts
+                except Exception as e:
+                    logger.error(f"NLP batch failed ({len(group)} texts): {e}")
+                    for pending in group:
+                        if pending.result is None:
+                            pending.error = e
+                finally:
+                    for pending in group:
+                        pending.done.set()
+
+            if batch:
+                self.batches += 1
+                self.texts += len(batch)
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from PIL import Image
+from typing import Any, Dict, Optional
+import hashlib
+import logging
+import threading
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Singleton Pattern: ein Cache pro Prozess, von allen Worker-Threads geteilt
+_ocr_cache_instance: Optional["OCRCache"] = None
+_ocr_cache_lock = threading.Lock()
+
+
+def page_key(image: Image.Image, *parts: str) -> str:
+    """
+    Schlüssel aus den Pixeln der Seite und den Verarbeitungsparametern.
+
+    Bewusst ein exakter Hash: dieselbe Seite in einem neu gespeicherten oder
+    zusammengeführten PDF rastert zu denselben Pixeln. Ein perzeptueller Hash
+    würde auch ähnliche Seiten mit anderem Namen treffen - deren Boxen würden
+    dann die falschen Stellen schwärzen.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}".encode())
+    for part in parts:
+        digest.update(b"\0" + part.encode())
+    digest.update(b"\0")
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def ocr_settings_fingerprint() -> str:
+    """Alle Settings, die OCR-Text oder Boxen beeinflussen."""
+    return "|".join(str(value) for value in (
+        settings.ocr_backend,
+        settings.ocr_adaptive_resolution,
+        settings.ocr_target_line_height,
+        settings.ocr_min_line_height,
+        settings.ocr_max_megapixels,
+        settings.ocr_binarize,
+        settings.ocr_regions,
+        settings.ocr_skip_graphics,
+        ",".join(settings.entities_to_anonymize),
+    ))
+
+
+class OCRCache:
+    """
+    LRU-Cache für OCR-Ergebnisse pro Seite (Boxen bzw. Text).
+
+    Begrenzt auf max_entries Einträge - die Werte sind klein (Boxen, Text),
+    die Seitenbilder selbst werden nicht gespeichert. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def get_ocr_cache() -> OCRCache:
+    """Lazy Loading Singleton für den OCR-Cache."""
+    global _ocr_cache_instance
+
+    if _ocr_cache_instance is None:
+        with _ocr_cache_lock:
+            if _ocr_cache_instance is None:
+                _ocr_cache_instance = OCRCache(settings.ocr_cache_entries)
+                logger.info(f"OCR cache: {settings.ocr_cache_entries} entries")
+
+    return _ocr_cache_instance
@@ -0,0 +1,186 @@
+from abc import abstractmethod
+from contextlib import contextmanager
+from presidio_image_redactor import OCR, TesseractOCR
+from PIL import Image
+import pytesseract
+from typing import Dict, Optional
+import logging
+import queue
+import threading
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+OCR_BACKENDS = ("auto", "tesserocr", "pytesseract")
+
+
+class OCRBackend(OCR):
+    """
+    OCR-Backend für Presidio (perform_ocr) und Volltext (image_to_text).
+    perform_ocr liefert dasselbe Dict-Format wie pytesseract.image_to_data.
+    """
+
+    name = "ocr"
+
+    @abstractmethod
+    def image_to_text(self, image: Image.Image, lang: str = "deu") -> str:
+        """Volltext eines Bildes."""
+
+    def close(self):
+        """Ressourcen beim Herunterfahren freigeben."""
+
+
+class PytesseractOCR(TesseractOCR, OCRBackend):
+    """
+    Fallback: pytesseract startet pro Aufruf einen tesseract-Prozess,
+    schreibt das Bild als Temp-Datei und lädt die traineddata neu.
+    """
+
+    name = "pytesseract"
+
+    def image_to_text(self, image: Image.Image, lang: str = "deu") -> str:
+        return pytesseract.image_to_string(image, lang=lang)
+
+
+class TesserocrOCR(OCRBackend):
+    """
+    Tesseract über die C-API (tesserocr), ohne Subprozess und Temp-Dateien.
+
+    Ein PyTessBaseAPI-Handle ist nicht thread-safe - jeder Aufruf leiht sich
+    ein Handle aus einem Pool pro Sprache und gibt es danach zurück. Der Pool
+    ist auf die OCR-Lane begrenzt (lane_ocr_concurrency), die Handles bleiben
+    über alle Seiten und Requests hinweg geladen; weitere Threads warten auf
+    ein freies Handle. Bilder werden direkt aus dem Speicher übergeben.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, pool_size: Optional[int] = None):
+        # Import hier, damit das Modul auch ohne tesserocr importierbar ist
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self._pool_size = max(1, pool_size or settings.lane_ocr_concurrency)
+        self._pools: Dict[str, queue.Queue] = {}
+        self._created: Dict[str, int] = {}
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _api(self, lang: str):
+        """API-Handle für die Sprache ausleihen (lazy initialisiert, höchstens pool_size)."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Tesseract API pool is closed")
+            pool = self._pools.setdefault(lang, queue.Queue())
+            try:
+                api = pool.get_nowait()
+            except queue.Empty:
+                api = None
+                create = self._created.get(lang, 0) < self._pool_size
+                if create:
+                    self._created[lang] = self._created.get(lang, 0) + 1
+
+        if api is None:
+            if create:
+                logger.info(f"Initializing Tesseract API ({lang}), {self._created[lang]}/{self._pool_size}")
+                try:
+                    api = self._tesserocr.PyTessBaseAPI(lang=lang)
+                except Exception:
+                    with self._lock:
+                        self._created[lang] -= 1
+                    raise
+            else:
+                api = pool.get()
+
+        try:
+            yield api
+        finally:
+            api.Clear()
+            with self._lock:
+                if self._closed:
+                    api.End()
+                else:
+                    pool.put(api)
+
+    def close(self):
+        """Alle Handles freigeben (beim Herunterfahren); ausgeliehene enden bei Rückgabe."""
+        with self._lock:
+            self._closed = True
+            pools, self._pools = self._pools, {}
+
+        for lang, pool in pools.items():
+            while True:
+                try:
+                    pool.get_nowait().End()
+                except queue.Empty:
+                    break
+        logger.info("Tesseract API pool closed")
+
+    def perform_ocr(self, image: object, **kwargs) -> dict:
+        """
+        Wörter mit Bounding Boxes und Konfidenz.
+
+        Args:
+            image: PIL Image
+            kwargs: lang (Tesseract-Sprache, z.B. "deu"); weitere pytesseract-
+                Optionen (config) werden ignoriert
+        """
+        RIL = self._tesserocr.RIL
+        result = {"left": [], "top": [], "width": [], "height": [], "conf": [], "text": []}
+
+        with self._api(kwargs.get("lang", settings.tesseract_lang)) as api:
+            api.SetImage(image)
+            api.Recognize()
+
+            iterator = api.GetIterator()
+            if iterator is None:
+                return result
+
+            for word in self._tesserocr.iterate_level(iterator, RIL.WORD):
+                try:
+                    text = word.GetUTF8Text(RIL.WORD)
+                except RuntimeError:  # leeres Wort (Rauschen auf fast leeren Scans)
+                    continue
+                box = word.BoundingBox(RIL.WORD)
+                if text is None or box is None:
+                    continue
+                x1, y1, x2, y2 = box
+                result["left"].append(x1)
+                result["top"].append(y1)
+                result["width"].append(x2 - x1)
+                result["height"].append(y2 - y1)
+                result["conf"].append(word.Confidence(RIL.WORD))
+                result["text"].append(text)
+
+        return result
+
+    def image_to_text(self, image: Image.Image, lang: str = "deu") -> str:
+        with self._api(lang) as api:
+            api.SetImage(image)
+            return api.GetUTF8Text()
+
+
+def create_ocr_backend(backend: Optional[str] = None) -> OCRBackend:
+    """
+    OCR-Backend nach Settings erzeugen.
+
+    "auto" nutzt tesserocr, wenn installiert, sonst pytesseract.
+    """
+    backend = backend or settings.ocr_backend
+    if backend not in OCR_BACKENDS:
+        raise ValueError(f"Unknown OCR backend: {backend}")
+
+    if backend in ("auto", "tesserocr"):
+        try:
+            engine = TesserocrOCR()
+            logger.info("OCR backend: tesserocr (persistent API)")
+            return engine
+        except ImportError:
+            if backend == "tesserocr":
+                raise
+            logger.warning("tesserocr not installed, falling back to pytesseract")
+
+    logger.info("OCR backend: pytesseract")
+    return PytesseractOCR()
@@ -0,0 +1,162 @@
+from presidio_image_redactor import ImagePreprocessor
+from PIL import Image
+from typing import Optional, Tuple
+import logging
+import math
+import numpy as np
+
+from app.config import settings
+from app.services.load_controller import fast_mode
+
+logger = logging.getLogger(__name__)
+
+# Arbeitsgröße für die Schätzung der Zeilenhöhe (längste Seite in Pixeln)
+_ESTIMATE_SIZE = 1200
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Otsu-Schwellwert für ein Graustufenbild (uint8)."""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    if total == 0:
+        return 128
+
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = total - weight_bg
+    sum_bg = np.cumsum(hist * levels)
+    mean_bg = sum_bg / np.maximum(weight_bg, 1)
+    mean_fg = (sum_bg[-1] - sum_bg) / np.maximum(weight_fg, 1)
+
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between))
+
+
+def estimate_line_height(gray: Image.Image) -> Optional[float]:
+    """
+    Typische Textzeilenhöhe in Pixeln des Originalbilds schätzen.
+
+    Nutzt das horizontale Projektionsprofil eines verkleinerten,
+    binarisierten Bilds: Zusammenhängende Zeilen mit Tinte entsprechen
+    Textzeilen, der Median ihrer Höhe ist die Zeilenhöhe.
+
+    Returns:
+        Zeilenhöhe oder None, wenn keine Textzeilen erkennbar sind.
+    """
+    width, height = gray.size
+    factor = min(1.0, _ESTIMATE_SIZE / max(width, height))
+    if factor < 1.0:
+        small = gray.resize(
+            (max(1, int(width * factor)), max(1, int(height * factor))),
+            Image.BILINEAR,
+        )
+    else:
+        small = gray
+
+    arr = np.asarray(small)
+    ink = arr < otsu_threshold(arr)
+
+    # Zeilen mit wenig Tinte (Rauschen, Ränder) zählen als Zwischenraum
+    row_ink = ink.mean(axis=1)
+    is_text_row = row_ink > 0.01
+
+    # Läufe aufeinanderfolgender Textzeilen finden
+    padded = np.concatenate(([False], is_text_row, [False]))
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    runs = changes[1::2] - changes[0::2]
+
+    # Sehr hohe Läufe sind Bilder/Grafiken, 1-Pixel-Läufe sind Linien
+    runs = runs[(runs >= 2) & (runs <= arr.shape[0] / 8)]
+    if runs.size == 0:
+        return None
+
+    return float(np.median(runs)) / factor
+
+
+class AdaptiveOCRPreprocessor(ImagePreprocessor):
+    """
+    Bereitet Bilder für Tesseract vor: Graustufen, reduzierte Auflösung, binarisiert.
+
+    Die OCR-Auflösung richtet sich nach der geschätzten Zeilenhöhe und
+    einem Megapixel-Budget. Der Skalierungsfaktor wird als "scale_factor"
+    zurückgegeben - Presidio rechnet die erkannten Boxen damit auf das
+    Originalbild zurück, geschwärzt wird also in voller Qualität.
+
+    Im Fast-Mode (priority=low unter Last) zielt die Skalierung direkt auf
+    min_line_height.
+    """
+
+    def __init__(
+        self,
+        target_line_height: int = 40,
+        min_line_height: int = 24,
+        max_megapixels: float = 4.0,
+        binarize: bool = True,
+    ):
+        """
+        Args:
+            target_line_height: Angestrebte Zeilenhöhe in Pixeln. Tesseracts
+                LSTM normalisiert Zeilen intern auf ~36px, mehr Auflösung
+                kostet nur Zeit.
+            min_line_height: Darunter wird nie verkleinert (Erkennungsrate)
+            max_megapixels: Budget für die OCR-Kopie
+            binarize: Otsu-Binarisierung vor der OCR
+        """
+        super().__init__(use_greyscale=True)
+        self.target_line_height = target_line_height
+        self.min_line_height = min_line_height
+        self.max_megapixels = max_megapixels
+        self.binarize = binarize
+
+    def choose_scale(self, gray: Image.Image) -> float:
+        """OCR-Skalierung (<= 1.0) aus Zeilenhöhe und Seitengröße bestimmen."""
+        width, height = gray.size
+        scale = 1.0
+
+        line_height = estimate_line_height(gray)
+        if line_height:
+            target = self.min_line_height if fast_mode() else self.target_line_height
+            scale = target / line_height
+
+        megapixels = width * height / 1_000_000
+        if megapixels > self.max_megapixels:
+            scale = min(scale, math.sqrt(self.max_megapixels / megapixels))
+
+        # Das Budget darf Text nicht unter die Mindesthöhe drücken
+        if line_height:
+            scale = max(scale, self.min_line_height / line_height)
+
+        # Nie hochskalieren - kostet nur Zeit
+        return min(1.0, scale)
+
+    def preprocess_image(self, image: Image.Image) -> Tuple[Image.Image, dict]:
+        gray = image if image.mode == "L" else image.convert("L")
+
+        scale = self.choose_scale(gray)
+        if scale < 1.0:
+            width, height = gray.size
+            gray = gray.resize(
+                (max(1, round(width * scale)), max(1, round(height * scale))),
+                Image.BILINEAR,
+                reducing_gap=2.0,
+            )
+
+        if self.binarize:
+            threshold = otsu_threshold(np.asarray(gray))
+            gray = gray.point(lambda value: 255 if value > threshold else 0)
+
+        logger.debug(f"OCR preprocessing: scale={scale:.2f}, size={gray.size}")
+        return gray, {"scale_factor": scale}
+
+
+def create_ocr_preprocessor() -> ImagePreprocessor:
+    """Preprocessor gemäß Settings (ohne adaptive Auflösung: unverändertes Bild)."""
+    if not settings.ocr_adaptive_resolution:
+        return ImagePreprocessor(use_greyscale=False)
+
+    return AdaptiveOCRPreprocessor(
+        target_line_height=settings.ocr_target_line_height,
+        min_line_height=settings.ocr_min_line_height,
+        max_megapixels=settings.ocr_max_megapixels,
+        binarize=settings.ocr_binarize,
+    )
@@ -0,0 +1,417 @@
+from dataclasses import dataclass, field
+from presidio_image_redactor import ImageAnalyzerEngine
+from presidio_image_redactor.entities import ImageRecognizerResult
+from PIL import Image
+from typing import Dict, List, Optional, Tuple
+import logging
+import math
+import threading
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Arbeitsgröße für die Layout-Analyse (längste Seite in Pixeln)
+_WORK_SIZE = 1000
+
+# Kachelgröße in Pixeln der Arbeitsgröße (~ halbe Zeilenhöhe bei A4)
+_TILE = 8
+
+# Umgebung (Pixel der Arbeitsgröße) für den lokalen Papierton bei der Strich-Erkennung
+_STROKE_RADIUS = 8
+
+Box = Tuple[int, int, int, int]  # left, top, right, bottom
+
+
+@dataclass
+class PageLayout:
+    """Ergebnis der Layout-Analyse einer Seite."""
+
+    blank: bool
+    regions: List[Box] = field(default_factory=list)  # leer + nicht blank = ganze Seite
+    page_pixels: int = 0
+    graphics: int = 0   # übersprungene Foto-/Grafikflächen
+
+    @property
+    def full_page(self) -> bool:
+        return not self.blank and not self.regions
+
+    @property
+    def ocr_pixels(self) -> int:
+        if self.blank:
+            return 0
+        if not self.regions:
+            return self.page_pixels
+        return sum((right - left) * (bottom - top) for left, top, right, bottom in self.regions)
+
+
+class TextRegionDetector:
+    """
+    Findet leere Seiten und textführende Bereiche eines Scans (NumPy, ~10 ms/Seite).
+
+    Auf einer verkleinerten Graustufenkopie: Tinte = deutlich dunkler als das
+    Papier (90. Perzentil). Keine Kachel mit Tinte = leere Seite. Sonst werden Kacheln
+    mit Tinte markiert, zu Blöcken verbunden (Wortabstände horizontal, Zeilen-
+    abstände vertikal) und mit Rand auf das Original zurückgerechnet.
+
+    Fotos und Grafiken bestehen überwiegend aus Mitteltönen, Text (auch weiß
+    auf dunklem Balken) aus Papier und Tinte - mit skip_graphics werden große
+    Blöcke mit vielen Mitteltönen nicht an Tesseract gegeben. Vignettierte
+    oder verschattete Textseiten bestehen aber ebenfalls aus Mitteltönen:
+    Blöcke mit Tintenstrichen (deutlich dunkler als ihre Umgebung) werden
+    deshalb immer OCRt, und eine Seite gilt nie als leer, nur weil alle
+    Blöcke wie Grafik aussehen. Im Zweifel wird OCR gemacht.
+    """
+
+    def __init__(
+        self,
+        contrast: int = 48,
+        skip_graphics: bool = False,
+        graphic_midtones: float = 0.5,
+        graphic_texture: float = 16.0,
+        graphic_max_strokes: float = 0.005,
+        min_graphic_area: float = 0.02,
+        full_page_area: float = 0.8,
+        margin: int = 2,
+    ):
+        """
+        Args:
+            contrast: So viel dunkler als das Papier zählt ein Pixel als Tinte
+            skip_graphics: Foto-/Grafikblöcke überspringen
+            graphic_midtones: Anteil Mitteltöne, ab dem ein Block als Foto gilt
+            graphic_texture: Mindest-Streuung der Mitteltöne (Foto statt Farbfläche)
+            graphic_max_strokes: Ab diesem Anteil Tintenstriche ist ein Block kein Foto
+            min_graphic_area: Kleinere Blöcke (Anteil der Seite) werden immer OCRt
+            full_page_area: Decken die Bereiche mehr ab, wird die ganze Seite OCRt
+            margin: Rand um jeden Bereich in Kacheln
+        """
+        self.contrast = contrast
+        self.skip_graphics = skip_graphics
+        self.graphic_midtones = graphic_midtones
+        self.graphic_texture = graphic_texture
+        self.graphic_max_strokes = graphic_max_strokes
+        self.min_graphic_area = min_graphic_area
+        self.full_page_area = full_page_area
+        self.margin = margin
+
+    def detect(self, image: Image.Image) -> PageLayout:
+        width, height = image.size
+        layout = PageLayout(blank=False, page_pixels=width * height)
+
+        gray = image if image.mode == "L" else image.convert("L")
+        factor = max(1, math.ceil(max(width, height) / _WORK_SIZE))
+        small = gray.reduce(factor) if factor > 1 else gray
+        arr = np.asarray(small, dtype=np.int16)
+
+        paper = int(np.percentile(arr, 90))
+        ink = arr < paper - self.contrast
+
+        # Kacheln mit Tinte (Rand auffüllen, damit das Raster aufgeht)
+        rows = -(-arr.shape[0] // _TILE)
+        cols = -(-arr.shape[1] // _TILE)
+        padded = np.zeros((rows * _TILE, cols * _TILE), dtype=bool)
+        padded[:arr.shape[0], :arr.shape[1]] = ink
+        tile_ink = padded.reshape(rows, _TILE, cols, _TILE).sum(axis=(1, 3))
+        occupied = tile_ink >= 2
+
+        # Leer nur ohne jede belegte Kachel - eine einzelne Namenszeile hat
+        # weit weniger Tinte als jeder sinnvolle Seitenanteil
+        if not occupied.any():
+            layout.blank = True
+            return layout
+
+        # Wörter zu Zeilen, Zeilen zu Blöcken verbinden
+        joined = _dilate(occupied, horizontal=3, vertical=1)
+
+        scale = _TILE * factor
+
+        def to_box(top, left, bottom, right) -> Box:
+            return (
+                max(0, (left - self.margin) * scale),
+                max(0, (top - self.margin) * scale),
+                min(width, (right + self.margin) * scale),
+                min(height, (bottom + self.margin) * scale),
+            )
+
+        regions = []
+        for top, left, bottom, right in _components(joined):
+            if tile_ink[top:bottom, left:right].sum() < 8:
+                continue  # einzelne Staubkörner
+
+            area = (bottom - top) * (right - left) / (rows * cols)
+            if self.skip_graphics and area >= self.min_graphic_area:
+                block = arr[top * _TILE:bottom * _TILE, left * _TILE:right * _TILE]
+                if self._is_graphic(block, paper):
+                    layout.graphics += 1
+                    # Text direkt am Foto (Bildunterschrift, Name daneben) hängt
+                    # nach der Dilatation im selben Block - nur den Fotokern auslassen
+                    core_top, core_left, core_bottom, core_right = self._graphic_core(block, paper)
+                    rest = occupied[top:bottom, left:right].copy()
+                    rest[core_top:core_bottom, core_left:core_right] = False
+                    rest_ink = np.where(rest, tile_ink[top:bottom, left:right], 0)
+                    for sub_top, sub_left, sub_bottom, sub_right in _components(_dilate(rest, 3, 1)):
+                        if rest_ink[sub_top:sub_bottom, sub_left:sub_right].sum() < 8:
+                            continue
+                        regions.append(to_box(top + sub_top, left + sub_left, top + sub_bottom, left + sub_right))
+                    continue
+
+            regions.append(to_box(top, left, bottom, right))
+
+        regions = _merge_overlapping(regions)
+        if not regions:
+            # Nur Fotos/Grafiken: die Seite hat Tinte, also ganz OCRen statt
+            # sie als leer zu verwerfen
+            return layout
+
+        covered = sum((r - l) * (b - t) for l, t, r, b in regions)
+        if covered < self.full_page_area * width * height:
+            # Lesereihenfolge: oben nach unten, dann links nach rechts
+            layout.regions = sorted(regions, key=lambda box: (box[1], box[0]))
+        return layout
+
+    def _is_graphic(self, block: np.ndarray, paper: int) -> bool:
+        """
+        Foto/Grafik: überwiegend Mitteltöne mit Struktur und ohne Tintenstriche.
+        Einfarbige Flächen (Kopfbalken mit heller Schrift) haben kaum Streuung,
+        Text auf verschattetem Papier hat Striche - beides wird OCRt.
+        """
+        midtone = (block < paper - self.contrast // 2) & (block > paper // 3)
+        if midtone.mean() < self.graphic_midtones:
+            return False
+        if float(block[midtone].std()) < self.graphic_texture:
+            return False
+        return self._stroke_ratio(block) < self.graphic_max_strokes
+
+    def _stroke_ratio(self, block: np.ndarray) -> float:
+        """Anteil Pixel, die um contrast dunkler sind als das hellste Pixel ihrer Umgebung."""
+        background = _local_max(block, _STROKE_RADIUS)
+        return float((block < background - self.contrast).mean())
+
+    def _graphic_core(self, block: np.ndarray, paper: int) -> Tuple[int, int, int, int]:
+        """Kachelbereich (top, left, bottom, right) der Zeilen/Spalten, die überwiegend Mitteltöne sind."""
+        midtone = (block < paper - self.contrast // 2) & (block > paper // 3)
+        photo_rows = np.nonzero(midtone.mean(axis=1) >= self.graphic_midtones)[0]
+        photo_cols = np.nonzero(midtone.mean(axis=0) >= self.graphic_midtones)[0]
+        if not len(photo_rows) or not len(photo_cols):
+            return 0, 0, 0, 0
+        return (
+            int(photo_rows[0]) // _TILE,
+            int(photo_cols[0]) // _TILE,
+            -(-(int(photo_rows[-1]) + 1) // _TILE),
+            -(-(int(photo_cols[-1]) + 1) // _TILE),
+        )
+
+
+def _dilate(mask: np.ndarray, horizontal: int, vertical: int) -> np.ndarray:
+    """Binäre Dilatation um horizontal/vertical Kacheln (ohne scipy)."""
+    out = mask.copy()
+    for shift in range(1, horizontal + 1):
+        out[:, shift:] |= mask[:, :-shift]
+        out[:, :-shift] |= mask[:, shift:]
+    grown = out.copy()
+    for shift in range(1, vertical + 1):
+        out[shift:, :] |= grown[:-shift, :]
+        out[:-shift, :] |= grown[shift:, :]
+    return out
+
+
+def _local_max(arr: np.ndarray, radius: int) -> np.ndarray:
+    """Maximum im Quadrat mit Radius radius um jedes Pixel (ohne scipy)."""
+    out = arr.copy()
+    for shift in range(1, radius + 1):
+        out[:, shift:] = np.maximum(out[:, shift:], arr[:, :-shift])
+        out[:, :-shift] = np.maximum(out[:, :-shift], arr[:, shift:])
+    rows = out.copy()
+    for shift in range(1, radius + 1):
+        out[shift:, :] = np.maximum(out[shift:, :], rows[:-shift, :])
+        out[:-shift, :] = np.maximum(out[:-shift, :], rows[shift:, :])
+    return out
+
+
+def _components(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """Zusammenhängende Flächen im Kachelraster als (top, left, bottom, right)."""
+    rows, cols = mask.shape
+    seen = np.zeros_like(mask)
+    components = []
+
+    for start_y, start_x in zip(*np.nonzero(mask)):
+        if seen[start_y, start_x]:
+            continue
+        seen[start_y, start_x] = True
+        stack = [(start_y, start_x)]
+        top, left, bottom, right = start_y, start_x, start_y, start_x
+        while stack:
+            y, x = stack.pop()
+            top, left = min(top, y), min(left, x)
+            bottom, right = max(bottom, y), max(right, x)
+            for ny, nx in ((y + 1, x), (y - 1, x), (y, x + 1), (y, x - 1)):
+                if 0 <= ny < rows and 0 <= nx < cols and mask[ny, nx] and not seen[ny, nx]:
+                    seen[ny, nx] = True
+                    stack.append((ny, nx))
+        components.append((int(top), int(left), int(bottom) + 1, int(right) + 1))
+
+    return components
+
+
+def _merge_overlapping(boxes: List[Box]) -> List[Box]:
+    """Überlappende Boxen (nach dem Rand) zusammenfassen, bis keine mehr überlappen."""
+    merged = list(boxes)
+    changed = True
+    while changed:
+        changed = False
+        result: List[Box] = []
+        for box in merged:
+            for i, other in enumerate(result):
+                if box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]:
+                    result[i] = (
+                        min(box[0], other[0]), min(box[1], other[1]),
+                        max(box[2], other[2]), max(box[3], other[3]),
+                    )
+                    changed = True
+                    break
+            else:
+                result.append(box)
+        merged = result
+    return merged
+
+
+class RegionStats:
+    """Zähler für /metrics: wie viel Seitenfläche tatsächlich OCRt wird."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.blank_pages = 0
+        self.graphics_skipped = 0
+        self.page_pixels = 0
+        self.ocr_pixels = 0
+
+    def add(self, layout: PageLayout):
+        with self._lock:
+            self.pages += 1
+            self.blank_pages += int(layout.blank)
+            self.graphics_skipped += layout.graphics
+            self.page_pixels += layout.page_pixels
+            self.ocr_pixels += layout.ocr_pixels
+
+    def to_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "pages": self.pages,
+                "blank_pages": self.blank_pages,
+                "graphics_skipped": self.graphics_skipped,
+                "ocr_pixel_ratio": round(self.ocr_pixels / self.page_pixels, 4) if self.page_pixels else 1.0,
+            }
+
+
+region_stats = RegionStats()
+
+
+class RegionImageAnalyzerEngine(ImageAnalyzerEngine):
+    """
+    ImageAnalyzerEngine mit Layout-Vorlauf: leere Seiten ohne OCR, sonst nur
+    die textführenden Bereiche.
+
+    Die Bereiche werden aus der vorverarbeiteten Kopie ausgeschnitten, einzeln
+    an Tesseract gegeben und die Wortboxen um den Ausschnitt verschoben - danach
+    läuft alles wie in ImageAnalyzerEngine.analyze (Zurückskalieren, Text,
+    Analyzer, Boxen), der Analyzer sieht weiterhin den Text der ganzen Seite.
+    """
+
+    def __init__(self, *args, region_detector: TextRegionDetector, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.region_detector = region_detector
+
+    def analyze(
+        self, image: object, ocr_kwargs: Optional[dict] = None, **text_analyzer_kwargs
+    ) -> List[ImageRecognizerResult]:
+        layout = self.region_detector.detect(image)
+        region_stats.add(layout)
+        if layout.blank:
+            logger.info("Blank page, skipping OCR")
+            return []
+        if layout.full_page:
+            return super().analyze(image, ocr_kwargs, **text_analyzer_kwargs)
+
+        perform_ocr_kwargs, ocr_threshold = self._parse_ocr_kwargs(ocr_kwargs)
+        prepared, preprocessing_metadata = self.image_preprocessor.preprocess_image(image)
+        scale = (preprocessing_metadata or {}).get("scale_factor", 1.0)
+
+        ocr_result = ocr_regions(self.ocr, prepared, layout.regions, scale, **perform_ocr_kwargs)
+        ocr_result = self.remove_space_boxes(ocr_result)
+        if scale != 1.0:
+            ocr_result = self._scale_bbox_results(ocr_result, scale)
+        if ocr_threshold:
+            ocr_result = self.threshold_ocr_result(ocr_result, ocr_threshold)
+
+        logger.info(
+            f"ROI OCR: {len(layout.regions)} regions, "
+            f"{layout.ocr_pixels / layout.page_pixels:.0%} of the page"
+        )
+
+        text = self.ocr.get_text_from_ocr_dict(ocr_result)
+        if "language" not in text_analyzer_kwargs:
+            text_analyzer_kwargs["language"] = "en"
+        analyzer_result = self.analyzer_engine.analyze(text=text, **text_analyzer_kwargs)
+        allow_list = self._check_for_allow_list(text_analyzer_kwargs)
+        return self.map_analyzer_results_to_bounding_boxes(
+            analyzer_result, ocr_result, text, allow_list
+        )
+
+
+def _scaled(box: Box, scale: float, size: Tuple[int, int]) -> Box:
+    left, top, right, bottom = box
+    return (
+        max(0, math.floor(left * scale)),
+        max(0, math.floor(top * scale)),
+        min(size[0], math.ceil(right * scale)),
+        min(size[1], math.ceil(bottom * scale)),
+    )
+
+
+def ocr_regions(ocr, prepared: Image.Image, regions: List[Box], scale: float, **ocr_kwargs) -> dict:
+    """
+    Bereiche (Koordinaten des Originals) auf der vorverarbeiteten Kopie OCRen.
+
+    Returns:
+        perform_ocr-Dict mit Boxen in Koordinaten der vorverarbeiteten Kopie
+    """
+    combined = {"left": [], "top": [], "width": [], "height": [], "conf": [], "text": []}
+    for region in regions:
+        left, top, right, bottom = _scaled(region, scale, prepared.size)
+        if right <= left or bottom <= top:
+            continue
+        result = ocr.perform_ocr(prepared.crop((left, top, right, bottom)), **ocr_kwargs)
+        for key in combined:
+            values = list(result.get(key, []))
+            if key == "left":
+                values = [value + left for value in values]
+            elif key == "top":
+                values = [value + top for value in values]
+            combined[key].extend(values)
+    return combined
+
+
+def region_text(ocr, prepared: Image.Image, regions: List[Box], scale: float, lang: str) -> str:
+    """Volltext der Bereiche in Lesereihenfolge (für extract_text)."""
+    texts = []
+    for region in regions:
+        left, top, right, bottom = _scaled(region, scale, prepared.size)
+        if right <= left or bottom <= top:
+            continue
+        text = ocr.image_to_text(prepared.crop((left, top, right, bottom)), lang=lang).strip()
+        if text:
+            texts.append(text)
+    return "\n\n".join(texts)
+
+
+def create_region_detector() -> Optional[TextRegionDetector]:
+    """Detector gemäß Settings (None = immer ganze Seite OCRen)."""
+    if not settings.ocr_regions:
+        return None
+
+    return TextRegionDetector(
+        skip_graphics=settings.ocr_skip_graphics,
+    )
@@ -0,0 +1,112 @@
+from dataclasses import dataclass, field
+from presidio_analyzer import RecognizerResult
+from typing import Dict, List, Set, Tuple
+import re
+
+# Zeilen inkl. Offset, ohne Zeilenumbruch
+_LINE = re.compile(r"[^\n]+")
+
+
+@dataclass
+class RepeatedBlock:
+    """
+    Kopf- oder Fußzeilenblock, der auf mehreren Seiten identisch vorkommt.
+
+    Die erste Fundstelle ist die Referenz: Sie wird im Kontext ihrer Seite
+    analysiert, alle weiteren werden vor der NLP-Pipeline ausgeblendet und
+    bekommen die Entities der Referenz.
+    """
+
+    text: str
+    occurrences: List[Tuple[int, int]] = field(default_factory=list)  # (Seitenindex, Offset in der Seite)
+
+
+def find_repeated_blocks(
+    pages: List[str],
+    zone_lines: int = 4,
+    min_pages: int = 2,
+) -> List[RepeatedBlock]:
+    """
+    Wiederholte Blöcke in den Kopf-/Fußzonen der Seiten finden.
+
+    Eine Zeile gilt als wiederholt, wenn sie (ohne Randleerzeichen) in der
+    Zone von mindestens min_pages Seiten steht. Aufeinanderfolgende
+    wiederholte Zeilen einer Zone bilden einen Block - Name, Adresse und
+    Kontaktzeile werden so zusammen analysiert. Blöcke werden über den
+    exakten Text zugeordnet, damit die Offsets der Referenz passen.
+    """
+    if len(pages) < 2 or zone_lines <= 0:
+        return []
+
+    # Zonenzeilen je Seite: [(Start, Ende, Text)]
+    zones: List[List[Tuple[int, int, str]]] = []
+    line_pages: Dict[str, Set[int]] = {}
+    for page_index, page in enumerate(pages):
+        lines = []
+        for match in _LINE.finditer(page):
+            stripped = match.group().strip()
+            if stripped:
+                offset = match.start() + match.group().index(stripped)
+                lines.append((offset, offset + len(stripped), stripped))
+
+        zone_indices = sorted(set(range(min(zone_lines, len(lines))))
+                              | set(range(max(0, len(lines) - zone_lines), len(lines))))
+        zone = [lines[i] + (i,) for i in zone_indices]
+        zones.append(zone)
+        for _, _, stripped, _ in zone:
+            line_pages.setdefault(stripped, set()).add(page_index)
+
+    repeated = {line for line, found in line_pages.items() if len(found) >= min_pages}
+    if not repeated:
+        return []
+
+    blocks: Dict[str, RepeatedBlock] = {}
+    for page_index, zone in enumerate(zones):
+        run: List[Tuple[int, int, str, int]] = []
+        for line in zone + [None]:
+            if line is not None and line[2] in repeated and (not run or line[3] == run[-1][3] + 1):
+                run.append(line)
+                continue
+            if run:
+                start, end = run[0][0], run[-1][1]
+                text = pages[page_index][start:end]
+                blocks.setdefault(text, RepeatedBlock(text)).occurrences.append((page_index, start))
+            run = [line] if line is not None and line[2] in repeated else []
+
+    return [block for block in blocks.values() if len(block.occurrences) >= 2]
+
+
+def mask(text: str, ranges: List[Tuple[int, int]]) -> str:
+    """Bereiche durch Leerzeichen ersetzen - Länge und Zeilenumbrüche bleiben."""
+    if not ranges:
+        return text
+    parts = []
+    position = 0
+    for start, end in sorted(ranges):
+        parts.append(text[position:start])
+        parts.append(re.sub(r"[^\n]", " ", text[start:end]))
+        position = end
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def project(
+    results: List[RecognizerResult],
+    source: int,
+    length: int,
+    target: int,
+) -> List[RecognizerResult]:
+    """Entities, die ganz im Block an Offset source liegen, auf Offset target übertragen."""
+    shift = target - source
+    return [
+        RecognizerResult(
+            result.entity_type,
+            result.start + shift,
+            result.end + shift,
+            result.score,
+            result.analysis_explanation,
+            result.recognition_metadata,
+        )
+        for result in results
+        if source <= result.start and result.end <= source + length
+    ]
@@ -1,9 +1,15 @@
+from contextlib import contextmanager
 from PIL import Image
 from pdf2image import convert_from_bytes
-import pdfplumber
-import io
-from typing import List
+from typing import Iterable, Iterator, List, Optional
 import logging
+import tempfile
+
+from app.config import settings
+from app.services.load_controller import current_quality
+from app.services.memory import track_memory
+from app.services.pdf_text_extractor import PDFTextExtractor, create_text_extractor
+from app.utils.pdf_writer import StreamingPDFWriter
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +17,9 @@ logger = logging.getLogger(__name__)
 class PDFProcessor:
     """PDF-Verarbeitung: Text-Extraktion und Bild-Konvertierung."""
 
+    def __init__(self, text_extractor: Optional[PDFTextExtractor] = None):
+        self.text_extractor = text_extractor or create_text_extractor()
+
     def extract_text(self, pdf_bytes: bytes) -> str:
         """
         Text aus PDF extrahieren.
@@ -18,64 +27,167 @@ class PDFProcessor:
         Returns:
             Extrahierter Text oder leerer String bei Scans.
         """
+        return "\n\n".join(text for text in self.extract_pages(pdf_bytes) if text)
+
+    def extract_pages(self, pdf_bytes: bytes) -> List[str]:
+        """
+        Text seitenweise extrahieren.
+
+        Returns:
+            Ein Eintrag pro Seite (leerer String für Seiten ohne Text).
+        """
         try:
-            with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-                texts = []
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        texts.append(text)
-                return "\n\n".join(texts)
+            return list(self.text_extractor.iter_pages(pdf_bytes))
         except Exception as e:
             logger.error(f"PDF text extraction error: {e}")
-            return ""
+            return []
+
+    def has_text_layer(
+        self,
+        pdf_bytes: bytes,
+        min_chars: int = 100,
+        probe_pages: Optional[int] = None,
+    ) -> bool:
+        """
+        Text-PDF oder Scan? Liest nur die ersten Seiten.
+
+        Bricht ab, sobald mehr als min_chars Zeichen gefunden sind. Enthalten die
+        ersten probe_pages Seiten keinen Text, wird das PDF als Scan behandelt.
+        """
+        probe_pages = probe_pages or settings.pdf_probe_pages
+        chars = 0
+
+        try:
+            for text in self.text_extractor.iter_pages(pdf_bytes, max_pages=probe_pages):
+                chars += len(text.strip())
+                if chars > min_chars:
+                    return True
+        except Exception as e:
+            logger.error(f"PDF text probe error: {e}")
+
+        return False
+
+    @contextmanager
+    def render_pages(
+        self,
+        pdf_bytes: bytes,
+        dpi: Optional[int] = None,
+        first_page: Optional[int] = None,
+        last_page: Optional[int] = None,
+    ) -> Iterator["RenderedPages"]:
+        """
+        PDF-Seiten in ein Temp-Verzeichnis rastern (pro Aufruf eigenes Verzeichnis).
+
+        Auflösung (ohne dpi) und Anzahl der pdftoppm-Prozesse kommen aus der
+        Qualitätsstufe des Requests - unter Last weniger und kleinere Seiten.
+        pdftoppm läuft parallel über Seitenbereiche und schreibt bei pdf_render_grayscale PGM statt PPM (1/3 der Daten).
+        Die Seiten werden erst beim Zugriff geöffnet; PIL mappt die
+        unkomprimierten PGM/PPM-Dateien per mmap statt sie zu kopieren.
+        Das Verzeichnis wird beim Verlassen des Kontexts gelöscht.
+
+        Usage:
+            with pdf_processor.render_pages(content, last_page=20) as pages:
+                for image in pages:
+                    ...
+        """
+        quality = current_quality()
+        with tempfile.TemporaryDirectory(prefix="presidio-pages-") as output_folder:
+            try:
+                with track_memory("pdf_render"):
+                    paths = convert_from_bytes(
+                        pdf_bytes,
+                        dpi=dpi or quality.render_dpi,
+                        first_page=first_page,
+                        last_page=last_page,
+                        output_folder=output_folder,
+                        paths_only=True,
+                        fmt="ppm",
+                        grayscale=settings.pdf_render_grayscale,
+                        thread_count=quality.render_threads,
+                    )
+            except Exception as e:
+                logger.error(f"PDF to image conversion error: {e}")
+                paths = []
+
+            yield RenderedPages(paths)
 
     def pdf_to_images(
         self,
         pdf_bytes: bytes,
-        dpi: int = 200,
+        dpi: Optional[int] = None,
+        first_page: Optional[int] = None,
+        last_page: Optional[int] = None,
     ) -> List[Image.Image]:
         """
-        PDF-Seiten in Bilder konvertieren.
+        PDF-Seiten in Bilder konvertieren (alle Seiten geladen).
+        Für viele Seiten render_pages() verwenden.
 
         Args:
             pdf_bytes: PDF als Bytes
-            dpi: Auflösung (höher = besser OCR, langsamer)
+            dpi: Auflösung (höher = besser OCR, langsamer), None = Qualitätsstufe
+            first_page: Erste Seite (1-basiert), None = ab Anfang
+            last_page: Letzte Seite (inklusive), None = bis Ende
 
         Returns:
             Liste von PIL Images
         """
-        try:
-            images = convert_from_bytes(pdf_bytes, dpi=dpi)
+        with track_memory("pdf_to_images"), \
+                self.render_pages(pdf_bytes, dpi, first_page, last_page) as pages:
+            images = []
+            for image in pages:
+                # Laden, solange die Datei existiert
+                image.load()
+                images.append(image)
             return images
-        except Exception as e:
-            logger.error(f"PDF to image conversion error: {e}")
-            return []
 
-    def images_to_pdf(self, images: List[Image.Image]) -> bytes:
+    def create_writer(self, resolution: float = 72.0) -> StreamingPDFWriter:
+        """PDF-Writer mit der konfigurierten Seiten-Kodierung."""
+        return StreamingPDFWriter(
+            color=settings.pdf_page_color,
+            compression=settings.pdf_page_compression,
+            jpeg_quality=settings.pdf_jpeg_quality,
+            resolution=resolution,
+        )
+
+    def images_to_pdf(self, images: Iterable[Image.Image], resolution: float = 72.0) -> bytes:
         """
         Bilder zurück in PDF konvertieren.
+        Jede Seite wird sofort kodiert - ein Generator hält nie alle Bilder im Speicher.
 
         Args:
-            images: Liste von PIL Images
+            images: PIL Images (Liste oder Generator)
+            resolution: DPI der Bilder - gerasterte Seiten behalten so ihre Seitengröße
 
         Returns:
-            PDF als Bytes
+            PDF als Bytes (leer, wenn keine Bilder)
         """
-        if not images:
+        writer = self.create_writer(resolution)
+        chunks = [writer.begin()]
+        for image in images:
+            chunks.append(writer.add_page(image))
+
+        if not writer.page_count:
             return b""
 
-        pdf_buffer = io.BytesIO()
+        chunks.append(writer.finish())
+        return b"".join(chunks)
+
+
+class RenderedPages:
+    """
+    Gerasterte Seiten als Dateien, lazy geöffnet.
+    Nur innerhalb von PDFProcessor.render_pages() gültig.
+    """
+
+    def __init__(self, paths: List[str]):
+        self.paths = paths
+
+    def __len__(self) -> int:
+        return len(self.paths)
 
-        # Erstes Bild speichern, Rest anhängen
-        if len(images) == 1:
-            images[0].save(pdf_buffer, format="PDF")
-        else:
-            images[0].save(
-                pdf_buffer,
-                format="PDF",
-                save_all=True,
-                append_images=images[1:],
-            )
+    def __getitem__(self, index: int) -> Image.Image:
+        return Image.open(self.paths[index])
 
-        return pdf_buffer.getvalue()
+    def __iter__(self) -> Iterator[Image.Image]:
+        for path in self.paths:
+            yield Image.open(path)
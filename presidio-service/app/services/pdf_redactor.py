@@ -0,0 +1,622 @@
+from dataclasses import dataclass, field
+from PIL import ImageDraw
+from PyPDF2 import PdfReader, PdfWriter, PageObject
+from PyPDF2.generic import (
+    ArrayObject,
+    ByteStringObject,
+    ContentStream,
+    FloatObject,
+    NameObject,
+    NumberObject,
+)
+from typing import Dict, List, Optional, Set, Tuple
+import copy
+import io
+import logging
+import pdfplumber
+
+from app.services.memory import track_memory
+from app.services.pdf_processor import PDFProcessor
+from app.utils.deadline import check_deadline
+
+logger = logging.getLogger(__name__)
+
+# Text-Operatoren, die Glyphen ausgeben
+_SHOW_OPERATORS = (b"Tj", b"TJ", b"'", b'"')
+
+# Verschachtelungstiefe für Form XObjects bei der Bildsuche
+_MAX_FORM_DEPTH = 8
+
+# Seiten mit weniger Text oder einem Bild über mindestens diesen Anteil der
+# Seite (eingescanntes Zeugnis, Ausweiskopie) laufen zusätzlich durch die OCR
+_MIN_PAGE_CHARS = 50
+_PAGE_IMAGE_AREA = 0.5
+
+# Seiteneinträge, die Text/Vorschauen außerhalb des Content Streams enthalten
+# (Links mit mailto:, Kommentare, Thumbnails, XMP)
+_STRIPPED_PAGE_KEYS = ("/Annots", "/Thumb", "/Metadata", "/PieceInfo")
+
+
+@dataclass
+class PDFRedactionResult:
+    """Ergebnis der Vektor-Schwärzung."""
+
+    pdf_bytes: bytes
+    pii_found: int
+    pages_processed: int
+    pages_rasterized: int = 0
+
+
+@dataclass
+class _TextState:
+    """Für die Glyphenbreiten relevanter Teil des PDF-Textzustands."""
+
+    font: Optional[str] = None
+    size: float = 0.0
+    char_space: float = 0.0
+    word_space: float = 0.0
+    scale: float = 100.0
+
+
+@dataclass
+class _PageText:
+    """Seitentext mit Zuordnung Textposition -> Index in page.chars."""
+
+    text: str
+    char_index: List[Optional[int]] = field(default_factory=list)
+
+
+class PDFRedactor:
+    """
+    Schwärzt Text-PDFs direkt im Vektor-PDF, ohne Rasterisierung und OCR.
+
+    1. Seitentext über pdfplumbers TextMap (identisch zu extract_text),
+       jede Textposition ist einem Zeichen mit Koordinaten zugeordnet
+    2. PII-Erkennung auf dem Gesamttext (gleiche Spans wie der Text-Output)
+    3. Betroffene Glyphen werden aus den Text-Operatoren entfernt und durch
+       gleich breite Abstände ersetzt - der restliche Text bleibt, wo er war
+    4. Schwarze Rechtecke über den entfernten Stellen
+
+    Seiten, deren Content Stream sich nicht eindeutig den Zeichen zuordnen lässt
+    (Text in Form XObjects, unbekannte CID-Kodierungen, vertikale Schrift),
+    werden als Fallback gerastert und mit geschwärzten Boxen als Bild ersetzt.
+    Ebenso Seiten, auf denen unter einer Box ein Bild liegt (durchsuchbare
+    Scans: Seitenbild mit unsichtbarer OCR-Textebene) - das Rechteck allein
+    würde die Pixel im eingebetteten Bild nicht entfernen.
+
+    Bewerbungsmappen hängen oft Scans an den Text-Lebenslauf an (Zeugnisse,
+    Ausweiskopien). Seiten mit kaum Text oder einem seitenfüllenden Bild
+    werden deshalb gerastert und per OCR geschwärzt wie ein Scan, auch wenn
+    ihre Textebene keine PII enthält.
+    """
+
+    def __init__(self, pdf_processor: Optional[PDFProcessor] = None, raster_dpi: int = 200):
+        self.pdf_processor = pdf_processor or PDFProcessor()
+        self.raster_dpi = raster_dpi
+
+    @track_memory("pdf_redact")
+    def redact(
+        self,
+        pdf_bytes: bytes,
+        text_anonymizer,
+        language: str = "de",
+        image_anonymizer=None,
+    ) -> PDFRedactionResult:
+        """
+        PII im PDF schwärzen.
+
+        Args:
+            pdf_bytes: Text-PDF als Bytes
+            text_anonymizer: TextAnonymizer für die PII-Erkennung
+            language: Sprache (de, en)
+            image_anonymizer: ImageAnonymizer für Bildseiten (None = Singleton)
+
+        Returns:
+            PDFRedactionResult mit dem geschwärzten PDF
+        """
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            page_texts = [self._page_text(page) for page in pdf.pages]
+            page_chars = [page.chars for page in pdf.pages]
+            page_origins = [(page.mediabox[0], page.mediabox[1]) for page in pdf.pages]
+
+        # Gesamttext wie PDFProcessor.extract_text (leere Seiten entfallen)
+        segments: List[Tuple[int, int]] = []  # (Offset im Gesamttext, Seitenindex)
+        parts = []
+        offset = 0
+        for page_index, page_text in enumerate(page_texts):
+            if not page_text.text:
+                continue
+            if parts:
+                offset += 2
+            segments.append((offset, page_index))
+            parts.append(page_text.text)
+            offset += len(page_text.text)
+
+        # Offsets beziehen sich auf "\n\n".join(parts)
+        results = text_anonymizer.analyze_pages(parts, language)
+        logger.info(f"Vector redaction: {len(results)} PII entities")
+
+        # Entities auf Zeichen je Seite abbilden
+        redacted: Dict[int, Set[int]] = {}
+        for result in results:
+            entity_chars: Dict[int, List[int]] = {}
+            for position in range(result.start, result.end):
+                page_index, local = self._locate(segments, position)
+                page_text = page_texts[page_index]
+                if local >= len(page_text.char_index):
+                    continue
+                char_index = page_text.char_index[local]
+                if char_index is not None:
+                    entity_chars.setdefault(page_index, []).append(char_index)
+
+            # Leerzeichen innerhalb einer Entity fehlen in der TextMap
+            # ("Max Mustermann") - mitschwärzen, damit eine durchgehende Box entsteht
+            for page_index, indices in entity_chars.items():
+                chars = page_chars[page_index]
+                target = redacted.setdefault(page_index, set())
+                target.update(indices)
+                for index in range(min(indices), max(indices)):
+                    if not chars[index]["text"].strip():
+                        target.add(index)
+
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        writer = PdfWriter()
+        rasterized = 0
+        ocr_found = 0
+
+        for page_index, page in enumerate(reader.pages):
+            check_deadline()
+            for key in _STRIPPED_PAGE_KEYS:
+                if key in page:
+                    del page[NameObject(key)]
+
+            remove = redacted.get(page_index) or set()
+            chars = page_chars[page_index]
+            boxes = self._boxes(chars, remove)
+            origin = page_origins[page_index]
+
+            if self._is_image_page(page, reader, page_texts[page_index]):
+                # Eingescannte Anlage: Textebene reicht nicht, Seite per OCR schwärzen
+                logger.info(f"Page {page_index + 1}: little text or page-sized image, rasterizing with OCR")
+                if image_anonymizer is None:
+                    from app.services.image_anonymizer import get_image_anonymizer
+                    image_anonymizer = get_image_anonymizer()
+                rendered, found = self._rasterize_page(
+                    pdf_bytes, page_index, boxes, origin, image_anonymizer, language
+                )
+                writer.add_page(rendered)
+                ocr_found += found
+                rasterized += 1
+            elif not remove:
+                writer.add_page(page)
+            elif self._image_under_boxes(page, reader, boxes, origin):
+                logger.info(f"Page {page_index + 1}: image under redacted text, rasterizing")
+                writer.add_page(self._rasterize_page(pdf_bytes, page_index, boxes, origin)[0])
+                rasterized += 1
+            elif self._rewrite_page(page, reader, chars, remove, boxes, origin):
+                writer.add_page(page)
+            else:
+                logger.warning(f"Page {page_index + 1}: text not removable, rasterizing")
+                writer.add_page(self._rasterize_page(pdf_bytes, page_index, boxes, origin)[0])
+                rasterized += 1
+
+        output = io.BytesIO()
+        writer.write(output)
+
+        return PDFRedactionResult(
+            pdf_bytes=output.getvalue(),
+            pii_found=len(results) + ocr_found,
+            pages_processed=len(page_texts),
+            pages_rasterized=rasterized,
+        )
+
+    @staticmethod
+    def _page_text(page) -> _PageText:
+        """Seitentext und Zeichenzuordnung aus derselben TextMap wie extract_text()."""
+        index_by_id = {id(char): i for i, char in enumerate(page.chars)}
+        textmap = page.get_textmap()
+
+        char_index: List[Optional[int]] = []
+        for text, char in textmap.tuples:
+            index = index_by_id.get(id(char)) if char is not None else None
+            char_index.extend([index] * len(text))
+
+        return _PageText(text=textmap.as_string, char_index=char_index)
+
+    @staticmethod
+    def _locate(segments: List[Tuple[int, int]], position: int) -> Tuple[int, int]:
+        """Offset im Gesamttext -> (Seitenindex, Offset im Seitentext)."""
+        current = segments[0]
+        for segment in segments:
+            if segment[0] > position:
+                break
+            current = segment
+        return current[1], position - current[0]
+
+    @staticmethod
+    def _boxes(chars: List[dict], remove: Set[int]) -> List[dict]:
+        """
+        Zusammenhängende geschwärzte Glyphen einer Zeile zu Boxen zusammenfassen
+        (horizontal gleiche Oberkante, vertikal - gedrehte Seiten - gleiche linke Kante).
+        """
+        boxes: List[dict] = []
+        previous = None
+
+        for index in sorted(remove):
+            char = chars[index]
+            box = boxes[-1] if boxes else None
+            if (
+                box is not None
+                and previous == index - 1
+                and (abs(char["top"] - box["top"]) < 1 or abs(char["x0"] - box["x0"]) < 1)
+            ):
+                box["x0"] = min(box["x0"], char["x0"])
+                box["x1"] = max(box["x1"], char["x1"])
+                box["y0"] = min(box["y0"], char["y0"])
+                box["y1"] = max(box["y1"], char["y1"])
+                box["bottom"] = max(box["bottom"], char["bottom"])
+            else:
+                boxes.append({key: char[key] for key in ("x0", "x1", "y0", "y1", "top", "bottom")})
+            previous = index
+
+        return boxes
+
+    def _rewrite_page(
+        self,
+        page: PageObject,
+        reader: PdfReader,
+        chars: List[dict],
+        remove: Set[int],
+        boxes: List[dict],
+        origin: Tuple[float, float],
+    ) -> bool:
+        """
+        Glyphen aus dem Content Stream entfernen und Schwärzungsboxen zeichnen.
+
+        Returns:
+            False, wenn der Content Stream nicht sicher zugeordnet werden konnte
+        """
+        if "/Contents" not in page:
+            return False
+
+        resources = page.get("/Resources")
+        fonts = resources.get_object().get("/Font", {}) if resources else {}
+        fonts = fonts.get_object() if fonts else {}
+
+        content = ContentStream(page["/Contents"], reader)
+        state = _TextState()
+        stack: List[_TextState] = []
+        glyph = 0
+        operations = []
+
+        for operands, operator in content.operations:
+            if operator == b"q":
+                stack.append(copy.copy(state))
+            elif operator == b"Q":
+                state = stack.pop() if stack else state
+            elif operator == b"Tf":
+                state.font = operands[0]
+                state.size = float(operands[1])
+            elif operator == b"Tc":
+                state.char_space = float(operands[0])
+            elif operator == b"Tw":
+                state.word_space = float(operands[0])
+            elif operator == b"Tz":
+                state.scale = float(operands[0])
+            elif operator in _SHOW_OPERATORS:
+                if operator == b'"':
+                    state.word_space = float(operands[0])
+                    state.char_space = float(operands[1])
+
+                code_width = self._code_width(fonts, state.font)
+                if code_width is None or state.size == 0:
+                    return False
+
+                sequence = operands[0] if operator == b"TJ" else [operands[-1]]
+                rewritten, glyph, changed = self._rewrite_sequence(
+                    sequence, code_width, state, chars, remove, glyph
+                )
+                if rewritten is None:
+                    return False
+
+                if changed:
+                    if operator == b"'":
+                        operations.append(([], b"T*"))
+                    elif operator == b'"':
+                        operations.append(([operands[0]], b"Tw"))
+                        operations.append(([operands[1]], b"Tc"))
+                        operations.append(([], b"T*"))
+                    operations.append(([rewritten], b"TJ"))
+                    continue
+
+            operations.append((operands, operator))
+
+        # Jedes Zeichen von pdfplumber muss genau einer Glyphe entsprechen
+        if glyph != len(chars):
+            return False
+
+        rects = []
+        for box in boxes:
+            x0, y0, x1, y1 = self._to_user_space(page, box, origin)
+            rects.append(
+                ([FloatObject(x0), FloatObject(y0), FloatObject(x1 - x0), FloatObject(y1 - y0)], b"re")
+            )
+
+        content.operations = (
+            [([], b"q")]
+            + operations
+            + [([], b"Q"), ([], b"q"), ([NumberObject(0)], b"g")]
+            + rects
+            + [([], b"f"), ([], b"Q")]
+        )
+        page[NameObject("/Contents")] = content
+        return True
+
+    def _is_image_page(self, page: PageObject, reader: PdfReader, page_text: _PageText) -> bool:
+        """Kaum Text oder ein Bild, das mindestens _PAGE_IMAGE_AREA der Seite bedeckt?"""
+        if len(page_text.text.strip()) < _MIN_PAGE_CHARS:
+            return True
+        if "/Contents" not in page:
+            return False
+
+        left, bottom, right, top = (float(value) for value in page.mediabox)
+        page_area = (right - left) * (top - bottom)
+        if page_area <= 0:
+            return False
+
+        resources = page.get("/Resources")
+        images = _image_bboxes(
+            ContentStream(page["/Contents"], reader),
+            resources.get_object() if resources else {},
+            reader,
+            (1.0, 0.0, 0.0, 1.0, 0.0, 0.0),
+        )
+        for x0, y0, x1, y1 in images:
+            # Auf die Seite beschneiden - Bilder können über den Rand ragen
+            width = min(x1, right) - max(x0, left)
+            height = min(y1, top) - max(y0, bottom)
+            if width > 0 and height > 0 and width * height >= _PAGE_IMAGE_AREA * page_area:
+                return True
+        return False
+
+    def _image_under_boxes(
+        self,
+        page: PageObject,
+        reader: PdfReader,
+        boxes: List[dict],
+        origin: Tuple[float, float],
+    ) -> bool:
+        """Zeichnet die Seite ein Bild (XObject, Inline, in Forms), das eine Box überlappt?"""
+        if "/Contents" not in page:
+            return False
+
+        rects = [self._to_user_space(page, box, origin) for box in boxes]
+        resources = page.get("/Resources")
+        images = _image_bboxes(
+            ContentStream(page["/Contents"], reader),
+            resources.get_object() if resources else {},
+            reader,
+            (1.0, 0.0, 0.0, 1.0, 0.0, 0.0),
+        )
+        return any(_overlaps(image, rect) for image in images for rect in rects)
+
+    @staticmethod
+    def _rewrite_sequence(
+        sequence,
+        code_width: int,
+        state: _TextState,
+        chars: List[dict],
+        remove: Set[int],
+        glyph: int,
+    ):
+        """
+        Text-Sequenz (Tj-String oder TJ-Array) ohne die zu entfernenden Glyphen.
+
+        Entfernte Glyphen werden durch TJ-Abstände ersetzt:
+        tx = (w0 * Tfs + Tc + Tw) * Th  ->  n = -(w0 * Tfs + Tc + Tw) * 1000 / Tfs
+
+        Returns:
+            (neues TJ-Array oder None, nächster Glyphenindex, geändert?)
+        """
+        horizontal_scale = state.scale / 100.0
+        result = ArrayObject()
+        kept = b""
+        pending = 0.0
+        changed = False
+
+        def flush_kept():
+            nonlocal kept
+            if kept:
+                result.append(ByteStringObject(kept))
+                kept = b""
+
+        def flush_pending():
+            nonlocal pending
+            if pending:
+                result.append(FloatObject(round(pending, 3)))
+                pending = 0.0
+
+        for element in sequence:
+            if isinstance(element, (int, float)) and not isinstance(element, bool):
+                flush_kept()
+                pending += float(element)
+                continue
+
+            raw = element.original_bytes if hasattr(element, "original_bytes") else bytes(element)
+            if len(raw) % code_width:
+                return None, glyph, False
+
+            for start in range(0, len(raw), code_width):
+                code = raw[start:start + code_width]
+                if glyph >= len(chars):
+                    return None, glyph, False
+
+                if glyph in remove:
+                    flush_kept()
+                    advance = chars[glyph]["adv"] / horizontal_scale + state.char_space
+                    if code_width == 1 and code == b" ":
+                        advance += state.word_space
+                    pending -= advance * 1000 / state.size
+                    changed = True
+                else:
+                    flush_pending()
+                    kept += code
+                glyph += 1
+
+        flush_kept()
+        flush_pending()
+        return result, glyph, changed
+
+    @staticmethod
+    def _code_width(fonts, font_name) -> Optional[int]:
+        """Bytes pro Glyphe für die Schrift (None = nicht unterstützt)."""
+        if font_name is None or font_name not in fonts:
+            return None
+
+        font = fonts[font_name].get_object()
+        if font.get("/Subtype") != "/Type0":
+            return 1
+
+        # Nur horizontale Identity-Kodierung hat feste 2 Bytes pro Glyphe
+        if font.get("/Encoding") == "/Identity-H":
+            return 2
+        return None
+
+    @staticmethod
+    def _to_user_space(page: PageObject, box: dict, origin: Tuple[float, float]) -> Tuple[float, float, float, float]:
+        """
+        pdfplumber-Koordinaten in den PDF User Space zurückrechnen.
+        pdfminer verschiebt um den MediaBox-Ursprung und dreht nach /Rotate.
+        """
+        mx0, my0, mx1, my1 = [float(value) for value in page["/MediaBox"]]
+        rotation = int(page.get("/Rotate", 0)) % 360
+
+        # Gerätekoordinaten wie von pdfminer berechnet
+        dx0, dx1 = box["x0"] - origin[0], box["x1"] - origin[0]
+        dy0, dy1 = box["y0"], box["y1"]
+
+        points = []
+        for dx, dy in ((dx0, dy0), (dx1, dy1)):
+            if rotation == 90:
+                points.append((mx1 - dy, dx + my0))
+            elif rotation == 180:
+                points.append((mx1 - dx, my1 - dy))
+            elif rotation == 270:
+                points.append((dy + mx0, my1 - dx))
+            else:
+                points.append((dx + mx0, dy + my0))
+
+        xs = [point[0] for point in points]
+        ys = [point[1] for point in points]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def _rasterize_page(
+        self,
+        pdf_bytes: bytes,
+        page_index: int,
+        boxes: List[dict],
+        origin: Tuple[float, float],
+        image_anonymizer=None,
+        language: str = "de",
+    ) -> Tuple[PageObject, int]:
+        """
+        Fallback: Seite rastern, Boxen schwärzen, als Bildseite zurückgeben.
+        Mit image_anonymizer wird das Seitenbild zusätzlich per OCR geschwärzt.
+
+        Returns:
+            (Bildseite, Anzahl OCR-Boxen)
+        """
+        images = self.pdf_processor.pdf_to_images(
+            pdf_bytes,
+            dpi=self.raster_dpi,
+            first_page=page_index + 1,
+            last_page=page_index + 1,
+        )
+        if not images:
+            raise RuntimeError(f"Could not rasterize page {page_index + 1}")
+
+        image = images[0]
+        scale = self.raster_dpi / 72.0
+        draw = ImageDraw.Draw(image)
+        for box in boxes:
+            draw.rectangle(
+                [
+                    (box["x0"] - origin[0]) * scale,
+                    (box["top"] - origin[1]) * scale,
+                    (box["x1"] - origin[0]) * scale,
+                    (box["bottom"] - origin[1]) * scale,
+                ],
+                fill="black",
+            )
+
+        found = 0
+        if image_anonymizer is not None:
+            bboxes = image_anonymizer.analyze(image, language)
+            image = image_anonymizer.redact(image, bboxes)
+            found = len(bboxes)
+
+        writer = self.pdf_processor.create_writer()
+        writer.resolution = self.raster_dpi
+        pdf = writer.begin() + writer.add_page(image) + writer.finish()
+        return PdfReader(io.BytesIO(pdf)).pages[0], found
+
+
+def _multiply(m: Tuple[float, ...], n: Tuple[float, ...]) -> Tuple[float, ...]:
+    """Matrixprodukt m x n (PDF-Matrizen [a b c d e f])."""
+    a, b, c, d, e, f = m
+    A, B, C, D, E, F = n
+    return (
+        a * A + b * C, a * B + b * D,
+        c * A + d * C, c * B + d * D,
+        e * A + f * C + E, e * B + f * D + F,
+    )
+
+
+def _unit_square(ctm: Tuple[float, ...]) -> Tuple[float, float, float, float]:
+    """Bounding Box des Einheitsquadrats (Bildfläche) unter der CTM."""
+    a, b, c, d, e, f = ctm
+    xs = [e, a + e, c + e, a + c + e]
+    ys = [f, b + f, d + f, b + d + f]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _overlaps(first: Tuple[float, ...], second: Tuple[float, ...]) -> bool:
+    return first[0] < second[2] and second[0] < first[2] and first[1] < second[3] and second[1] < first[3]
+
+
+def _image_bboxes(content: ContentStream, resources, reader: PdfReader, ctm, depth: int = 0) -> List[Tuple[float, ...]]:
+    """Flächen aller gezeichneten Bilder in User-Space-Koordinaten (Form XObjects rekursiv)."""
+    xobjects = resources.get("/XObject", {}) if resources else {}
+    xobjects = xobjects.get_object() if xobjects else {}
+
+    bboxes = []
+    stack = []
+    for operands, operator in content.operations:
+        if operator == b"q":
+            stack.append(ctm)
+        elif operator == b"Q":
+            ctm = stack.pop() if stack else ctm
+        elif operator == b"cm":
+            ctm = _multiply(tuple(float(value) for value in operands), ctm)
+        elif operator == b"INLINE IMAGE":
+            bboxes.append(_unit_square(ctm))
+        elif operator == b"Do" and operands[0] in xobjects:
+            xobject = xobjects[operands[0]].get_object()
+            subtype = xobject.get("/Subtype")
+            if subtype == "/Image":
+                bboxes.append(_unit_square(ctm))
+            elif subtype == "/Form":
+                if depth >= _MAX_FORM_DEPTH:
+                    # Unbekannter Inhalt - wie ein Bild über die ganze Seite behandeln
+                    bboxes.append((float("-inf"), float("-inf"), float("inf"), float("inf")))
+                    continue
+                matrix = tuple(float(value) for value in xobject.get("/Matrix", [1, 0, 0, 1, 0, 0]))
+                form_resources = xobject.get("/Resources")
+                bboxes.extend(_image_bboxes(
+                    ContentStream(xobject, reader),
+                    form_resources.get_object() if form_resources else resources,
+                    reader,
+                    _multiply(matrix, ctm),
+                    depth + 1,
+                ))
+    return bboxes
@@ -0,0 +1,417 @@
+from dataclasses import dataclass
+from PIL import Image, ImageChops, JpegImagePlugin
+from PyPDF2 import PdfReader, PdfWriter, PageObject
+from PyPDF2.generic import (
+    BooleanObject,
+    ContentStream,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+)
+from typing import Dict, List, Optional
+import io
+import logging
+import struct
+import zlib
+
+from app.config import settings
+from app.services.job_queue import ProgressCallback
+from app.services.load_controller import current_quality
+from app.services.memory import track_memory
+from app.services.pdf_processor import PDFProcessor
+from app.services.pdf_redactor import _STRIPPED_PAGE_KEYS
+from app.utils.deadline import check_deadline
+from app.utils.pdf_writer import ccitt_g4
+
+logger = logging.getLogger(__name__)
+
+# Operatoren, die eine reine Bildseite enthalten darf (Bild platzieren, sonst nichts)
+_IMAGE_PAGE_OPERATORS = (b"q", b"Q", b"cm", b"Do")
+
+# /Rotate -> Bild aufrecht drehen bzw. zurückdrehen (PIL dreht gegen den Uhrzeigersinn)
+_UPRIGHT = {90: Image.Transpose.ROTATE_270, 180: Image.Transpose.ROTATE_180, 270: Image.Transpose.ROTATE_90}
+_RESTORE = {90: Image.Transpose.ROTATE_90, 180: Image.Transpose.ROTATE_180, 270: Image.Transpose.ROTATE_270}
+
+# Farbräume mit 1 bzw. 3 Komponenten (Indexed, CMYK, Separation -> gerastert)
+_GRAY_SPACES = ("/DeviceGray", "/CalGray")
+_RGB_SPACES = ("/DeviceRGB", "/CalRGB")
+
+
+@dataclass
+class ScanRedactionResult:
+    """Ergebnis der Schwärzung eines Scan-PDFs."""
+
+    pdf_bytes: bytes
+    pii_found: int
+    pages_processed: int
+    pages_native: int
+    pages_rendered: int = 0
+
+
+@dataclass
+class _PageImage:
+    """Das einzige Bild einer Scan-Seite, dekodiert in nativer Auflösung."""
+
+    xobject: StreamObject
+    image: Image.Image
+    filter: str
+    rotation: int = 0
+
+
+class ScanPDFRedactor:
+    """
+    Schwärzt Scan-PDFs direkt in den eingebetteten Bildern.
+
+    Scanner legen pro Seite meist genau ein JPEG- oder CCITT-Bild ab. Solche
+    Seiten werden nicht gerastert: das Bild wird in nativer Auflösung aus dem
+    PDF gelesen, OCR/PII-Erkennung läuft darauf, und nur der Bild-Stream wird
+    ersetzt (JPEG mit den Quantisierungstabellen des Originals, CCITT als G4).
+    Bilder ohne PII bleiben Byte für Byte erhalten.
+
+    Seiten mit weiterem Inhalt (Text, Vektorgrafik, mehrere Bilder, Masken,
+    gedrehte Platzierung, JBIG2/JPX) werden wie bisher gerastert und als
+    Bildseite eingesetzt.
+    """
+
+    def __init__(self, pdf_processor: Optional[PDFProcessor] = None, raster_dpi: Optional[int] = None):
+        self.pdf_processor = pdf_processor or PDFProcessor()
+        self.raster_dpi = raster_dpi  # None = Qualitätsstufe des Requests
+
+    @track_memory("scan_redact")
+    def redact(
+        self,
+        pdf_bytes: bytes,
+        image_anonymizer,
+        language: str = "de",
+        last_page: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Optional[ScanRedactionResult]:
+        """
+        PII im Scan-PDF schwärzen.
+
+        Args:
+            pdf_bytes: Scan-PDF als Bytes
+            image_anonymizer: ImageAnonymizer für OCR und PII-Erkennung
+            language: Sprache (de, en)
+            last_page: Letzte Seite (inklusive), None = bis Ende
+            progress: Fortschritt (fertige Seiten, Seiten gesamt)
+
+        Returns:
+            ScanRedactionResult oder None, wenn keine Seite ein einzelnes
+            eingebettetes Bild ist (dann ist das Rastern aller Seiten schneller)
+        """
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        page_count = min(len(reader.pages), last_page) if last_page else len(reader.pages)
+        pages = [reader.pages[index] for index in range(page_count)]
+
+        page_images = [self._page_image(page) for page in pages]
+        native = sum(1 for page_image in page_images if page_image)
+        if not native:
+            return None
+
+        logger.info(f"Scan redaction: {native}/{page_count} pages with a single embedded image")
+
+        pii_found = 0
+        redacted_images: Dict[int, int] = {}  # id(XObject) -> Boxen (Bild auf mehreren Seiten)
+        output_pages = []
+
+        for page_index, (page, page_image) in enumerate(zip(pages, page_images)):
+            check_deadline()
+            for key in _STRIPPED_PAGE_KEYS:
+                if key in page:
+                    del page[NameObject(key)]
+
+            if page_image is None:
+                page, boxes = self._render_page(pdf_bytes, page_index, image_anonymizer, language)
+            else:
+                key = id(page_image.xobject)
+                if key not in redacted_images:
+                    redacted_images[key] = self._redact_image(page_image, image_anonymizer, language)
+                boxes = redacted_images[key]
+
+            pii_found += boxes
+            output_pages.append(page)
+            if progress:
+                progress(page_index + 1, page_count)
+
+        # Erst nach dem Schwärzen aller Bilder übernehmen: add_page kopiert die
+        # Ressourcen - ein geteiltes Bild, das erst eine spätere Seite schwärzt,
+        # stünde sonst ungeschwärzt in der Kopie
+        writer = PdfWriter()
+        for page in output_pages:
+            _keep_drawn_xobjects(page)
+            writer.add_page(page)
+
+        output = io.BytesIO()
+        writer.write(output)
+
+        return ScanRedactionResult(
+            pdf_bytes=output.getvalue(),
+            pii_found=pii_found,
+            pages_processed=page_count,
+            pages_native=native,
+            pages_rendered=page_count - native,
+        )
+
+    def _page_image(self, page: PageObject) -> Optional[_PageImage]:
+        """Einziges Bild der Seite, wenn der Content Stream nur dieses Bild aufrecht platziert."""
+        try:
+            contents = page.get_contents()
+            if contents is None:
+                return None
+            operations = ContentStream(contents, page.pdf).operations
+        except Exception as e:
+            logger.debug(f"Content stream not parseable: {e}")
+            return None
+
+        names = []
+        for operands, operator in operations:
+            if operator not in _IMAGE_PAGE_OPERATORS:
+                return None
+            if operator == b"Do":
+                names.append(operands[0])
+            elif operator == b"cm":
+                # Nur Skalieren/Verschieben - gedrehte oder gespiegelte Bilder würde OCR falsch lesen
+                a, b, c, d = (float(value) for value in operands[:4])
+                if b or c or a <= 0 or d <= 0:
+                    return None
+
+        if len(names) != 1:
+            return None
+
+        try:
+            xobject = page["/Resources"]["/XObject"][names[0]].get_object()
+            page_image = self._decode_image(xobject)
+        except Exception as e:
+            logger.debug(f"Embedded image not decodable: {e}")
+            return None
+
+        if page_image is not None:
+            page_image.rotation = int(page.get("/Rotate", 0)) % 360
+        return page_image
+
+    def _decode_image(self, xobject: StreamObject) -> Optional[_PageImage]:
+        """Image XObject als PIL Image (None = nicht unterstütztes Format)."""
+        if xobject.get("/Subtype") != "/Image" or xobject.get("/ImageMask"):
+            return None
+        if "/SMask" in xobject or "/Mask" in xobject:
+            return None
+
+        width, height = int(xobject["/Width"]), int(xobject["/Height"])
+        if width * height / 1_000_000 > settings.image_bomb_megapixels:
+            return None
+
+        filters = _as_list(xobject.get("/Filter"))
+        if len(filters) > 1:
+            return None
+        filter_name = filters[0] if filters else "/FlateDecode"
+        parms = _as_list(xobject.get("/DecodeParms"))
+        parms = parms[0].get_object() if parms else DictionaryObject()
+
+        components = _components(xobject.get("/ColorSpace"))
+        bits = int(xobject.get("/BitsPerComponent", 1 if filter_name == "/CCITTFaxDecode" else 8))
+        decode = [float(value) for value in xobject.get("/Decode", [])]
+        inverted = decode == [1.0, 0.0]
+        if decode and not (inverted and bits == 1):
+            return None
+
+        if filter_name == "/DCTDecode":
+            image = Image.open(io.BytesIO(xobject._data))
+            if image.mode not in ("L", "RGB") or decode:
+                return None
+
+        elif filter_name == "/CCITTFaxDecode":
+            if parms.get("/EncodedByteAlign") or int(parms.get("/Columns", 1728)) != width:
+                return None
+            # CCITT kodiert weiße/schwarze Läufe; /BlackIs1 und /Decode bestimmen,
+            # wie sie dargestellt werden
+            flipped = bool(parms.get("/BlackIs1", False)) != inverted
+            image = Image.open(io.BytesIO(
+                _ccitt_tiff(xobject._data, width, height, int(parms.get("/K", 0)), flipped)
+            ))
+
+        elif filter_name == "/FlateDecode" and components in (1, 3):
+            data = xobject.get_data()
+            if bits == 8:
+                image = Image.frombytes("L" if components == 1 else "RGB", (width, height), data)
+            elif bits == 1 and components == 1:
+                # Pillow packt 8 Pixel pro Byte, 0 = schwarz (wie DeviceGray)
+                image = Image.frombytes("1", (width, height), data)
+                if inverted:
+                    image = ImageChops.invert(image)
+            else:
+                return None
+
+        else:
+            return None
+
+        image.load()
+        if image.size != (width, height):
+            return None
+        return _PageImage(xobject=xobject, image=image, filter=filter_name)
+
+    def _redact_image(self, page_image: _PageImage, image_anonymizer, language: str) -> int:
+        """Bild aufrecht analysieren, bei PII schwärzen und den Stream ersetzen. Gibt die Boxen zurück."""
+        image = page_image.image
+        if page_image.rotation:
+            image = image.transpose(_UPRIGHT[page_image.rotation])
+
+        # OCR braucht keine Farbe (wie pdf_render_grayscale), 1-Bit erwartet die Vorverarbeitung nicht
+        bboxes = image_anonymizer.analyze(image if image.mode == "L" else image.convert("L"), language)
+
+        xobject = page_image.xobject
+        if "/Metadata" in xobject:
+            del xobject[NameObject("/Metadata")]
+        if not bboxes:
+            return 0
+
+        redacted = image_anonymizer.redact(image, bboxes)
+        if page_image.rotation:
+            redacted = redacted.transpose(_RESTORE[page_image.rotation])
+
+        self._replace_stream(page_image, redacted)
+        return len(bboxes)
+
+    @staticmethod
+    def _replace_stream(page_image: _PageImage, redacted: Image.Image):
+        """Bilddaten im Original-XObject ersetzen - Platzierung und Ressourcen bleiben."""
+        xobject = page_image.xobject
+        width, height = redacted.size
+        parms = None
+
+        if page_image.filter == "/DCTDecode":
+            # Gleiche Quantisierung/Unterabtastung wie das Original: Größe und Artefakte bleiben ähnlich
+            options = {"qtables": page_image.image.quantization}
+            sampling = JpegImagePlugin.get_sampling(page_image.image)
+            if sampling != -1:
+                options["subsampling"] = sampling
+            buffer = io.BytesIO()
+            redacted.save(buffer, format="JPEG", **options)
+            data = buffer.getvalue()
+
+        elif page_image.filter == "/CCITTFaxDecode":
+            data = ccitt_g4(redacted)
+            parms = DictionaryObject({
+                NameObject("/K"): NumberObject(-1),
+                NameObject("/Columns"): NumberObject(width),
+                NameObject("/Rows"): NumberObject(height),
+                NameObject("/BlackIs1"): BooleanObject(True),
+            })
+
+        else:
+            data = zlib.compress(redacted.tobytes(), 6)
+
+        xobject._data = data
+        xobject.decoded_self = None
+        xobject[NameObject("/Filter")] = NameObject(page_image.filter)
+        xobject[NameObject("/Length")] = NumberObject(len(data))
+        # Werte sind jetzt normalisiert (0 = schwarz), Prädiktoren entfallen
+        for key in ("/DecodeParms", "/Decode"):
+            if key in xobject:
+                del xobject[NameObject(key)]
+        if parms is not None:
+            xobject[NameObject("/DecodeParms")] = parms
+
+    def _render_page(self, pdf_bytes: bytes, page_index: int, image_anonymizer, language: str):
+        """Fallback: Seite rastern, schwärzen, als Bildseite zurückgeben (Seite, Boxen)."""
+        dpi = self.raster_dpi or current_quality().render_dpi
+        images = self.pdf_processor.pdf_to_images(
+            pdf_bytes,
+            dpi=dpi,
+            first_page=page_index + 1,
+            last_page=page_index + 1,
+        )
+        if not images:
+            raise RuntimeError(f"Could not rasterize page {page_index + 1}")
+
+        bboxes = image_anonymizer.analyze(images[0], language)
+        redacted = image_anonymizer.redact(images[0], bboxes)
+
+        writer = self.pdf_processor.create_writer(dpi)
+        pdf = writer.begin() + writer.add_page(redacted) + writer.finish()
+        return PdfReader(io.BytesIO(pdf)).pages[0], len(bboxes)
+
+
+def _keep_drawn_xobjects(page: PageObject):
+    """
+    /XObject der Seite auf die Objekte beschränken, die ihr Content Stream zeichnet.
+    Nicht gezeichnete Bilder - etwa aus Ressourcen, die sich die Seite mit
+    Seiten nach last_page teilt - würden sonst ungeschwärzt mitgeschrieben.
+    """
+    resources = page.get("/Resources")
+    if resources is None:
+        return
+    resources = resources.get_object()
+    xobjects = resources.get("/XObject")
+    if xobjects is None:
+        return
+
+    drawn = set()
+    contents = page.get_contents()
+    if contents is not None:
+        for operands, operator in ContentStream(contents, page.pdf).operations:
+            if operator == b"Do":
+                drawn.add(operands[0])
+
+    # Eigene Kopie - die Ressourcen können zwischen Seiten geteilt sein
+    resources = DictionaryObject(resources)
+    resources[NameObject("/XObject")] = DictionaryObject({
+        name: reference for name, reference in xobjects.get_object().items() if name in drawn
+    })
+    page[NameObject("/Resources")] = resources
+
+
+def _as_list(value) -> List:
+    """PDF-Wert, der Name oder Array sein darf, als Liste."""
+    if value is None:
+        return []
+    value = value.get_object()
+    return list(value) if isinstance(value, list) else [value]
+
+
+def _components(color_space) -> Optional[int]:
+    """Anzahl Farbkomponenten für Grau/RGB/ICCBased, sonst None."""
+    if color_space is None:
+        return None
+    color_space = color_space.get_object()
+    if isinstance(color_space, list):
+        if color_space and color_space[0] == "/ICCBased":
+            return int(color_space[1].get_object().get("/N", 0)) or None
+        if color_space and color_space[0] in _GRAY_SPACES + _RGB_SPACES:
+            color_space = color_space[0]
+        else:
+            return None
+    if color_space in _GRAY_SPACES:
+        return 1
+    if color_space in _RGB_SPACES:
+        return 3
+    return None
+
+
+def _ccitt_tiff(data: bytes, width: int, height: int, k: int, flipped: bool) -> bytes:
+    """
+    CCITT-Daten aus dem PDF in eine minimale TIFF-Datei verpacken, die Pillow
+    (libtiff) dekodiert. K < 0 = Group 4, sonst Group 3 (K > 0 = 2D).
+    """
+    compression = 4 if k < 0 else 3
+    entries = [
+        (256, 4, width),              # ImageWidth
+        (257, 4, height),             # ImageLength
+        (258, 3, 1),                  # BitsPerSample
+        (259, 3, compression),        # Compression
+        (262, 3, int(flipped)),       # Photometric: 0 = WhiteIsZero, 1 = BlackIsZero
+        (273, 4, 0),                  # StripOffsets (unten gesetzt)
+        (278, 4, height),             # RowsPerStrip
+        (279, 4, len(data)),          # StripByteCounts
+    ]
+    if compression == 3:
+        entries.append((292, 4, 1 if k > 0 else 0))  # T4Options: 2D-Kodierung
+
+    header_size = 8 + 2 + 12 * len(entries) + 4
+    entries[5] = (273, 4, header_size)
+
+    ifd = struct.pack("<H", len(entries))
+    for tag, kind, value in entries:
+        ifd += struct.pack("<HHLL", tag, kind, 1, value)
+    return struct.pack("<2sHL", b"II", 42, 8) + ifd + struct.pack("<L", 0) + data
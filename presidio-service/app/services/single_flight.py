@@ -0,0 +1,194 @@
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+
+from app.config import settings
+from app.utils.deadline import Deadline
+
+logger = logging.getLogger(__name__)
+
+# Singleton Pattern: eine Tabelle laufender Berechnungen pro Worker
+_single_flight_instance: Optional["SingleFlight"] = None
+_single_flight_lock = threading.Lock()
+
+
+class RetryFlight(Exception):
+    """Berechnung des ersten Requests ist aus Gründen gescheitert, die nur ihn betreffen."""
+
+
+@dataclass
+class Flight:
+    """Laufende Berechnung, auf die weitere identische Requests warten."""
+
+    key: str
+    future: asyncio.Future
+    followers: int = 0
+    joined: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+@dataclass
+class FlightStats:
+    """Zähler für /metrics."""
+
+    leaders: int = 0            # tatsächlich ausgeführte Berechnungen
+    coalesced: int = 0          # Requests, die ein laufendes Ergebnis übernommen haben
+    retried: int = 0            # Mitläufer, die nach einem Abbruch selbst rechnen mussten
+    follower_timeouts: int = 0  # Mitläufer, deren Deadline vor dem Ergebnis ablief
+    kept_for_followers: int = 0  # Disconnects, nach denen die Berechnung für Mitläufer weiterlief
+    max_followers: int = 0
+
+
+def request_key(content: bytes, filename: str, **options) -> str:
+    """
+    Schlüssel für identische Requests: Inhalt, Dateiendung (Typ-Erkennung),
+    Request-Optionen und alle Settings (Entities, OCR, Ausgabe-Kodierung).
+    """
+    digest = hashlib.sha256(content)
+    digest.update(os.path.splitext(filename or "")[1].lower().encode())
+    for name in sorted(options):
+        digest.update(f"|{name}={options[name]!r}".encode())
+    digest.update(settings.model_dump_json().encode())
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """
+    Identische Requests teilen sich eine laufende Berechnung (pro Worker).
+
+    Der erste Request rechnet, spätere mit demselben Schlüssel warten auf
+    sein Ergebnis - typisch, wenn ein Client nach einem Timeout erneut sendet,
+    während die erste Berechnung noch läuft. Ist die Berechnung fertig, wird
+    der Schlüssel entfernt; danach greifen die normalen Caches (OCR-Cache).
+
+    Scheitert der erste Request mit einem Fehler, der nur ihn betrifft
+    (eigene Deadline, Lane voll, Abbruch), rechnen die Wartenden selbst -
+    einer von ihnen wird der neue erste Request. Andere Fehler (z.B. 415)
+    bekommen alle Wartenden ebenfalls.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self.counters = FlightStats()
+
+    async def run(
+        self,
+        key: Optional[str],
+        compute: Callable[[Optional[Flight]], Awaitable],
+        deadline: Optional[Deadline] = None,
+        retry_on: Callable[[BaseException], bool] = lambda error: False,
+    ) -> Tuple[object, bool]:
+        """
+        Berechnung ausführen oder auf die laufende warten.
+
+        Args:
+            key: Request-Schlüssel (None = nicht zusammenfassen)
+            compute: Coroutine-Factory; bekommt den eigenen Flight (für Disconnects)
+            deadline: Höchstens so lange auf eine fremde Berechnung warten
+            retry_on: Fehler des ersten Requests, nach denen Wartende selbst rechnen
+
+        Returns:
+            (Ergebnis, True wenn von einem anderen Request übernommen)
+
+        Raises:
+            asyncio.TimeoutError: Wartezeit abgelaufen
+            Exception: Fehler der Berechnung (eigene oder übernommene)
+        """
+        if key is None:
+            return await compute(None), False
+
+        while True:
+            flight = self._flights.get(key)
+            if flight is None:
+                return await self._lead(key, compute, retry_on), False
+
+            flight.followers += 1
+            flight.joined.set()
+            self.counters.max_followers = max(self.counters.max_followers, flight.followers)
+            logger.info(f"Coalescing identical request ({flight.followers} waiting)")
+            try:
+                result = await asyncio.wait_for(
+                    asyncio.shield(flight.future),
+                    deadline.remaining() if deadline else None,
+                )
+            except RetryFlight:
+                self.counters.retried += 1
+                continue
+            except asyncio.TimeoutError:
+                self.counters.follower_timeouts += 1
+                raise
+            finally:
+                flight.followers -= 1
+
+            self.counters.coalesced += 1
+            return result, True
+
+    async def _lead(self, key: str, compute, retry_on) -> object:
+        flight = Flight(key=key, future=asyncio.get_running_loop().create_future())
+        self._flights[key] = flight
+        self.counters.leaders += 1
+
+        try:
+            result = await compute(flight)
+        except BaseException as e:
+            if isinstance(e, Exception) and not retry_on(e):
+                shared = e
+            else:
+                shared = RetryFlight(f"First request failed: {e!r}")
+            flight.future.set_exception(shared)
+            # Ohne Wartende wird die Exception nie abgeholt - als abgeholt markieren
+            flight.future.exception()
+            raise
+        else:
+            flight.future.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+
+    async def wanted_after_disconnect(self, flight: Optional[Flight], grace: float) -> bool:
+        """
+        Client des ersten Requests ist weg. Clients senden nach einem Timeout
+        oft sofort erneut - bis zu grace Sekunden auf einen Wartenden warten.
+
+        Returns:
+            True = weiterrechnen (ein identischer Request wartet auf das Ergebnis)
+        """
+        if flight is None:
+            return False
+        if not flight.followers and grace > 0:
+            try:
+                await asyncio.wait_for(flight.joined.wait(), grace)
+            except asyncio.TimeoutError:
+                pass
+        if not flight.followers:
+            return False
+        self.counters.kept_for_followers += 1
+        return True
+
+    def stats(self) -> dict:
+        counter = self.counters
+        return {
+            "in_flight": len(self._flights),
+            "waiting": sum(flight.followers for flight in self._flights.values()),
+            "leaders": counter.leaders,
+            "coalesced": counter.coalesced,
+            "retried": counter.retried,
+            "follower_timeouts": counter.follower_timeouts,
+            "kept_for_followers": counter.kept_for_followers,
+            "max_followers": counter.max_followers,
+        }
+
+
+def get_single_flight() -> SingleFlight:
+    """Lazy Loading Singleton für das Zusammenfassen identischer Requests."""
+    global _single_flight_instance
+
+    if _single_flight_instance is None:
+        with _single_flight_lock:
+            if _single_flight_instance is None:
+                _single_flight_instance = SingleFlight()
+
+    return _single_flight_instance
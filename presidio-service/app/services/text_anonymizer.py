@@ -1,16 +1,40 @@
-from presidio_analyzer import AnalyzerEngine, Pattern, PatternRecognizer
+from presidio_analyzer import AnalyzerEngine, Pattern, PatternRecognizer, RecognizerResult
 from presidio_analyzer.nlp_engine import NlpEngineProvider
-from presidio_analyzer.context_aware_enhancers import LemmaContextAwareEnhancer
 from presidio_anonymizer import AnonymizerEngine
 from presidio_anonymizer.entities import OperatorConfig
-from typing import Optional, List
+from typing import Dict, Iterable, Iterator, Optional, List
 import logging
 import threading
 
 from app.config import settings
+from app.services.context_enhancer import IndexedContextEnhancer
+from app.services.ner_batcher import NlpBatcher
+from app.services.page_dedup import find_repeated_blocks, mask, project
+from app.utils.deadline import check_deadline
 
 logger = logging.getLogger(__name__)
 
+# Ersetzungstexte je Entity-Typ (alle anderen: replacement-Parameter)
+ENTITY_REPLACEMENTS = {
+    "PERSON": "[PERSON]",
+    "EMAIL_ADDRESS": "[E-MAIL]",
+    "PHONE_NUMBER": "[TELEFON]",
+    "LOCATION": "[ORT]",
+    "DE_ADDRESS_FULL": "[ADRESSE]",
+    "DE_PLZ": "[PLZ]",
+    "DE_STREET_ADDRESS": "[ADRESSE]",
+    "IBAN_CODE": "[IBAN]",
+    "DATE_TIME": "[DATUM]",
+}
+
+DEFAULT_REPLACEMENT = "██████████"
+
+# Mindest-Konfidenz: niedrig genug für kontextverstärkte schwache Muster (PLZ 0.01 + 0.45)
+SCORE_THRESHOLD = 0.35
+
+# AnonymizerEngine ist leichtgewichtig (keine Modelle) und zustandslos
+_renderer = AnonymizerEngine()
+
 # Singleton Pattern für Lazy Loading
 _anonymizer_instance: Optional["TextAnonymizer"] = None
 _anonymizer_lock = threading.Lock()
@@ -35,6 +59,14 @@ def get_anonymizer() -> "TextAnonymizer":
     return _anonymizer_instance
 
 
+def nlp_batch_stats() -> Optional[dict]:
+    """Statistik des NER-Batchers, ohne Modelle zu laden (None = nicht geladen oder aus)."""
+    anonymizer = _anonymizer_instance
+    if anonymizer is None or anonymizer.batcher is None:
+        return None
+    return anonymizer.batcher.stats()
+
+
 def create_german_address_recognizers() -> List[PatternRecognizer]:
     """
     Erstellt Custom Recognizers für deutsche Adressen nach Presidio Best Practices:
@@ -119,7 +151,7 @@ class TextAnonymizer:
     Best Practices:
     - Niedrige Konfidenz für schwache Muster (z.B. PLZ = 5 Ziffern)
     - Kontextwörter erhöhen Konfidenz automatisch
-    - LemmaContextAwareEnhancer für intelligente Kontexterkennung
+    - Lemma-basierter Context Enhancer (indiziert, siehe IndexedContextEnhancer)
     """
 
     def __init__(self):
@@ -137,9 +169,11 @@ class TextAnonymizer:
 
         # Context Enhancer konfigurieren
         # Erhöht Konfidenz wenn Kontextwörter in der Nähe gefunden werden
-        context_enhancer = LemmaContextAwareEnhancer(
+        # Kandidaten, die SCORE_THRESHOLD auch mit Kontext nicht erreichen, fallen vorher weg
+        context_enhancer = IndexedContextEnhancer(
             context_similarity_factor=0.45,      # Wie stark Kontext die Konfidenz erhöht
             min_score_with_context_similarity=0.4,  # Minimale Konfidenz mit Kontext
+            score_threshold=SCORE_THRESHOLD,
         )
 
         # Analyzer mit Context Enhancer
@@ -154,14 +188,209 @@ class TextAnonymizer:
             self.analyzer.registry.add_recognizer(recognizer)
             logger.info(f"Added custom recognizer: {recognizer.supported_entities}")
 
-        self.anonymizer = AnonymizerEngine()
-        self.last_pii_count = 0
+        # spaCy-Aufrufe paralleler Requests zu einem nlp.pipe-Batch bündeln
+        self.batcher: Optional[NlpBatcher] = None
+        if settings.nlp_batching:
+            self.batcher = NlpBatcher(
+                nlp_engine,
+                max_batch_size=settings.nlp_batch_size,
+                max_wait_ms=settings.nlp_batch_max_wait_ms,
+            )
+
+        # Thread-lokal, damit parallele Requests/Jobs sich nicht überschreiben
+        self._local = threading.local()
+
+    @property
+    def last_pii_count(self) -> int:
+        """Anzahl gefundener PII beim letzten anonymize() im aktuellen Thread."""
+        return getattr(self._local, "pii_count", 0)
+
+    @last_pii_count.setter
+    def last_pii_count(self, value: int):
+        self._local.pii_count = value
+
+    @property
+    def last_results(self) -> List[RecognizerResult]:
+        """Entities des letzten anonymize() im aktuellen Thread (Offsets im Eingabetext)."""
+        return getattr(self._local, "results", [])
+
+    @last_results.setter
+    def last_results(self, value: List[RecognizerResult]):
+        self._local.results = value
+
+    def analyze(self, text: str, language: str = "de") -> List[RecognizerResult]:
+        """
+        PII erkennen, ohne zu anonymisieren.
+
+        Returns:
+            Gefundene Entities mit Offsets im übergebenen Text
+        """
+        check_deadline()
+
+        # NLP im gemeinsamen Batch, Recognizer im eigenen Thread
+        nlp_artifacts = self.batcher.process(text, language) if self.batcher else None
+
+        # PII erkennen mit Mindest-Konfidenz
+        # Niedrige Threshold (SCORE_THRESHOLD) erlaubt auch schwache Muster mit Kontext
+        return self.analyzer.analyze(
+            text=text,
+            language=language,
+            entities=settings.entities_to_anonymize,
+            score_threshold=SCORE_THRESHOLD,  # Erlaubt kontextverstärkte schwache Muster
+            nlp_artifacts=nlp_artifacts,
+        )
+
+    def analyze_batch(
+        self,
+        texts: Iterable[str],
+        language: str = "de",
+        batch_size: int = 32,
+    ) -> Iterator[List[RecognizerResult]]:
+        """
+        PII in vielen kurzen Texten erkennen (Absätze, Tabellenzeilen).
+
+        Die NLP-Pipeline läuft über nlp.pipe in Batches, statt für jeden Text
+        einzeln aufgerufen zu werden. Texte werden lazy konsumiert und
+        Ergebnisse in derselben Reihenfolge geliefert - der Aufrufer kann
+        beliebig lange Dokumente mit konstantem Speicher verarbeiten.
+        """
+        nlp_artifacts_batch = self.analyzer.nlp_engine.process_batch(
+            texts=texts,
+            language=language,
+            batch_size=batch_size,
+        )
+
+        for text, nlp_artifacts in nlp_artifacts_batch:
+            check_deadline()
+            yield self.analyzer.analyze(
+                text=text,
+                language=language,
+                entities=settings.entities_to_anonymize,
+                score_threshold=SCORE_THRESHOLD,
+                nlp_artifacts=nlp_artifacts,
+            )
+
+    def analyze_pages(
+        self,
+        pages: List[str],
+        language: str = "de",
+        separator: str = "\n\n",
+    ) -> List[RecognizerResult]:
+        """
+        PII in mehrseitigem Text erkennen.
+
+        Wiederholte Kopf-/Fußzeilen (Name, Adresse, Kontaktzeile) werden nur
+        an ihrer ersten Fundstelle analysiert, die übrigen Kopien sind für
+        die NLP-Pipeline ausgeblendet und bekommen dieselben Entities.
+
+        Returns:
+            Entities mit Offsets in separator.join(pages)
+        """
+        text = separator.join(pages)
+        if not text.strip():
+            return []
+
+        blocks = self._repeated_blocks(pages)
+        if not blocks:
+            return self.analyze(text, language)
+
+        page_offsets = []
+        offset = 0
+        for page in pages:
+            page_offsets.append(offset)
+            offset += len(page) + len(separator)
+
+        def absolute(occurrence):
+            return page_offsets[occurrence[0]] + occurrence[1]
+
+        hidden = [
+            (absolute(occurrence), absolute(occurrence) + len(block.text))
+            for block in blocks
+            for occurrence in block.occurrences[1:]
+        ]
+        results = self.analyze(mask(text, hidden), language)
+
+        projected = []
+        for block in blocks:
+            source = absolute(block.occurrences[0])
+            for occurrence in block.occurrences[1:]:
+                projected.extend(project(results, source, len(block.text), absolute(occurrence)))
+
+        logger.info(f"Skipped NLP for {len(hidden)} repeated header/footer blocks")
+        return sorted(results + projected, key=lambda result: result.start)
+
+    def iter_analyze_pages(
+        self,
+        pages: List[str],
+        language: str = "de",
+    ) -> Iterator[List[RecognizerResult]]:
+        """
+        Wie analyze_pages, aber Seite für Seite (Offsets je Seite) - für Streaming.
+        Kopien eines Blocks bekommen die Entities der ersten Fundstelle.
+        """
+        blocks = self._repeated_blocks(pages)
+        block_results: Dict[int, List[RecognizerResult]] = {}
+
+        for page_index, page in enumerate(pages):
+            hidden = []
+            copies = []
+            for block_index, block in enumerate(blocks):
+                for number, (occurrence_page, start) in enumerate(block.occurrences):
+                    if occurrence_page != page_index:
+                        continue
+                    if number == 0:
+                        copies.insert(0, (block_index, start, True))
+                    else:
+                        hidden.append((start, start + len(block.text)))
+                        copies.append((block_index, start, False))
+
+            results = self.analyze(mask(page, hidden), language) if page.strip() else []
+
+            for block_index, start, is_source in copies:
+                length = len(blocks[block_index].text)
+                if is_source:
+                    block_results[block_index] = project(results, start, length, 0)
+                else:
+                    results = results + project(block_results[block_index], 0, length, start)
+
+            yield sorted(results, key=lambda result: result.start)
+
+    def _repeated_blocks(self, pages: List[str]):
+        if not settings.pdf_dedup_repeated_blocks:
+            return []
+        return find_repeated_blocks(
+            pages,
+            zone_lines=settings.pdf_dedup_zone_lines,
+            min_pages=settings.pdf_dedup_min_pages,
+        )
+
+    def anonymize_pages(
+        self,
+        pages: List[str],
+        language: str = "de",
+        replacement: str = DEFAULT_REPLACEMENT,
+    ) -> str:
+        """
+        Mehrseitigen Text anonymisieren (Seiten mit Leerzeile verbunden).
+        Wiederholte Kopf-/Fußzeilen laufen nur einmal durch die NLP-Pipeline.
+        """
+        text = "\n\n".join(pages)
+        results = self.analyze_pages(pages, language)
+
+        self.last_pii_count = len(results)
+        self.last_results = results
+        logger.info(f"Found {len(results)} PII entities")
+
+        if not results:
+            return text
+
+        return render_entities(text, results, replacement=replacement)
 
     def anonymize(
         self,
         text: str,
         language: str = "de",
-        replacement: str = "██████████",
+        replacement: str = DEFAULT_REPLACEMENT,
     ) -> str:
         """
         Text anonymisieren.
@@ -174,40 +403,62 @@ class TextAnonymizer:
         Returns:
             Anonymisierter Text
         """
+        self.last_pii_count = 0
+        self.last_results = []
+
         if not text or not text.strip():
             return text
 
-        # PII erkennen mit Mindest-Konfidenz
-        # Niedrige Threshold (0.35) erlaubt auch schwache Muster mit Kontext
-        results = self.analyzer.analyze(
-            text=text,
-            language=language,
-            entities=settings.entities_to_anonymize,
-            score_threshold=0.35,  # Erlaubt kontextverstärkte schwache Muster
-        )
+        results = self.analyze(text, language)
 
         self.last_pii_count = len(results)
+        self.last_results = results
         logger.info(f"Found {len(results)} PII entities")
 
         if not results:
             return text
 
+        return render_entities(text, results, replacement=replacement)
+
+
+def render_entities(
+    text: str,
+    results: List[RecognizerResult],
+    operators: Optional[Dict[str, OperatorConfig]] = None,
+    replacement: str = DEFAULT_REPLACEMENT,
+) -> str:
+    """
+    Erkannte Entities mit einer Operator-Map auf den Text anwenden.
+    Braucht keine NLP-Modelle - gespeicherte Spans können beliebig oft
+    mit anderen Platzhaltern gerendert werden.
+
+    Args:
+        operators: Operator je Entity-Typ ("DEFAULT" für alle übrigen);
+            None = Standard-Platzhalter (ENTITY_REPLACEMENTS)
+        replacement: Standard-Ersetzung, wenn operators None ist
+    """
+    if operators is None:
         # Anonymisieren mit spezifischen Operatoren
-        anonymized = self.anonymizer.anonymize(
-            text=text,
-            analyzer_results=results,
-            operators={
-                "DEFAULT": OperatorConfig("replace", {"new_value": replacement}),
-                "PERSON": OperatorConfig("replace", {"new_value": "[PERSON]"}),
-                "EMAIL_ADDRESS": OperatorConfig("replace", {"new_value": "[E-MAIL]"}),
-                "PHONE_NUMBER": OperatorConfig("replace", {"new_value": "[TELEFON]"}),
-                "LOCATION": OperatorConfig("replace", {"new_value": "[ORT]"}),
-                "DE_ADDRESS_FULL": OperatorConfig("replace", {"new_value": "[ADRESSE]"}),
-                "DE_PLZ": OperatorConfig("replace", {"new_value": "[PLZ]"}),
-                "DE_STREET_ADDRESS": OperatorConfig("replace", {"new_value": "[ADRESSE]"}),
-                "IBAN_CODE": OperatorConfig("replace", {"new_value": "[IBAN]"}),
-                "DATE_TIME": OperatorConfig("replace", {"new_value": "[DATUM]"}),
-            },
-        )
+        operators = {"DEFAULT": OperatorConfig("replace", {"new_value": replacement})}
+        for entity_type, value in ENTITY_REPLACEMENTS.items():
+            operators[entity_type] = OperatorConfig("replace", {"new_value": value})
+
+    anonymized = _renderer.anonymize(
+        text=text,
+        analyzer_results=results,
+        operators=operators,
+    )
+
+    return anonymized.text
+
 
-        return anonymized.text
+def entity_to_dict(result: RecognizerResult) -> dict:
+    """Entity für die API (Typ, Offsets, Score, Recognizer)."""
+    metadata = result.recognition_metadata or {}
+    return {
+        "entity_type": result.entity_type,
+        "start": result.start,
+        "end": result.end,
+        "score": round(result.score, 4),
+        "recognizer": metadata.get(RecognizerResult.RECOGNIZER_NAME_KEY),
+    }
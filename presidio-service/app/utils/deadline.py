@@ -0,0 +1,75 @@
+from contextvars import ContextVar
+from typing import Optional
+import threading
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Deadline des Requests abgelaufen oder Client nicht mehr verbunden."""
+
+    def __init__(self, reason: str = "Deadline exceeded"):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Deadline:
+    """
+    Zeitbudget eines Requests.
+
+    Wird vom Endpoint gesetzt und in Seitenschleifen und Batch-Stufen über
+    check_deadline() geprüft. cancel() beendet die Arbeit sofort (z.B. wenn
+    der Client die Verbindung getrennt hat) - thread-safe, die Verarbeitung
+    läuft im Threadpool.
+    """
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+        self._cancelled = threading.Event()
+        self._reason = "Deadline exceeded"
+
+    def remaining(self) -> float:
+        """Verbleibende Sekunden (0 nach Ablauf oder Abbruch)."""
+        if self._cancelled.is_set():
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cancel(self, reason: str):
+        self._reason = reason
+        self._cancelled.set()
+
+    def check(self):
+        """
+        Raises:
+            DeadlineExceeded: Zeitbudget aufgebraucht oder abgebrochen
+        """
+        if self.expired:
+            raise DeadlineExceeded(self._reason)
+
+
+# Deadline des aktuellen Requests - wird von run_in_threadpool mitgegeben
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def set_deadline(deadline: Optional[Deadline]):
+    """Deadline für den aktuellen Kontext setzen (None = ohne Limit)."""
+    return _current_deadline.set(deadline)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def check_deadline():
+    """
+    Deadline des aktuellen Requests prüfen. Ohne Deadline (Jobs, CLI) ein No-op.
+
+    Raises:
+        DeadlineExceeded: Zeitbudget aufgebraucht oder Client getrennt
+    """
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check()
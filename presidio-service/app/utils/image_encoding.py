@@ -0,0 +1,44 @@
+from PIL import Image
+from typing import Tuple
+import io
+
+# Ausgabeformat -> (PIL-Format, Media Type)
+IMAGE_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+
+def encode_image(
+    image: Image.Image,
+    output_format: str = "png",
+    quality: int = 80,
+    png_compress_level: int = 6,
+) -> Tuple[bytes, str]:
+    """
+    Bild für die Antwort kodieren.
+
+    Args:
+        output_format: png, jpeg oder webp
+        quality: Qualität für jpeg/webp (1-100)
+        png_compress_level: zlib-Level für PNG (0-9, niedriger = schneller)
+
+    Returns:
+        (Bytes, Media Type)
+    """
+    if output_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image output format: {output_format}")
+
+    pil_format, media_type = IMAGE_FORMATS[output_format]
+    buffer = io.BytesIO()
+
+    if pil_format == "PNG":
+        image.save(buffer, format=pil_format, compress_level=png_compress_level)
+    else:
+        # JPEG kennt weder Alpha noch Paletten
+        if pil_format == "JPEG" and image.mode not in ("L", "RGB", "CMYK"):
+            image = image.convert("RGB")
+        image.save(buffer, format=pil_format, quality=quality)
+
+    return buffer.getvalue(), media_type
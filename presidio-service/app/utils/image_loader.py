@@ -0,0 +1,89 @@
+from PIL import Image, ImageOps
+from typing import Optional
+import io
+import logging
+import math
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ImageTooLarge(ValueError):
+    """Bild überschreitet das Pixel-Limit (Decompression Bomb)."""
+
+
+def load_image(
+    content: bytes,
+    max_megapixels: Optional[float] = None,
+    bomb_megapixels: Optional[float] = None,
+) -> Image.Image:
+    """
+    Hochgeladenes Bild für OCR und Schwärzung normalisieren.
+
+    1. Nur den Header lesen und Bilder über bomb_megapixels ablehnen,
+       bevor Pixel dekodiert werden
+    2. JPEGs über dem Budget per draft() direkt im Decoder verkleinern
+       (DCT-Skalierung 1/2, 1/4, 1/8 - dekodiert nur einen Bruchteil)
+    3. Rest auf max_megapixels verkleinern
+    4. EXIF-Orientierung anwenden (Handyfotos)
+    5. Alpha auf weißem Hintergrund, Modus L oder RGB
+
+    Args:
+        content: Bilddatei als Bytes
+        max_megapixels: Pixel-Budget nach der Normalisierung
+        bomb_megapixels: Harte Obergrenze für das Originalbild
+
+    Raises:
+        ImageTooLarge: Bild größer als bomb_megapixels
+        PIL.UnidentifiedImageError: Kein lesbares Bild
+    """
+    max_pixels = (max_megapixels or settings.image_max_megapixels) * 1_000_000
+    bomb_pixels = (bomb_megapixels or settings.image_bomb_megapixels) * 1_000_000
+
+    try:
+        image = Image.open(io.BytesIO(content))
+    except Image.DecompressionBombError as e:
+        raise ImageTooLarge(str(e))
+
+    width, height = image.size
+    pixels = width * height
+    if pixels > bomb_pixels:
+        raise ImageTooLarge(
+            f"Image too large: {width}x{height} ({pixels / 1_000_000:.0f} MP), "
+            f"maximum {bomb_pixels / 1_000_000:.0f} MP"
+        )
+
+    if pixels > max_pixels:
+        scale = math.sqrt(max_pixels / pixels)
+        target = (max(1, int(width * scale)), max(1, int(height * scale)))
+
+        if image.format == "JPEG":
+            # draft() wählt die kleinste DCT-Skalierung, die noch >= target ist
+            image.draft("L" if image.mode == "L" else "RGB", target)
+
+        # reducing_gap: erst schnell ganzzahlig reduzieren, dann fein resamplen
+        image.thumbnail(target, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        logger.info(f"Image downscaled: {width}x{height} -> {image.size[0]}x{image.size[1]}")
+
+    image = ImageOps.exif_transpose(image)
+    return _normalize_mode(image)
+
+
+def _normalize_mode(image: Image.Image) -> Image.Image:
+    """Modus L oder RGB; Transparenz wird auf Weiß gelegt statt schwarz zu werden."""
+    if image.mode in ("L", "RGB"):
+        return image
+
+    if image.mode == "P" and "transparency" in image.info:
+        image = image.convert("RGBA")
+
+    if image.mode in ("RGBA", "LA"):
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image.convert("RGBA"), mask=image.getchannel("A"))
+        return background
+
+    if image.mode in ("1", "I;16", "I;16B", "I"):
+        return image.convert("L")
+
+    return image.convert("RGB")
@@ -0,0 +1,224 @@
+from PIL import Image, features
+from typing import Dict, List, Tuple
+import io
+import math
+import zlib
+
+# Farbmodi der Seiten und ihre PIL-Modi
+PAGE_COLOR_MODES = {
+    "rgb": "RGB",
+    "gray": "L",
+    "bilevel": "1",
+}
+
+PAGE_COMPRESSIONS = ("jpeg", "flate", "g4")
+
+
+def ccitt_g4(image: Image.Image) -> bytes:
+    """
+    1-Bit-Bild als CCITT Group 4 kodieren (für /DecodeParms mit /BlackIs1 true).
+    libtiff schreibt die Daten als einzelnen Strip, der direkt übernommen wird.
+    """
+    width, height = image.size
+    buffer = io.BytesIO()
+    image.save(
+        buffer,
+        format="TIFF",
+        compression="group4",
+        strip_size=math.ceil(width / 8) * height,
+    )
+
+    tiff = Image.open(buffer)
+    offset = tiff.tag_v2[273][0]   # StripOffsets
+    length = tiff.tag_v2[279][0]   # StripByteCounts
+    return buffer.getvalue()[offset:offset + length]
+
+
+class StreamingPDFWriter:
+    """
+    Schreibt ein Bild-PDF Seite für Seite.
+
+    Jede Seite wird sofort als Bytes zurückgegeben, sobald sie fertig ist.
+    Seitenbaum, Katalog und Xref-Tabelle folgen erst in finish().
+    So kann die Antwort gestreamt werden, ohne alle Seiten im Speicher zu halten.
+
+    Usage:
+        writer = StreamingPDFWriter()
+        yield writer.begin()
+        for image in images:
+            yield writer.add_page(image)
+        yield writer.finish()
+    """
+
+    # Feste Objektnummern: Katalog und Seitenbaum werden am Ende geschrieben,
+    # Seiten referenzieren den Seitenbaum vorab
+    CATALOG_OBJ = 1
+    PAGES_OBJ = 2
+
+    def __init__(
+        self,
+        resolution: float = 72.0,
+        color: str = "rgb",
+        compression: str = "jpeg",
+        jpeg_quality: int = 75,
+    ):
+        """
+        Args:
+            resolution: DPI der Bilder (bestimmt die Seitengröße in Punkten)
+            color: Farbmodus der Seiten (rgb, gray, bilevel)
+            compression: jpeg, flate oder g4 (CCITT Group 4, nur bilevel)
+            jpeg_quality: JPEG-Qualität für Graustufen- und Farbseiten
+        """
+        if color not in PAGE_COLOR_MODES:
+            raise ValueError(f"Unknown page color mode: {color}")
+        if compression not in PAGE_COMPRESSIONS:
+            raise ValueError(f"Unknown page compression: {compression}")
+
+        self.resolution = resolution
+        self.color = color
+        self.compression = compression
+        self.jpeg_quality = jpeg_quality
+
+        self._offset = 0
+        self._xref: Dict[int, int] = {}
+        self._page_objs: List[int] = []
+        self._next_obj = 3
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_objs)
+
+    def begin(self) -> bytes:
+        """PDF-Header."""
+        return self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def add_page(self, image: Image.Image) -> bytes:
+        """Bild als neue Seite schreiben und die Bytes der Seite zurückgeben."""
+        image_obj = self._allocate()
+        content_obj = self._allocate()
+        page_obj = self._allocate()
+
+        width, height = image.size
+        page_width = width * 72.0 / self.resolution
+        page_height = height * 72.0 / self.resolution
+
+        image_dict, image_data = self._encode_image(image)
+        content = f"q {page_width:.2f} 0 0 {page_height:.2f} 0 0 cm /Im0 Do Q".encode()
+
+        chunks = [
+            self._stream_object(image_obj, image_dict, image_data),
+            self._stream_object(content_obj, "", content),
+            self._object(
+                page_obj,
+                f"<< /Type /Page /Parent {self.PAGES_OBJ} 0 R "
+                f"/MediaBox [0 0 {page_width:.2f} {page_height:.2f}] "
+                f"/Resources << /XObject << /Im0 {image_obj} 0 R >> >> "
+                f"/Contents {content_obj} 0 R >>".encode(),
+            ),
+        ]
+        self._page_objs.append(page_obj)
+
+        return b"".join(chunks)
+
+    def finish(self) -> bytes:
+        """Seitenbaum, Katalog, Xref-Tabelle und Trailer schreiben."""
+        kids = " ".join(f"{obj} 0 R" for obj in self._page_objs)
+        chunks = [
+            self._object(
+                self.PAGES_OBJ,
+                f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_objs)} >>".encode(),
+            ),
+            self._object(
+                self.CATALOG_OBJ,
+                f"<< /Type /Catalog /Pages {self.PAGES_OBJ} 0 R >>".encode(),
+            ),
+        ]
+
+        xref_offset = self._offset
+        size = self._next_obj
+        xref = [f"xref\n0 {size}\n".encode(), b"0000000000 65535 f \n"]
+        for obj in range(1, size):
+            xref.append(f"{self._xref[obj]:010d} 00000 n \n".encode())
+        xref.append(
+            f"trailer\n<< /Size {size} /Root {self.CATALOG_OBJ} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode()
+        )
+        chunks.append(self._emit(b"".join(xref)))
+
+        return b"".join(chunks)
+
+    def _encode_image(self, image: Image.Image) -> Tuple[str, bytes]:
+        """Bild-Dictionary und Stream-Daten für ein Image XObject."""
+        image = self._convert(image)
+        width, height = image.size
+
+        if image.mode == "1":
+            # JPEG ist für 1-Bit ungeeignet - dann Flate
+            if self.compression == "g4" and features.check("libtiff"):
+                return (
+                    f"/Width {width} /Height {height} /ColorSpace /DeviceGray "
+                    f"/BitsPerComponent 1 /Filter /CCITTFaxDecode "
+                    f"/DecodeParms << /K -1 /Columns {width} /Rows {height} /BlackIs1 true >>",
+                    ccitt_g4(image),
+                )
+
+            # Pillow packt 8 Pixel pro Byte, 0 = schwarz (wie DeviceGray)
+            return (
+                f"/Width {width} /Height {height} /ColorSpace /DeviceGray "
+                f"/BitsPerComponent 1 /Filter /FlateDecode",
+                zlib.compress(image.tobytes()),
+            )
+
+        color_space = "/DeviceGray" if image.mode == "L" else "/DeviceRGB"
+
+        if self.compression == "jpeg":
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=self.jpeg_quality)
+            return (
+                f"/Width {width} /Height {height} /ColorSpace {color_space} "
+                f"/BitsPerComponent 8 /Filter /DCTDecode",
+                buffer.getvalue(),
+            )
+
+        # Verlustfrei (flate, g4 bei Graustufen/Farbe)
+        return (
+            f"/Width {width} /Height {height} /ColorSpace {color_space} "
+            f"/BitsPerComponent 8 /Filter /FlateDecode",
+            zlib.compress(image.tobytes(), 6),
+        )
+
+    def _convert(self, image: Image.Image) -> Image.Image:
+        """Bild in den konfigurierten Farbmodus bringen."""
+        target = PAGE_COLOR_MODES[self.color]
+        if image.mode == target:
+            return image
+
+        # Graustufen werden für "rgb" nicht unnötig aufgeblasen
+        if target == "RGB" and image.mode == "L":
+            return image
+
+        if target == "1":
+            # Schwellwert statt Dithering - Text bleibt scharf und komprimiert besser
+            gray = image if image.mode == "L" else image.convert("L")
+            return gray.point(lambda value: 255 if value > 127 else 0).convert("1")
+
+        return image.convert(target)
+
+    def _allocate(self) -> int:
+        obj = self._next_obj
+        self._next_obj += 1
+        return obj
+
+    def _object(self, obj: int, body: bytes) -> bytes:
+        self._xref[obj] = self._offset
+        return self._emit(f"{obj} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    def _stream_object(self, obj: int, entries: str, data: bytes) -> bytes:
+        if entries:
+            entries = f"/Type /XObject /Subtype /Image {entries} "
+        header = f"<< {entries}/Length {len(data)} >>\nstream\n".encode()
+        return self._object(obj, header + data + b"\nendstream")
+
+    def _emit(self, data: bytes) -> bytes:
+        self._offset += len(data)
+        return data
@@ -0,0 +1 @@
+# Benchmarks (lokal ausführen, nicht Teil des Docker-Images)
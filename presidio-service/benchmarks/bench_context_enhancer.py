@@ -0,0 +1,89 @@
+"""
+Benchmark: Context Enhancer auf zahlenlastigen Dokumenten.
+
+Vergleicht LemmaContextAwareEnhancer (Presidio) mit IndexedContextEnhancer:
+Laufzeit von AnalyzerEngine.analyze mit den deutschen Adress-Recognizern und
+gleichen NLP-Artefakten, Anzahl DE_PLZ-Kandidaten und ob beide dieselben
+Ergebnisse liefern (ohne spaCy-Modell: leere Pipeline, siehe benchmarks.nlp).
+
+Usage (im Verzeichnis presidio-service):
+    python -m benchmarks.bench_context_enhancer --lines 400
+"""
+import argparse
+import time
+
+from presidio_analyzer import AnalyzerEngine, RecognizerRegistry
+from presidio_analyzer.context_aware_enhancers import LemmaContextAwareEnhancer
+from presidio_analyzer.nlp_engine import SpacyNlpEngine
+
+from app.services.context_enhancer import IndexedContextEnhancer
+from app.services.text_anonymizer import SCORE_THRESHOLD, create_german_address_recognizers
+from benchmarks.corpus import number_heavy_text
+from benchmarks.nlp import load_nlp_engine
+
+
+def _analyzer(engine: SpacyNlpEngine, enhancer) -> AnalyzerEngine:
+    registry = RecognizerRegistry(supported_languages=["de"])
+    for recognizer in create_german_address_recognizers():
+        registry.add_recognizer(recognizer)
+    return AnalyzerEngine(
+        registry=registry,
+        nlp_engine=engine,
+        supported_languages=["de"],
+        context_aware_enhancer=enhancer,
+    )
+
+
+def _key(results):
+    return sorted((r.entity_type, r.start, r.end, round(r.score, 6)) for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text = number_heavy_text(args.lines)
+    engine = load_nlp_engine()
+    nlp_artifacts = engine.process_text(text, "de")
+
+    enhancers = {
+        "lemma": LemmaContextAwareEnhancer(
+            context_similarity_factor=0.45,
+            min_score_with_context_similarity=0.4,
+        ),
+        "indexed": IndexedContextEnhancer(
+            context_similarity_factor=0.45,
+            min_score_with_context_similarity=0.4,
+            score_threshold=SCORE_THRESHOLD,
+        ),
+    }
+
+    candidates = len(_analyzer(engine, enhancers["lemma"]).analyze(
+        text, language="de", entities=["DE_PLZ"], nlp_artifacts=nlp_artifacts,
+    ))
+    print(f"{len(text)} chars, {len(nlp_artifacts.tokens)} tokens, {candidates} DE_PLZ candidates")
+    print(f"{'enhancer':<9} {'analyze ms':>11} {'results':>8}")
+
+    outputs = {}
+    for name, enhancer in enhancers.items():
+        analyzer = _analyzer(engine, enhancer)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = analyzer.analyze(
+                text,
+                language="de",
+                score_threshold=SCORE_THRESHOLD,
+                nlp_artifacts=nlp_artifacts,
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+        outputs[name] = _key(results)
+        print(f"{name:<9} {min(timings):>11.1f} {len(results):>8}")
+
+    print(f"identical results: {outputs['lemma'] == outputs['indexed']}")
+
+
+if __name__ == "__main__":
+    main()
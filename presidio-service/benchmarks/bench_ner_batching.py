@@ -0,0 +1,69 @@
+"""
+Benchmark: NER-Micro-Batching bei parallelen Requests.
+
+Schickt CV-Seiten aus --concurrency Threads gleichzeitig durch die NLP-Engine:
+einmal direkt (ein Doc pro Aufruf) und über den NlpBatcher mit verschiedenen
+Wartezeiten. Gemessen werden Durchsatz, Latenz (p50/p95) und die mittlere
+Batchgröße. Aussagekräftig nur mit installiertem spaCy-Modell - die leere
+Pipeline hat keine Matrixoperationen, die vom Batching profitieren.
+
+Usage (im Verzeichnis presidio-service):
+    python -m benchmarks.bench_ner_batching --texts 200 --concurrency 10 --wait-ms 0,2,5,10
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.ner_batcher import NlpBatcher
+from benchmarks.corpus import generate_pages
+from benchmarks.nlp import load_nlp_engine
+
+
+def _run(process, texts, concurrency):
+    latencies = []
+
+    def timed(text):
+        start = time.perf_counter()
+        process(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(timed, texts))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return (
+        len(texts) / elapsed,
+        statistics.median(latencies),
+        latencies[int(len(latencies) * 0.95) - 1],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--wait-ms", default="0,2,5,10")
+    args = parser.parse_args()
+
+    engine = load_nlp_engine()
+    texts = [page.text for page in generate_pages(args.texts)]
+    engine.process_text(texts[0], "de")  # Warmup
+
+    print(f"{'mode':<14} {'texts/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'avg batch':>10}")
+
+    throughput, p50, p95 = _run(lambda text: engine.process_text(text, "de"), texts, args.concurrency)
+    print(f"{'direct':<14} {throughput:>8.1f} {p50:>8.1f} {p95:>8.1f} {1:>10.1f}")
+
+    for wait_ms in (float(value) for value in args.wait_ms.split(",")):
+        batcher = NlpBatcher(engine, max_batch_size=args.batch_size, max_wait_ms=wait_ms)
+        throughput, p50, p95 = _run(lambda text: batcher.process(text, "de"), texts, args.concurrency)
+        stats = batcher.stats()
+        print(f"{f'batch {wait_ms:g}ms':<14} {throughput:>8.1f} {p50:>8.1f} {p95:>8.1f} {stats['avg_batch_size']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
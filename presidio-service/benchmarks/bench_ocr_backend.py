@@ -0,0 +1,72 @@
+"""
+Benchmark: Overhead pro Seite für pytesseract vs. persistentes tesserocr-Handle.
+
+pytesseract startet pro Aufruf einen tesseract-Prozess, schreibt das Bild als
+Temp-Datei und lädt die traineddata neu. tesserocr hält das Handle geladen und
+bekommt das Bild direkt aus dem Speicher. Gemessen wird perform_ocr (wie im
+Image Redactor) auf vorverarbeiteten Seiten des synthetischen Korpus; die
+Differenz der ms/page ist der eingesparte Overhead.
+
+Usage (im Verzeichnis presidio-service):
+    python -m benchmarks.bench_ocr_backend --pages 10
+"""
+import argparse
+import shutil
+import time
+
+from app.services.ocr_engine import PytesseractOCR, TesserocrOCR
+from app.services.ocr_preprocessor import AdaptiveOCRPreprocessor
+from benchmarks.corpus import generate_pages, render_page
+
+
+def bench(backend, images, lang):
+    # Erster Aufruf separat: bei tesserocr inkl. Laden der traineddata
+    started = time.perf_counter()
+    backend.perform_ocr(images[0], lang=lang)
+    first = time.perf_counter() - started
+
+    started = time.perf_counter()
+    words = 0
+    for image in images:
+        words += len([text for text in backend.perform_ocr(image, lang=lang)["text"] if text.strip()])
+    elapsed = time.perf_counter() - started
+
+    return first, elapsed / len(images), words
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--lang", default="deu")
+    args = parser.parse_args()
+
+    preprocessor = AdaptiveOCRPreprocessor()
+    images = [
+        preprocessor.preprocess_image(render_page(page))[0]
+        for page in generate_pages(args.pages)
+    ]
+
+    backends = []
+    if shutil.which("tesseract"):
+        backends.append(PytesseractOCR())
+    else:
+        print("tesseract binary not found - skipping pytesseract")
+    try:
+        backends.append(TesserocrOCR())
+    except ImportError:
+        print("tesserocr not installed - skipping tesserocr")
+
+    print(f"{'backend':<12} {'first ms':>9} {'ms/page':>9} {'words':>7}")
+    results = {}
+    for backend in backends:
+        first, per_page, words = bench(backend, images, args.lang)
+        results[backend.name] = per_page
+        print(f"{backend.name:<12} {first * 1000:>9.0f} {per_page * 1000:>9.0f} {words:>7}")
+
+    if len(results) == 2:
+        saved = results["pytesseract"] - results["tesserocr"]
+        print(f"\nOverhead removed: {saved * 1000:.0f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: Layout-Vorlauf (leere Seiten, Textbereiche) vor der OCR.
+
+Typische Bewerbungsmappe als Scan: Anschreiben, Lebenslauf-Seiten, leere
+Trennseiten und Foto-Seiten. Vergleicht perform_ocr auf der ganzen Seite mit
+der OCR nur der erkannten Textbereiche: Zeit, OCRte Pixel und ob dieselben
+Wörter (und alle PII-Wörter) gefunden werden.
+
+Usage (im Verzeichnis presidio-service, Tesseract muss installiert sein):
+    python -m benchmarks.bench_ocr_regions --pages 6 --blank 2 --photos 2
+"""
+import argparse
+import re
+import time
+
+from app.services.ocr_engine import create_ocr_backend
+from app.services.ocr_preprocessor import AdaptiveOCRPreprocessor
+from app.services.ocr_regions import TextRegionDetector, ocr_regions
+from benchmarks.corpus import blank_scan, generate_pages, photo_page, render_page
+
+
+def _words(ocr_result: dict) -> set:
+    words = (text.strip(" .,:;").lower() for text in ocr_result["text"])
+    return {word for word in words if word}
+
+
+def _pii_words(pages) -> set:
+    return {word.strip(".,:;").lower() for page in pages for value in page.pii for word in re.split(r"\s+", value)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=6)
+    parser.add_argument("--blank", type=int, default=2)
+    parser.add_argument("--photos", type=int, default=2)
+    parser.add_argument("--lang", default="deu")
+    args = parser.parse_args()
+
+    pages = generate_pages(args.pages)
+    bundle = [("text", render_page(page)) for page in pages]
+    bundle += [("blank", blank_scan(seed=i)) for i in range(args.blank)]
+    bundle += [
+        ("photo", photo_page(seed=i, caption=pages[i % len(pages)].pii[0] if i % 2 else ""))
+        for i in range(args.photos)
+    ]
+
+    ocr = create_ocr_backend()
+    preprocessor = AdaptiveOCRPreprocessor()
+    detector = TextRegionDetector()
+    ocr.perform_ocr(preprocessor.preprocess_image(bundle[0][1])[0], lang=args.lang)  # Warmup
+
+    totals = {"full": 0.0, "regions": 0.0}
+    words = {"full": set(), "regions": set()}
+    page_pixels = ocr_pixels = 0
+
+    print(f"{'page':<6} {'full ms':>8} {'roi ms':>8} {'regions':>8} {'ocr px':>7} {'words':>11}")
+    for kind, image in bundle:
+        prepared, metadata = preprocessor.preprocess_image(image)
+
+        started = time.perf_counter()
+        full = ocr.perform_ocr(prepared, lang=args.lang)
+        full_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        layout = detector.detect(image)
+        if layout.blank:
+            roi = {"text": []}
+        elif layout.full_page:
+            roi = ocr.perform_ocr(preprocessor.preprocess_image(image)[0], lang=args.lang)
+        else:
+            prepared, metadata = preprocessor.preprocess_image(image)
+            roi = ocr_regions(ocr, prepared, layout.regions, metadata["scale_factor"], lang=args.lang)
+        roi_seconds = time.perf_counter() - started
+
+        totals["full"] += full_seconds
+        totals["regions"] += roi_seconds
+        words["full"] |= _words(full)
+        words["regions"] |= _words(roi)
+        page_pixels += layout.page_pixels
+        ocr_pixels += layout.ocr_pixels
+
+        print(
+            f"{kind:<6} {full_seconds * 1000:>8.0f} {roi_seconds * 1000:>8.0f} "
+            f"{'blank' if layout.blank else len(layout.regions) or 'page':>8} "
+            f"{layout.ocr_pixels / layout.page_pixels:>7.0%} "
+            f"{len(_words(roi)):>5}/{len(_words(full)):<5}"
+        )
+
+    pii = _pii_words(pages)
+    print(f"\nbundle: full {totals['full']:.2f}s, regions {totals['regions']:.2f}s "
+          f"({1 - totals['regions'] / totals['full']:.0%} faster), OCR pixels {ocr_pixels / page_pixels:.0%}")
+    print(f"words found by full-page OCR but not by regions: {sorted(words['full'] - words['regions'])[:20]}")
+    print(f"PII words found: full {len(pii & words['full'])}/{len(pii)}, regions {len(pii & words['regions'])}/{len(pii)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: Kodierzeit vs. Ausgabegröße für geschwärzte Scans und Bilder.
+
+PDF: alle sinnvollen Kombinationen aus pdf_page_color und
+pdf_page_compression für ein Scan-Dokument aus dem synthetischen Korpus.
+Bilder: PNG-Level, JPEG und WebP für eine Fotoseite.
+
+Usage (im Verzeichnis presidio-service):
+    python -m benchmarks.bench_output_encoding --pages 10
+"""
+import argparse
+import base64
+import time
+
+from app.utils.image_encoding import encode_image
+from app.utils.pdf_writer import StreamingPDFWriter
+from benchmarks.corpus import generate_pages, render_page
+
+PDF_VARIANTS = [
+    ("rgb", "jpeg"),
+    ("rgb", "flate"),
+    ("gray", "jpeg"),
+    ("gray", "flate"),
+    ("bilevel", "flate"),
+    ("bilevel", "g4"),
+]
+
+IMAGE_VARIANTS = [
+    ("png", {"png_compress_level": 1}),
+    ("png", {"png_compress_level": 6}),
+    ("png", {"png_compress_level": 9}),
+    ("jpeg", {"quality": 75}),
+    ("webp", {"quality": 80}),
+]
+
+
+def _kb(size: int) -> str:
+    return f"{size / 1024:,.0f} KB"
+
+
+def bench_pdf(images):
+    print(f"\nPDF ({len(images)} Seiten)")
+    print(f"{'color':<9} {'compression':<12} {'ms':>8} {'size':>12} {'base64':>12}")
+    for color, compression in PDF_VARIANTS:
+        writer = StreamingPDFWriter(color=color, compression=compression)
+        started = time.perf_counter()
+        data = writer.begin() + b"".join(writer.add_page(image) for image in images) + writer.finish()
+        elapsed = (time.perf_counter() - started) * 1000
+        encoded = len(base64.b64encode(data))
+        print(f"{color:<9} {compression:<12} {elapsed:>8.0f} {_kb(len(data)):>12} {_kb(encoded):>12}")
+
+
+def bench_image(image):
+    print(f"\nBild ({image.size[0]}x{image.size[1]})")
+    print(f"{'format':<7} {'options':<24} {'ms':>8} {'size':>12}")
+    for output_format, options in IMAGE_VARIANTS:
+        started = time.perf_counter()
+        data, _ = encode_image(image, output_format, **options)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{output_format:<7} {str(options):<24} {elapsed:>8.0f} {_kb(len(data)):>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--dpi", type=int, default=200)
+    args = parser.parse_args()
+
+    pages = generate_pages(args.pages)
+    bench_pdf([render_page(page, dpi=args.dpi) for page in pages])
+    bench_image(render_page(pages[0], dpi=400, photo=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: OCR-Zeit und Erkennungsrate je Qualitätsstufe der Lastregelung.
+
+Rastert den synthetischen Korpus mit der Auflösung jeder Stufe (wie pdftoppm
+für Scan-PDFs) und OCRt die Seiten mit dem Preprocessor des Services - für
+Stufen ab quality_fast_from_level zusätzlich im Fast-Mode (priority=low).
+Recall = Anteil der PII-Wörter, die die OCR findet; nur diese können
+geschwärzt werden. Die Stufen kommen aus den Settings (QUALITY_*).
+
+Usage (im Verzeichnis presidio-service, Tesseract muss installiert sein):
+    python -m benchmarks.bench_quality_levels --pages 5
+"""
+import argparse
+import time
+from dataclasses import replace
+
+from app.config import settings
+from app.services.load_controller import quality_levels, set_quality
+from app.services.ocr_engine import create_ocr_backend
+from app.services.ocr_preprocessor import create_ocr_preprocessor
+from benchmarks.bench_ocr_resolution import pii_recall
+from benchmarks.corpus import generate_pages, render_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--lang", default="deu")
+    args = parser.parse_args()
+
+    pages = generate_pages(args.pages)
+    ocr = create_ocr_backend()
+    preprocessor = create_ocr_preprocessor()
+
+    variants = []
+    for level in quality_levels():
+        variants.append(level)
+        if level.level >= settings.quality_fast_from_level:
+            variants.append(replace(level, fast=True))
+
+    print(f"{'level':<7} {'dpi':>4} {'render ms':>10} {'ocr ms':>8} {'recall':>7} {'ocr size':>12}")
+    for level in variants:
+        set_quality(level)
+        render_time = ocr_time = 0.0
+        recalls = []
+        size = None
+
+        for page in pages:
+            started = time.perf_counter()
+            image = render_page(page, dpi=level.render_dpi)
+            render_time += time.perf_counter() - started
+
+            started = time.perf_counter()
+            prepared, _ = preprocessor.preprocess_image(image)
+            text = ocr.image_to_text(prepared, lang=args.lang)
+            ocr_time += time.perf_counter() - started
+
+            recalls.append(pii_recall(text, page.pii))
+            size = prepared.size
+
+        name = f"{level.level}{'+fast' if level.fast else ''}"
+        print(
+            f"{name:<7} {level.render_dpi:>4} "
+            f"{render_time / len(pages) * 1000:>10.0f} {ocr_time / len(pages) * 1000:>8.0f} "
+            f"{sum(recalls) / len(recalls):>7.3f} {size[0]:>5}x{size[1]:<6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: Scan-PDFs über eingebettete Bilder vs. Rastern und Neukodieren.
+
+Scanner legen pro Seite ein JPEG (Farbe/Graustufen) oder CCITT-G4-Bild
+(Schwarzweiß) ab. Bisher: pdftoppm rastert jede Seite mit 200 DPI, die
+geschwärzten Seiten werden neu als PDF kodiert. Fast Path: Bild in nativer
+Auflösung aus dem PDF lesen, schwärzen, nur den Bild-Stream ersetzen.
+Gemessen werden Gesamtzeit, Zeit für OCR/PII-Erkennung (in beiden Pfaden
+nötig), der Rest (Rastern, Dekodieren, Kodieren) und die Ausgabegröße.
+
+Usage (im Verzeichnis presidio-service, Tesseract und poppler müssen installiert sein):
+    python -m benchmarks.bench_scan_native --pages 5 --dpi 300
+"""
+import argparse
+import time
+
+from app.services.image_anonymizer import get_image_anonymizer
+from app.services.pdf_processor import PDFProcessor
+from app.services.scan_redactor import ScanPDFRedactor
+from benchmarks.corpus import generate_pages, images_to_pdf_bytes, render_page
+
+
+class TimedAnalyzer:
+    """ImageAnonymizer-Hülle, die die Zeit in analyze() (OCR + PII) mitzählt."""
+
+    def __init__(self, anonymizer):
+        self.anonymizer = anonymizer
+        self.seconds = 0.0
+
+    def analyze(self, image, language="de"):
+        started = time.perf_counter()
+        try:
+            return self.anonymizer.analyze(image, language)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+    def redact(self, image, bboxes, fill="black"):
+        return self.anonymizer.redact(image, bboxes, fill)
+
+    def anonymize(self, image, language="de"):
+        return self.redact(image, self.analyze(image, language))
+
+
+def render_path(pdf_bytes, processor, anonymizer, language):
+    with processor.render_pages(pdf_bytes) as pages:
+        return processor.images_to_pdf(anonymizer.anonymize(image, language) for image in pages)
+
+
+def native_path(pdf_bytes, redactor, anonymizer, language):
+    return redactor.redact(pdf_bytes, anonymizer, language).pdf_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--dpi", type=int, default=300, help="Scan-Auflösung der eingebetteten Bilder")
+    parser.add_argument("--language", default="de")
+    args = parser.parse_args()
+
+    images = [render_page(page, dpi=args.dpi) for page in generate_pages(args.pages)]
+    bundles = {
+        "jpeg gray": images_to_pdf_bytes([image.convert("L") for image in images], dpi=args.dpi),
+        "jpeg rgb": images_to_pdf_bytes(images, dpi=args.dpi),
+        "ccitt g4": images_to_pdf_bytes([image.convert("1") for image in images], dpi=args.dpi),
+    }
+
+    processor = PDFProcessor()
+    redactor = ScanPDFRedactor(processor)
+    anonymizer = get_image_anonymizer()
+    anonymizer.cache.clear()
+
+    print(f"{args.pages} pages scanned at {args.dpi} DPI\n")
+    print(f"{'bundle':<10} {'path':<7} {'total s':>8} {'ocr s':>7} {'other s':>8} {'input KB':>9} {'output KB':>10}")
+    for name, pdf_bytes in bundles.items():
+        for path, run in (
+            ("render", lambda timed: render_path(pdf_bytes, processor, timed, args.language)),
+            ("native", lambda timed: native_path(pdf_bytes, redactor, timed, args.language)),
+        ):
+            anonymizer.cache.clear()  # beide Pfade machen die OCR selbst
+            timed = TimedAnalyzer(anonymizer)
+            started = time.perf_counter()
+            output = run(timed)
+            total = time.perf_counter() - started
+            print(
+                f"{name:<10} {path:<7} {total:>8.2f} {timed.seconds:>7.2f} {total - timed.seconds:>8.2f} "
+                f"{len(pdf_bytes) // 1024:>9} {len(output) // 1024:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
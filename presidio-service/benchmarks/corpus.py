@@ -0,0 +1,240 @@
+"""
+Synthetischer Korpus für Benchmarks.
+
+Erzeugt Lebenslauf-Seiten mit bekannten PII-Werten, damit Geschwindigkeit
+und Erkennungsrate ohne echte Bewerberdaten gemessen werden können.
+Der Korpus ist deterministisch (fester Seed).
+"""
+from dataclasses import dataclass, field
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+from typing import List
+import io
+import random
+
+FIRST_NAMES = ["Anna", "Lukas", "Sophie", "Jonas", "Marie", "Felix", "Lea", "Paul", "Clara", "Moritz"]
+LAST_NAMES = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker", "Hoffmann", "Koch"]
+STREETS = ["Lindenstraße", "Bahnhofstraße", "Gartenweg", "Schillerplatz", "Goetheallee", "Birkenring"]
+CITIES = ["Berlin", "Hamburg", "München", "Köln", "Hannover", "Leipzig", "Bremen", "Dresden"]
+COMPANIES = ["KRH Psychiatrie GmbH", "Stadtwerke AG", "Muster Logistik GmbH", "Klinikum Nord", "Bauhaus Digital KG"]
+ROLES = ["Pflegefachkraft", "Projektleiter", "Sachbearbeiterin", "Softwareentwickler", "Teamleitung Vertrieb"]
+
+A4_INCHES = (8.27, 11.69)
+
+
+@dataclass
+class SyntheticPage:
+    """Eine Seite mit Textzeilen und den darin enthaltenen PII-Werten."""
+
+    lines: List[str]
+    pii: List[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+def generate_pages(count: int = 10, seed: int = 42) -> List[SyntheticPage]:
+    """Lebenslauf-Seiten mit Kopfzeile (Kontaktdaten) und Werdegang erzeugen."""
+    rng = random.Random(seed)
+    pages = []
+
+    for _ in range(count):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        street = f"{rng.choice(STREETS)} {rng.randint(1, 120)}"
+        plz = f"{rng.randint(10000, 99999)}"
+        city = rng.choice(CITIES)
+        email = f"{first.lower()}.{last.lower()}@example.de".replace("ü", "ue")
+        phone = f"0{rng.randint(150, 179)} {rng.randint(1000000, 9999999)}"
+        birthday = f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(1965, 2002)}"
+
+        lines = [
+            f"{first} {last}",
+            f"{street}, {plz} {city}",
+            f"Telefon: {phone}   E-Mail: {email}",
+            f"Geboren am {birthday} in {rng.choice(CITIES)}",
+            "",
+            "Beruflicher Werdegang",
+        ]
+        for _ in range(rng.randint(8, 14)):
+            start = rng.randint(2000, 2020)
+            lines.append(
+                f"{start} - {start + rng.randint(1, 4)}  {rng.choice(ROLES)}, "
+                f"{rng.choice(COMPANIES)}, {rng.choice(CITIES)}"
+            )
+            lines.append(
+                f"    Gehalt {rng.randint(30, 90)}.000 EUR, Personalnummer {rng.randint(10000, 99999)}"
+            )
+
+        pages.append(
+            SyntheticPage(
+                lines=lines,
+                pii=[f"{first} {last}", street, plz, email, phone, birthday],
+            )
+        )
+
+    return pages
+
+
+def number_heavy_text(lines: int = 400, seed: int = 42) -> str:
+    """
+    Text mit vielen 5-stelligen Zahlen (Umsätze, Ticket-, Kostenstellen-
+    und Personalnummern), die der DE_PLZ-Recognizer als Kandidaten meldet.
+    Jede zehnte Zeile enthält eine echte PLZ mit Kontextwort.
+    """
+    rng = random.Random(seed)
+    out = []
+    for i in range(lines):
+        if i % 10 == 0:
+            out.append(f"wohnhaft in {rng.randint(10000, 99999)} {rng.choice(CITIES)}, PLZ {rng.randint(10000, 99999)}")
+        else:
+            out.append(
+                f"{rng.randint(2000, 2024)} Umsatz {rng.randint(10000, 99999)} EUR, "
+                f"Ticket {rng.randint(10000, 99999)}, Kostenstelle {rng.randint(10000, 99999)}, "
+                f"{rng.choice(ROLES)} bei {rng.choice(COMPANIES)}"
+            )
+    return "\n".join(out)
+
+
+def _font(size_px: int) -> ImageFont.ImageFont:
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size_px)
+    except OSError:
+        return ImageFont.load_default(size=size_px)
+
+
+def render_page(
+    page: SyntheticPage,
+    dpi: int = 200,
+    font_pt: float = 10.0,
+    photo: bool = False,
+) -> Image.Image:
+    """
+    Seite als A4-Bild rendern.
+
+    Args:
+        dpi: Auflösung (200 = typischer Scan, 600 ≈ Handyfoto mit 48 MP)
+        font_pt: Schriftgröße in Punkt
+        photo: Grauer Hintergrund und Unschärfe wie bei einem Kamerafoto
+    """
+    width = int(A4_INCHES[0] * dpi)
+    height = int(A4_INCHES[1] * dpi)
+    size_px = max(6, round(font_pt / 72 * dpi))
+
+    image = Image.new("RGB", (width, height), (236, 232, 224) if photo else "white")
+    draw = ImageDraw.Draw(image)
+    font = _font(size_px)
+
+    margin = dpi
+    y = margin
+    for line in page.lines:
+        draw.text((margin, y), line, fill=(20, 20, 20), font=font)
+        y += round(size_px * 1.5)
+
+    if photo:
+        image = image.filter(ImageFilter.GaussianBlur(radius=dpi / 300))
+
+    return image
+
+
+def blank_scan(dpi: int = 200, seed: int = 42) -> Image.Image:
+    """Leere Trennseite mit Scanner-Rauschen."""
+    rng = random.Random(seed)
+    width = int(A4_INCHES[0] * dpi)
+    height = int(A4_INCHES[1] * dpi)
+    noise = Image.effect_noise((width // 4, height // 4), 6).resize((width, height))
+    image = Image.eval(noise, lambda value: 255 - abs(value - 128) // 8)
+    draw = ImageDraw.Draw(image)
+    for _ in range(20):  # Staub
+        x, y = rng.randrange(width), rng.randrange(height)
+        draw.point((x, y), fill=90)
+    return image.convert("RGB")
+
+
+def photo_page(dpi: int = 200, seed: int = 42, caption: str = "") -> Image.Image:
+    """Seite mit großem Foto (z.B. Bewerbungsfoto, Zeugnis-Scan als Bild), optional Bildunterschrift."""
+    rng = random.Random(seed)
+    width = int(A4_INCHES[0] * dpi)
+    height = int(A4_INCHES[1] * dpi)
+    image = Image.new("RGB", (width, height), "white")
+
+    cells = (24, 32)
+    photo = Image.new("L", cells)
+    photo.putdata([rng.randint(60, 220) for _ in range(cells[0] * cells[1])])
+    photo = photo.resize((width * 2 // 3, height // 2), Image.BICUBIC)
+    photo = photo.filter(ImageFilter.GaussianBlur(radius=dpi / 60))
+    image.paste(photo.convert("RGB"), (width // 6, dpi))
+
+    if caption:
+        draw = ImageDraw.Draw(image)
+        draw.text((width // 6, dpi + height // 2 + dpi // 4), caption, fill=(20, 20, 20), font=_font(round(10 / 72 * dpi)))
+    return image
+
+
+def images_to_pdf_bytes(images: List[Image.Image], dpi: int = 200) -> bytes:
+    """Bilder als Scan-PDF speichern (eine Seite pro Bild)."""
+    buffer = io.BytesIO()
+    images[0].save(
+        buffer,
+        format="PDF",
+        save_all=True,
+        append_images=images[1:],
+        resolution=dpi,
+    )
+    return buffer.getvalue()
+
+
+def _pdf_string(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return f"({escaped})"
+
+
+def text_pdf_bytes(pages: List[SyntheticPage], font_pt: float = 10.0) -> bytes:
+    """
+    Digitales Text-PDF (Helvetica, WinAnsi) - eine Seite pro SyntheticPage.
+    Minimaler Writer, damit Benchmarks kein reportlab brauchen.
+    """
+    width, height = A4_INCHES[0] * 72, A4_INCHES[1] * 72
+    leading = font_pt * 1.5
+
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Seitenbaum, sobald die Seiten feststehen
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+
+    for page in pages:
+        lines = [f"BT /F1 {font_pt} Tf {leading} TL 72 {height - 72:.2f} Td"]
+        for line in page.lines:
+            lines.append(f"{_pdf_string(line)} Tj T*")
+        lines.append("ET")
+        content = "\n".join(lines).encode("cp1252")
+
+        objects.append(content)
+        content_obj = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width:.2f} {height:.2f}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_obj} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    buffer = io.BytesIO()
+    buffer.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(buffer.tell())
+        if isinstance(body, bytes):
+            buffer.write(f"{number} 0 obj\n<< /Length {len(body)} >>\nstream\n".encode())
+            buffer.write(body + b"\nendstream\nendobj\n")
+        else:
+            buffer.write(f"{number} 0 obj\n{body}\nendobj\n".encode())
+
+    xref = buffer.tell()
+    buffer.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        buffer.write(f"{offset:010d} 00000 n \n".encode())
+    buffer.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return buffer.getvalue()
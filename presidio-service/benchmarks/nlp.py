@@ -0,0 +1,39 @@
+"""
+NLP-Engine für Benchmarks.
+
+Lädt die konfigurierten spaCy-Modelle, wenn sie installiert sind. Sonst eine
+leere Pipeline mit kleingeschriebenen Tokens als Lemmas - Tokenisierung und
+Kontext-Logik bleiben messbar, nur NER fehlt.
+"""
+from typing import List
+
+import spacy
+from presidio_analyzer.nlp_engine import SpacyNlpEngine
+from spacy.language import Language
+
+from app.config import settings
+
+MODELS = {"de": settings.spacy_model_de, "en": settings.spacy_model_en}
+
+
+@Language.component("lowercase_lemma")
+def _lowercase_lemma(doc):
+    for token in doc:
+        token.lemma_ = token.lower_
+    return doc
+
+
+def load_nlp_engine(languages: List[str] = ("de",)) -> SpacyNlpEngine:
+    models = [{"lang_code": lang, "model_name": MODELS[lang]} for lang in languages]
+    engine = SpacyNlpEngine(models=models)
+    if all(spacy.util.is_package(model["model_name"]) for model in models):
+        engine.load()
+        return engine
+
+    print(f"{', '.join(m['model_name'] for m in models)} not installed - using blank pipeline")
+    engine.nlp = {}
+    for lang in languages:
+        nlp = spacy.blank(lang)
+        nlp.add_pipe("lowercase_lemma")
+        engine.nlp[lang] = nlp
+    return engine
@@ -0,0 +1 @@
+# Golden-Output-Regression (lokal/CI ausführen, nicht Teil des Docker-Images)
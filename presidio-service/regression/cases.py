@@ -0,0 +1,133 @@
+"""
+Fester Korpus für die Golden-Output-Regression.
+
+Baut auf dem synthetischen Benchmark-Korpus auf (fester Seed) und deckt jeden
+Pfad ab, der PII durchlassen kann: Einzeltext, mehrseitiger Text mit
+wiederholten Kopf-/Fußzeilen, zahlenlastiger Text (Kontext-Enhancer), DOCX
+mit Tabellen, Text-PDF (Vektor-Schwärzung), Scans (OCR) und Scan-PDFs
+(eingebettete Bilder oder gerasterte Seiten).
+
+Jeder Fall kennt die PII-Werte, die er enthält - der Harness meldet sie, wenn
+sie in einer neuen Ausgabe auftauchen, in der Referenz aber nicht.
+"""
+from dataclasses import dataclass, field
+from typing import Any, List
+import io
+
+from docx import Document
+
+from benchmarks.corpus import (
+    SyntheticPage,
+    generate_pages,
+    images_to_pdf_bytes,
+    number_heavy_text,
+    render_page,
+    text_pdf_bytes,
+)
+
+KIND_TEXT = "text"            # TextAnonymizer.anonymize
+KIND_PAGES = "pages"          # TextAnonymizer.anonymize_pages (Text-PDFs)
+KIND_DOCX = "docx"            # DocxProcessor
+KIND_PDF_REDACT = "pdf_redact"  # PDFRedactor (Text-PDF -> geschwärztes PDF)
+KIND_IMAGE = "image"          # ImageAnonymizer (OCR + Boxen)
+KIND_SCAN_PDF = "scan_pdf"    # process_pdf (Scan-PDF -> geschwärztes PDF)
+
+SEED = 20240611
+
+
+@dataclass
+class Case:
+    """Ein Eingabedokument des Korpus."""
+
+    name: str
+    kind: str
+    data: Any                 # str, List[str], bytes oder PIL Image - je nach kind
+    language: str = "de"
+    pii: List[str] = field(default_factory=list)
+
+
+def _with_header_footer(pages: List[SyntheticPage]) -> List[str]:
+    """Seiten mit identischer Kopf- und Fußzeile, wie sie CV-Vorlagen erzeugen."""
+    owner = pages[0].pii
+    header = f"Lebenslauf {owner[0]} | {owner[3]}"
+    footer = f"{owner[1]}, {owner[2]} | Tel. {owner[4]}"
+    return [f"{header}\n{page.text}\n{footer}" for page in pages]
+
+
+def _docx_bytes(page: SyntheticPage) -> bytes:
+    doc = Document()
+    doc.add_heading("Lebenslauf", level=1)
+
+    table = doc.add_table(rows=0, cols=2)
+    for label, value in zip(
+        ["Name", "Anschrift", "PLZ", "E-Mail", "Telefon", "Geburtsdatum"],
+        page.pii,
+    ):
+        cells = table.add_row().cells
+        cells[0].text = label
+        cells[1].text = value
+
+    for line in page.lines[5:]:
+        doc.add_paragraph(line.strip())
+
+    doc.sections[0].footer.paragraphs[0].text = f"{page.pii[0]} - {page.pii[3]}"
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def build_cases() -> List[Case]:
+    """Alle Fälle in fester Reihenfolge (deterministisch)."""
+    pages = generate_pages(8, seed=SEED)
+    cases = []
+
+    for i, page in enumerate(pages[:3]):
+        cases.append(Case(f"text_cv_{i + 1}", KIND_TEXT, page.text, pii=page.pii))
+
+    cases.append(Case(
+        "text_en",
+        KIND_TEXT,
+        "John Smith lives at 1600 Pennsylvania Avenue, Washington. "
+        "Contact: john.smith@example.com, +1 202 555 0143. "
+        "Card 4111 1111 1111 1111, IBAN DE89370400440532013000, server 192.168.10.20.",
+        language="en",
+        pii=["John Smith", "john.smith@example.com", "+1 202 555 0143",
+             "4111 1111 1111 1111", "DE89370400440532013000", "192.168.10.20"],
+    ))
+
+    cases.append(Case(
+        "text_numbers",
+        KIND_TEXT,
+        number_heavy_text(200, seed=SEED),
+    ))
+
+    multi = pages[3:6]
+    cases.append(Case(
+        "pages_header_footer",
+        KIND_PAGES,
+        _with_header_footer(multi),
+        pii=[value for page in multi for value in page.pii],
+    ))
+
+    cases.append(Case("docx_cv", KIND_DOCX, _docx_bytes(pages[6]), pii=pages[6].pii))
+
+    cases.append(Case(
+        "pdf_text_cv",
+        KIND_PDF_REDACT,
+        text_pdf_bytes(pages[:2]),
+        pii=pages[0].pii + pages[1].pii,
+    ))
+
+    cases.append(Case("image_scan", KIND_IMAGE, render_page(pages[7], dpi=200), pii=pages[7].pii))
+    cases.append(Case("image_photo", KIND_IMAGE, render_page(pages[7], dpi=300, photo=True), pii=pages[7].pii))
+
+    scans = [render_page(page, dpi=200) for page in pages[:2]]
+    cases.append(Case(
+        "pdf_scan_cv",
+        KIND_SCAN_PDF,
+        images_to_pdf_bytes(scans, dpi=200),
+        pii=pages[0].pii + pages[1].pii,
+    ))
+
+    return cases
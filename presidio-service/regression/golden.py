@@ -0,0 +1,767 @@
+"""
+Golden-Output-Regression: Referenzausgaben aufzeichnen und vergleichen.
+
+record: Korpus (regression.cases) durch die aktuelle Pipeline schicken und
+anonymisierten Text, Entity-Spans, geschwärzten PDF-Text und Scan-Boxen als
+JSON pro Fall speichern. check: dieselben Fälle erneut verarbeiten und mit den
+Golden-Dateien vergleichen. Textpfade müssen exakt übereinstimmen, OCR-Pfade
+innerhalb von TOLERANCES. Jede Stelle, die die Referenz geschwärzt hat und die
+neue Ausgabe nicht, wird als Leak mit Text und Position gemeldet.
+
+Bei Scan-PDFs wird nicht nur die gerenderte Seite geprüft: jedes Image XObject
+der Ausgabe (auch in Form XObjects und nicht gezeichnete) wird dekodiert und
+per OCR gelesen, seitenfüllende Bilder müssen die Referenz-Boxen geschwärzt
+haben - ein verdecktes ungeschwärztes Bild oder eine Textebene mit PII sähe
+im Rendering sauber aus.
+
+Goldens mit den Produktionsmodellen (de_core_news_md/en_core_web_md,
+Tesseract deu/eng) und ohne neue Fast Paths aufzeichnen (Scan-PDFs gerastert
+mit PDF_NATIVE_IMAGES=false) und unter regression/golden/ einchecken;
+environment.json hält Modelle und Paketversionen fest, check warnt bei
+Abweichungen.
+
+Usage (im Verzeichnis presidio-service):
+    NLP_BATCHING=false PDF_DEDUP_REPEATED_BLOCKS=false OCR_CACHE_ENTRIES=0 \\
+        PDF_NATIVE_IMAGES=false python -m regression.golden record
+    python -m regression.golden check --report /tmp/regression.json
+"""
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import argparse
+import io
+import json
+import sys
+import time
+
+from PIL import Image, ImageChops, ImageDraw
+from PyPDF2 import PdfReader
+
+from app.config import settings
+from regression.cases import (
+    KIND_DOCX,
+    KIND_IMAGE,
+    KIND_PAGES,
+    KIND_PDF_REDACT,
+    KIND_SCAN_PDF,
+    KIND_TEXT,
+    Case,
+    build_cases,
+)
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+ENVIRONMENT_FILE = "environment.json"
+
+# Erlaubte Abweichungen für OCR-Pfade (Scans). Textpfade: keine.
+TOLERANCES = {
+    # Anteil jeder Referenz-Box, der in der neuen Ausgabe geschwärzt sein muss
+    "box_coverage": 0.95,
+    # Dasselbe für eingebettete Seitenbilder - auf Seitengröße skaliert verschieben
+    # sich die Kanten um eine Rasterzelle; ein ungeschwärztes Bild liegt bei 0
+    "embedded_box_coverage": 0.8,
+    # Zusätzlich geschwärzte Fläche gegenüber der Referenz (Anteil) - mehr ist Überschwärzung
+    "extra_area": 0.10,
+    # Ähnlichkeit (difflib) des OCR-Texts der geschwärzten Seite
+    "ocr_text_similarity": 0.97,
+}
+
+# Raster für die Erkennung geschwärzter Flächen (Pixel pro Zelle)
+MASK_CELL = 4
+
+# Zeichen Kontext links/rechts in Leak-Meldungen
+CONTEXT_CHARS = 30
+
+# Rand (Pixel) um eine ungeschwärzte Box, wenn ihr Text per OCR gelesen wird
+LEAK_OCR_MARGIN = 16
+
+# Scan-PDFs: Auflösung für den Vergleich der Seiten und Mindestdifferenz eines
+# geschwärzten Pixels (JPEG-Neukodierung verändert jedes Pixel ein wenig)
+SCAN_DPI = 200
+SCAN_DIFF_THRESHOLD = 64
+
+# Eingebettete Bilder gelten als Seitenbild, wenn ihr Seitenverhältnis so nah
+# an dem der Seite liegt - nur für sie werden die Referenz-Boxen geprüft
+PAGE_ASPECT_TOLERANCE = 0.02
+
+# Verschachtelungstiefe von Form XObjects beim Einsammeln der Bilder
+MAX_FORM_DEPTH = 8
+
+PACKAGES = ["presidio-analyzer", "presidio-anonymizer", "presidio-image-redactor", "spacy", "pytesseract", "tesserocr"]
+
+
+# --- Pipeline ausführen -----------------------------------------------------
+
+def _entity(text: str, result) -> dict:
+    from app.services.text_anonymizer import entity_to_dict
+
+    entity = entity_to_dict(result)
+    entity["text"] = text[result.start:result.end]
+    return entity
+
+
+def run_case(case: Case) -> dict:
+    """Fall durch die Pipeline schicken, Ausgabe als JSON-fähiges Dict."""
+    if case.kind == KIND_TEXT:
+        from app.services.text_anonymizer import get_anonymizer
+
+        anonymizer = get_anonymizer()
+        anonymized = anonymizer.anonymize(case.data, case.language)
+        return {
+            "source_text": case.data,
+            "anonymized_text": anonymized,
+            "entities": sorted(
+                (_entity(case.data, result) for result in anonymizer.last_results),
+                key=_span_key,
+            ),
+        }
+
+    if case.kind == KIND_PAGES:
+        from app.services.text_anonymizer import get_anonymizer
+
+        anonymizer = get_anonymizer()
+        text = "\n\n".join(case.data)
+        anonymized = anonymizer.anonymize_pages(case.data, case.language)
+        return {
+            "source_text": text,
+            "anonymized_text": anonymized,
+            "entities": sorted(
+                (_entity(text, result) for result in anonymizer.last_results),
+                key=_span_key,
+            ),
+        }
+
+    if case.kind == KIND_DOCX:
+        from app.services.docx_processor import DocxProcessor
+        from app.services.text_anonymizer import get_anonymizer
+
+        result = DocxProcessor().anonymize(
+            case.data, get_anonymizer(), case.language, include_entities=True,
+        )
+        return {
+            "source_text": result.source_text,
+            "anonymized_text": result.anonymized_text,
+            "entities": sorted(
+                (_entity(result.source_text, entity) for entity in result.entities),
+                key=_span_key,
+            ),
+        }
+
+    if case.kind == KIND_PDF_REDACT:
+        from app.services.pdf_processor import PDFProcessor
+        from app.services.pdf_redactor import PDFRedactor
+        from app.services.text_anonymizer import get_anonymizer
+
+        processor = PDFProcessor()
+        result = PDFRedactor(processor).redact(case.data, get_anonymizer(), case.language)
+        return {
+            "source_pages": processor.extract_pages(case.data),
+            "pages": processor.extract_pages(result.pdf_bytes),
+            "pii_found": result.pii_found,
+            "pages_rasterized": result.pages_rasterized,
+        }
+
+    if case.kind == KIND_IMAGE:
+        from app.services.image_anonymizer import get_image_anonymizer
+
+        anonymizer = get_image_anonymizer()
+        redacted = anonymizer.anonymize(case.data, case.language)
+        return {
+            "size": list(case.data.size),
+            "boxes": redacted_boxes(case.data, redacted),
+            "ocr_text": anonymizer.extract_text(redacted, case.language),
+        }
+
+    if case.kind == KIND_SCAN_PDF:
+        from app.routes.anonymize import pdf_processor, process_pdf
+        from app.services.image_anonymizer import get_image_anonymizer
+
+        # Wie der Endpoint: eingebettete Bilder (PDF_NATIVE_IMAGES) oder gerasterte Seiten
+        response = process_pdf(case.data, "pdf", case.language)
+        anonymizer = get_image_anonymizer()
+        originals = pdf_processor.pdf_to_images(case.data, dpi=SCAN_DPI)
+        # Gerasterte Ausgabe hat eine andere Seitengröße (Pixel als Punkte) -
+        # verglichen wird im Pixelraster des Originals
+        redacted = [
+            page if page.size == original.size else page.resize(original.size)
+            for original, page in zip(originals, pdf_processor.pdf_to_images(response.body, dpi=SCAN_DPI))
+        ]
+        text_layer = pdf_processor.extract_pages(response.body)
+        return {
+            "pages": [
+                {
+                    "size": list(page.size),
+                    "boxes": redacted_boxes(original, page, SCAN_DIFF_THRESHOLD),
+                    "ocr_text": anonymizer.extract_text(page, case.language),
+                    "text_layer": text,
+                    "embedded": [
+                        _embedded_output(original, image, anonymizer, case.language)
+                        for image in images
+                    ],
+                }
+                for original, page, text, images in zip(
+                    originals, redacted, text_layer, embedded_images(response.body)
+                )
+            ],
+        }
+
+    raise ValueError(f"Unknown case kind: {case.kind}")
+
+
+def embedded_images(pdf_bytes: bytes) -> List[List[Optional[Image.Image]]]:
+    """
+    Alle Image XObjects je Seite, auch in Form XObjects und nicht gezeichnete.
+    None steht für ein Bild, das nicht dekodiert werden konnte.
+    """
+    pages = []
+    for page in PdfReader(io.BytesIO(pdf_bytes)).pages:
+        images: List[Optional[Image.Image]] = []
+        _collect_images(page.get("/Resources"), images, set(), 0)
+        pages.append(images)
+    return pages
+
+
+def _collect_images(resources, images: list, seen: set, depth: int):
+    if resources is None or depth > MAX_FORM_DEPTH:
+        return
+    xobjects = resources.get_object().get("/XObject")
+    if xobjects is None:
+        return
+
+    for reference in xobjects.get_object().values():
+        xobject = reference.get_object()
+        if id(xobject) in seen:
+            continue
+        seen.add(id(xobject))
+
+        if xobject.get("/Subtype") == "/Image":
+            images.append(_decode_image(xobject))
+        elif xobject.get("/Subtype") == "/Form":
+            _collect_images(xobject.get("/Resources"), images, seen, depth + 1)
+
+
+def _decode_image(xobject) -> Optional[Image.Image]:
+    """Image XObject als PIL Image - großzügiger als der Fast Path, nur zum Lesen."""
+    from app.services.scan_redactor import _as_list, _components
+
+    filters = [str(name) for name in _as_list(xobject.get("/Filter"))]
+    size = (int(xobject["/Width"]), int(xobject["/Height"]))
+    try:
+        # Flate/ASCII85/LZW dekodiert PyPDF2; JPEG/JPX bleiben roh, CCITT kommt als TIFF
+        data = xobject.get_data()
+        if filters and filters[-1] in ("/DCTDecode", "/JPXDecode", "/CCITTFaxDecode"):
+            image = Image.open(io.BytesIO(data))
+        else:
+            components = _components(xobject.get("/ColorSpace"))
+            bits = int(xobject.get("/BitsPerComponent", 1 if xobject.get("/ImageMask") else 8))
+            if bits == 1 and components in (1, None):
+                image = Image.frombytes("1", size, data)
+            elif bits == 8 and components in (1, 3):
+                image = Image.frombytes("L" if components == 1 else "RGB", size, data)
+            else:
+                return None
+        image.load()
+        return image
+    except Exception:
+        return None
+
+
+def _embedded_output(original: Image.Image, image: Optional[Image.Image], anonymizer, language: str) -> dict:
+    """OCR-Text eines eingebetteten Bilds, bei Seitenbildern auch die geschwärzten Flächen."""
+    if image is None:
+        return {"size": None, "boxes": None, "ocr_text": None}
+
+    image = image.convert("L")
+    boxes = None
+    page_aspect = original.width / original.height
+    if abs(image.width / image.height - page_aspect) <= PAGE_ASPECT_TOLERANCE * page_aspect:
+        boxes = redacted_boxes(original, image.resize(original.size), SCAN_DIFF_THRESHOLD)
+
+    return {
+        "size": list(image.size),
+        "boxes": boxes,
+        "ocr_text": anonymizer.extract_text(image, language),
+    }
+
+
+def _span_key(entity: dict) -> Tuple[int, int, str]:
+    return entity["start"], entity["end"], entity["entity_type"]
+
+
+def _change_mask(original: Image.Image, redacted: Image.Image, threshold: int = 0) -> Image.Image:
+    """Geänderte Pixel als Maske im MASK_CELL-Raster (L, 255 = geändert)."""
+    diff = ImageChops.difference(original.convert("L"), redacted.convert("L"))
+    diff = diff.point(lambda value: 255 if value > threshold else 0)
+    width, height = diff.size
+    small = (max(1, width // MASK_CELL), max(1, height // MASK_CELL))
+    # BOX: Zelle ist geändert, sobald ein Pixel darin geändert ist
+    return diff.resize(small, Image.Resampling.BOX).point(lambda value: 255 if value else 0)
+
+
+def redacted_boxes(original: Image.Image, redacted: Image.Image, threshold: int = 0) -> List[List[int]]:
+    """
+    Geschwärzte Flächen als Boxen [left, top, width, height] im Originalbild.
+
+    Aus dem Pixelvergleich statt aus den Analyzer-Boxen - so wird geprüft, was
+    tatsächlich im Bild gelandet ist, egal über welchen Pfad (Cache, ROI-OCR).
+    Benachbarte Schwärzungen verschmelzen zu einer Box.
+    """
+    mask = _change_mask(original, redacted, threshold)
+    width, height = mask.size
+    pixels = mask.load()
+    seen = bytearray(width * height)
+    boxes = []
+
+    for y in range(height):
+        for x in range(width):
+            if not pixels[x, y] or seen[y * width + x]:
+                continue
+            # Zusammenhängende Fläche (4er-Nachbarschaft) per Stack-Fill
+            stack = [(x, y)]
+            seen[y * width + x] = 1
+            x0, y0, x1, y1 = x, y, x, y
+            while stack:
+                cx, cy = stack.pop()
+                x0, y0, x1, y1 = min(x0, cx), min(y0, cy), max(x1, cx), max(y1, cy)
+                for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                    if 0 <= nx < width and 0 <= ny < height and pixels[nx, ny] and not seen[ny * width + nx]:
+                        seen[ny * width + nx] = 1
+                        stack.append((nx, ny))
+            boxes.append([
+                x0 * MASK_CELL,
+                y0 * MASK_CELL,
+                (x1 - x0 + 1) * MASK_CELL,
+                (y1 - y0 + 1) * MASK_CELL,
+            ])
+
+    return sorted(boxes, key=lambda box: (box[1], box[0]))
+
+
+# --- Vergleich --------------------------------------------------------------
+
+@dataclass
+class CaseReport:
+    """Vergleich eines Falls mit seiner Golden-Ausgabe."""
+
+    name: str
+    kind: str
+    passed: bool = True
+    leaks: List[dict] = field(default_factory=list)        # Referenz schwärzt, neue Ausgabe nicht
+    differences: List[dict] = field(default_factory=list)  # sonstige Abweichungen
+    seconds: float = 0.0
+
+    def fail(self, difference: dict):
+        self.passed = False
+        self.differences.append(difference)
+
+    def leak(self, leak: dict):
+        self.passed = False
+        self.leaks.append(leak)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "passed": self.passed,
+            "leaks": self.leaks,
+            "differences": self.differences,
+            "seconds": self.seconds,
+        }
+
+
+def _context(text: str, start: int, end: int) -> str:
+    left = text[max(0, start - CONTEXT_CHARS):start]
+    right = text[end:end + CONTEXT_CHARS]
+    return f"{left}[{text[start:end]}]{right}".replace("\n", "⏎")
+
+
+def _line(text: str, offset: int) -> int:
+    return text.count("\n", 0, offset) + 1
+
+
+def _compare_entities(report: CaseReport, golden: dict, current: dict):
+    source = golden["source_text"]
+    if current["source_text"] != source:
+        report.fail({"type": "source_text_changed", "detail": "Input text differs - corpus or extractor changed"})
+        return
+
+    expected = {_span_key(entity): entity for entity in golden["entities"]}
+    actual = {_span_key(entity): entity for entity in current["entities"]}
+
+    # Abdeckung pro Zeichen: eine Referenz-Entity gilt als erhalten, wenn eine
+    # neue Entity mit gleichem Typ genau dieselben Zeichen abdeckt
+    for key, entity in expected.items():
+        if key in actual:
+            if abs(actual[key]["score"] - entity["score"]) > 1e-4:
+                report.fail({
+                    "type": "score_changed",
+                    "entity_type": entity["entity_type"],
+                    "text": entity["text"],
+                    "golden": entity["score"],
+                    "current": actual[key]["score"],
+                })
+            continue
+
+        covered = [
+            other for other in current["entities"]
+            if other["start"] <= entity["start"] and other["end"] >= entity["end"]
+        ]
+        if covered:
+            report.fail({
+                "type": "span_changed",
+                "golden": entity,
+                "current": covered[0],
+            })
+            continue
+
+        uncovered = _uncovered(entity["start"], entity["end"], current["entities"])
+        report.leak({
+            "entity_type": entity["entity_type"],
+            "text": entity["text"],
+            "start": entity["start"],
+            "end": entity["end"],
+            "line": _line(source, entity["start"]),
+            "score": entity["score"],
+            "recognizer": entity.get("recognizer"),
+            "uncovered": [source[start:end] for start, end in uncovered],
+            "context": _context(source, entity["start"], entity["end"]),
+        })
+
+    for key, entity in actual.items():
+        if key not in expected and not any(
+            other["start"] <= entity["start"] and other["end"] >= entity["end"]
+            for other in golden["entities"]
+        ):
+            report.fail({
+                "type": "new_entity",
+                "entity": entity,
+                "context": _context(source, entity["start"], entity["end"]),
+            })
+
+    if current["anonymized_text"] != golden["anonymized_text"]:
+        report.fail({
+            "type": "anonymized_text_changed",
+            "diff": _text_diff(golden["anonymized_text"], current["anonymized_text"]),
+        })
+
+
+def _uncovered(start: int, end: int, entities: List[dict]) -> List[Tuple[int, int]]:
+    """Teilbereiche von [start, end), die keine der Entities abdeckt."""
+    gaps = [(start, end)]
+    for entity in entities:
+        next_gaps = []
+        for gap_start, gap_end in gaps:
+            if entity["end"] <= gap_start or entity["start"] >= gap_end:
+                next_gaps.append((gap_start, gap_end))
+                continue
+            if entity["start"] > gap_start:
+                next_gaps.append((gap_start, entity["start"]))
+            if entity["end"] < gap_end:
+                next_gaps.append((entity["end"], gap_end))
+        gaps = next_gaps
+    return gaps
+
+
+def _text_diff(golden: str, current: str, limit: int = 10) -> List[dict]:
+    changes = []
+    matcher = SequenceMatcher(None, golden, current, autojunk=False)
+    for tag, g0, g1, c0, c1 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        changes.append({
+            "op": tag,
+            "golden": golden[g0:g1],
+            "current": current[c0:c1],
+            "line": _line(golden, g0),
+        })
+        if len(changes) >= limit:
+            break
+    return changes
+
+
+def _compare_pdf(report: CaseReport, golden: dict, current: dict):
+    if current["source_pages"] != golden["source_pages"]:
+        report.fail({"type": "source_text_changed", "detail": "Extracted PDF text differs - extractor changed"})
+        return
+
+    for field_name in ("pii_found", "pages_rasterized"):
+        if current[field_name] != golden[field_name]:
+            report.fail({"type": f"{field_name}_changed", "golden": golden[field_name], "current": current[field_name]})
+
+    if len(current["pages"]) != len(golden["pages"]):
+        report.fail({"type": "page_count_changed", "golden": len(golden["pages"]), "current": len(current["pages"])})
+        return
+
+    for page_number, (expected, actual) in enumerate(zip(golden["pages"], current["pages"]), start=1):
+        if expected == actual:
+            continue
+        for change in _text_diff(expected, actual, limit=50):
+            # Text, den die Referenz entfernt hat, steht wieder im PDF
+            if change["current"].strip() and change["op"] in ("insert", "replace"):
+                report.leak({
+                    "page": page_number,
+                    "line": change["line"],
+                    "text": change["current"],
+                    "golden": change["golden"],
+                })
+            else:
+                report.fail(dict(change, type="text_changed", page=page_number))
+
+
+def _box_mask(size: Tuple[int, int], boxes: List[List[int]]) -> Image.Image:
+    mask = Image.new("1", tuple(size), 0)
+    draw = ImageDraw.Draw(mask)
+    for left, top, width, height in boxes:
+        draw.rectangle([left, top, left + width - 1, top + height - 1], fill=1)
+    return mask
+
+
+def _area(mask: Image.Image) -> int:
+    return mask.convert("L").histogram()[255]
+
+
+def _compare_image(
+    report: CaseReport,
+    image: Image.Image,
+    language: str,
+    golden: dict,
+    current: dict,
+    page: Optional[int] = None,
+):
+    located = {"page": page} if page else {}
+    if current["size"] != golden["size"]:
+        report.fail({"type": "size_changed", "golden": golden["size"], "current": current["size"], **located})
+        return
+
+    current_mask = _box_mask(current["size"], current["boxes"])
+
+    for box in golden["boxes"]:
+        left, top, width, height = box
+        crop = current_mask.crop((left, top, left + width, top + height))
+        coverage = _area(crop) / (width * height)
+        if coverage >= TOLERANCES["box_coverage"]:
+            continue
+
+        leak = {**located, "box": box, "coverage": round(coverage, 3)}
+        try:
+            from app.services.image_anonymizer import get_image_anonymizer
+            # Mit Rand, damit Tesseract einzelne Wörter erkennt
+            region = image.crop((
+                max(0, left - LEAK_OCR_MARGIN),
+                max(0, top - LEAK_OCR_MARGIN),
+                left + width + LEAK_OCR_MARGIN,
+                top + height + LEAK_OCR_MARGIN,
+            ))
+            leak["ocr_text"] = get_image_anonymizer().extract_text(region, language).strip()
+        except Exception as e:
+            leak["ocr_text"] = f"<OCR failed: {e}>"
+        report.leak(leak)
+
+    golden_area = _area(_box_mask(golden["size"], golden["boxes"]))
+    extra = _area(ImageChops.logical_and(
+        current_mask,
+        ImageChops.invert(_box_mask(golden["size"], golden["boxes"]).convert("L")).convert("1"),
+    ))
+    if golden_area and extra / golden_area > TOLERANCES["extra_area"]:
+        report.fail({
+            "type": "over_redaction",
+            "extra_area": round(extra / golden_area, 3),
+            "tolerance": TOLERANCES["extra_area"],
+            **located,
+        })
+
+    similarity = SequenceMatcher(None, golden["ocr_text"], current["ocr_text"], autojunk=False).ratio()
+    if similarity < TOLERANCES["ocr_text_similarity"]:
+        report.fail({
+            "type": "ocr_text_changed",
+            "similarity": round(similarity, 4),
+            "tolerance": TOLERANCES["ocr_text_similarity"],
+            "diff": _text_diff(golden["ocr_text"], current["ocr_text"]),
+            **located,
+        })
+
+
+def _compare_scan_pdf(report: CaseReport, case: Case, golden: dict, current: dict):
+    if len(current["pages"]) != len(golden["pages"]):
+        report.fail({"type": "page_count_changed", "golden": len(golden["pages"]), "current": len(current["pages"])})
+        return
+
+    from app.services.pdf_processor import PDFProcessor
+
+    originals = PDFProcessor().pdf_to_images(case.data, dpi=SCAN_DPI)
+    for page_number, (image, expected, actual) in enumerate(
+        zip(originals, golden["pages"], current["pages"]), start=1
+    ):
+        _compare_image(report, image, case.language, expected, actual, page=page_number)
+        _compare_embedded(report, expected, actual, page_number)
+
+
+def _compare_embedded(report: CaseReport, golden: dict, current: dict, page: int):
+    """Eingebettete Bilder der Seite gegen die Referenz-Boxen prüfen."""
+    for index, embedded in enumerate(current.get("embedded", []), start=1):
+        if embedded["ocr_text"] is None:
+            # Nicht lesbar heißt nicht geprüft - eine Lücke im Harness, kein Freispruch
+            report.fail({"type": "embedded_image_unreadable", "page": page, "image": index})
+            continue
+        if embedded["boxes"] is None:
+            continue
+
+        mask = _box_mask(golden["size"], embedded["boxes"])
+        for box in golden["boxes"]:
+            left, top, width, height = box
+            coverage = _area(mask.crop((left, top, left + width, top + height))) / (width * height)
+            if coverage < TOLERANCES["embedded_box_coverage"]:
+                report.leak({
+                    "type": "embedded_image_unredacted",
+                    "page": page,
+                    "image": index,
+                    "box": box,
+                    "coverage": round(coverage, 3),
+                })
+
+
+def _output_text(case: Case, output: dict) -> str:
+    if case.kind == KIND_PDF_REDACT:
+        return "\n".join(output["pages"])
+    if case.kind == KIND_IMAGE:
+        return output["ocr_text"]
+    if case.kind == KIND_SCAN_PDF:
+        # Gerenderte Seite, Textebene und jedes eingebettete Bild für sich
+        parts = []
+        for page in output["pages"]:
+            parts.append(page["ocr_text"])
+            parts.append(page.get("text_layer", ""))
+            parts.extend(embedded["ocr_text"] or "" for embedded in page.get("embedded", []))
+        return "\n".join(parts)
+    return output["anonymized_text"]
+
+
+def compare(case: Case, golden: dict, current: dict) -> CaseReport:
+    """Neue Ausgabe eines Falls mit der Golden-Ausgabe vergleichen."""
+    report = CaseReport(case.name, case.kind)
+
+    if case.kind in (KIND_TEXT, KIND_PAGES, KIND_DOCX):
+        _compare_entities(report, golden, current)
+    elif case.kind == KIND_PDF_REDACT:
+        _compare_pdf(report, golden, current)
+    elif case.kind == KIND_IMAGE:
+        _compare_image(report, case.data, case.language, golden, current)
+    elif case.kind == KIND_SCAN_PDF:
+        _compare_scan_pdf(report, case, golden, current)
+
+    # Bekannte PII-Werte, die die Referenz entfernt hat und die jetzt sichtbar sind
+    golden_text = _output_text(case, golden)
+    current_text = _output_text(case, current)
+    for value in case.pii:
+        if value in current_text and value not in golden_text:
+            report.leak({"type": "known_pii_visible", "text": value})
+
+    return report
+
+
+# --- CLI --------------------------------------------------------------------
+
+def environment() -> Dict[str, object]:
+    """Modelle, Paketversionen und PII-Settings der Aufzeichnung."""
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "spacy_models": {"de": settings.spacy_model_de, "en": settings.spacy_model_en},
+        "packages": versions,
+        "entities": settings.entities_to_anonymize,
+        "ocr_backend": settings.ocr_backend,
+    }
+
+
+def _selected(cases: List[Case], only: Optional[List[str]]) -> List[Case]:
+    if not only:
+        return cases
+    return [case for case in cases if case.name in only or case.kind in only]
+
+
+def record(golden_dir: Path, only: Optional[List[str]] = None):
+    golden_dir.mkdir(parents=True, exist_ok=True)
+    for case in _selected(build_cases(), only):
+        started = time.perf_counter()
+        output = run_case(case)
+        path = golden_dir / f"{case.name}.json"
+        path.write_text(json.dumps(
+            {"case": case.name, "kind": case.kind, "language": case.language, "output": output},
+            ensure_ascii=False,
+            indent=1,
+        ), encoding="utf-8")
+        print(f"recorded {case.name:<22} {time.perf_counter() - started:>6.1f}s")
+
+    (golden_dir / ENVIRONMENT_FILE).write_text(json.dumps(environment(), indent=1), encoding="utf-8")
+
+
+def check(golden_dir: Path, only: Optional[List[str]] = None) -> List[CaseReport]:
+    recorded_env = golden_dir / ENVIRONMENT_FILE
+    if recorded_env.exists():
+        expected = json.loads(recorded_env.read_text(encoding="utf-8"))
+        current = environment()
+        for key in expected:
+            if expected[key] != current.get(key):
+                print(f"warning: {key} differs from recording: {expected[key]} -> {current.get(key)}")
+
+    reports = []
+    for case in _selected(build_cases(), only):
+        path = golden_dir / f"{case.name}.json"
+        if not path.exists():
+            report = CaseReport(case.name, case.kind)
+            report.fail({"type": "missing_golden", "path": str(path)})
+            reports.append(report)
+            print(f"MISSING {case.name}")
+            continue
+
+        golden = json.loads(path.read_text(encoding="utf-8"))["output"]
+        started = time.perf_counter()
+        current = run_case(case)
+        report = compare(case, golden, current)
+        report.seconds = round(time.perf_counter() - started, 2)
+        reports.append(report)
+
+        status = "ok  " if report.passed else "FAIL"
+        print(f"{status} {case.name:<22} {report.seconds:>6.1f}s  "
+              f"{len(report.leaks)} leaks, {len(report.differences)} differences")
+        for leak in report.leaks:
+            print(f"     LEAK {json.dumps(leak, ensure_ascii=False)}")
+        for difference in report.differences[:5]:
+            print(f"     diff {json.dumps(difference, ensure_ascii=False)[:300]}")
+
+    return reports
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=["record", "check"])
+    parser.add_argument("--golden-dir", type=Path, default=GOLDEN_DIR)
+    parser.add_argument("--only", nargs="*", help="Fallnamen oder Arten (text, pages, docx, pdf_redact, image, scan_pdf)")
+    parser.add_argument("--report", type=Path, help="Ergebnis von check als JSON schreiben")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        record(args.golden_dir, args.only)
+        return 0
+
+    reports = check(args.golden_dir, args.only)
+    if args.report:
+        args.report.write_text(json.dumps(
+            {"tolerances": TOLERANCES, "cases": [report.to_dict() for report in reports]},
+            ensure_ascii=False,
+            indent=1,
+        ), encoding="utf-8")
+
+    failed = [report for report in reports if not report.passed]
+    leaks = sum(len(report.leaks) for report in reports)
+    print(f"{len(reports) - len(failed)}/{len(reports)} cases match, {leaks} leaked spans")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
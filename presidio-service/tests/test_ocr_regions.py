@@ -0,0 +1,35 @@
+"""Layout-Vorlauf für Scans: leere Seiten vs. Seiten mit wenig Text."""
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from app.services.ocr_regions import TextRegionDetector
+
+A4_INCH = (8.27, 11.69)
+
+
+def _page(dpi: int, lines=(), point_size: float = 9) -> Image.Image:
+    size = (round(A4_INCH[0] * dpi), round(A4_INCH[1] * dpi))
+    image = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=round(point_size * dpi / 72))
+    for index, line in enumerate(lines):
+        draw.text((dpi, dpi + index * 2 * point_size * dpi / 72), line, fill=0, font=font)
+    return image
+
+
+@pytest.mark.parametrize("dpi", [150, 200, 300])
+@pytest.mark.parametrize("point_size", [8, 10])
+def test_single_pii_line_is_not_blank(dpi, point_size):
+    layout = TextRegionDetector().detect(_page(dpi, ["Max Müller"], point_size))
+
+    assert not layout.blank
+    assert layout.ocr_pixels > 0
+
+
+@pytest.mark.parametrize("dpi", [150, 300])
+def test_empty_page_is_blank(dpi):
+    layout = TextRegionDetector().detect(_page(dpi))
+
+    assert layout.blank
+    assert layout.ocr_pixels == 0